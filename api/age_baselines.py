@@ -0,0 +1,92 @@
+"""
+Age baselines: distribution of the sub-indicators per birth year (and birth
+quarter) over all stored player profiles, used by scoring.age_adjust() to
+compare a player with their own age group instead of with everybody.
+
+The sufficient statistics (count, sum, sum of squares per sub-indicator) per
+scoring model, birth year and birth quarter live in AgeBaseline and are
+maintained by triggers on playerprofile (db.sync_age_baselines()), so they follow
+every profile refresh without a rebuild.
+
+Adjustment of a sub-indicator x of a player born in year y, quarter q:
+
+    x' = mean + (x - effect_q - mean_y) * sd / sd_y
+
+mean/sd over all players, mean_y/sd_y of the birth year shrunk towards them by
+PRIOR_PLAYERS pseudo-players. effect_q (relative-age effect, only with
+correct_quarter=True) is how far players born in quarter q lie above their birth
+year on average, pooled over all years and shrunk towards 0.
+"""
+import math
+from datetime import date
+from typing import Dict, Optional
+
+from sqlmodel import Session, select
+
+from calibration import FieldStats, field_stats
+from models import AgeBaseline, SCORING_MODEL
+
+# sub-indicators of compute_score, <field>_sum/_squares columns of AgeBaseline
+SUB_INDICATORS = ("technique", "physical", "intelligence", "mentality", "impact")
+PRIOR_PLAYERS = 20
+SUB_INDICATOR_MIN, SUB_INDICATOR_MAX = 0, 100
+
+
+def birth_quarter(birthdate: date) -> int:
+    return (birthdate.month + 2) // 3
+
+
+class AgeBaselines:
+    def __init__(self, rows):
+        rows = [r for r in rows if r.player_count > 0]
+        self.counts: Dict[int, int] = {}
+        for r in rows:
+            self.counts[r.birth_year] = self.counts.get(r.birth_year, 0) + r.player_count
+        self.overall: Dict[str, Optional[FieldStats]] = {}
+        self.years: Dict[int, Dict[str, FieldStats]] = {year: {} for year in self.counts}
+        self.quarter_effects: Dict[int, Dict[str, float]] = {q: {} for q in range(1, 5)}
+        total_count = sum(self.counts.values())
+        for f in SUB_INDICATORS:
+            overall = field_stats(
+                total_count, sum(getattr(r, f"{f}_sum") for r in rows), sum(getattr(r, f"{f}_squares") for r in rows)
+            )
+            self.overall[f] = overall
+            if overall is None:
+                continue
+            year_sums: Dict[int, float] = {}
+            year_squares: Dict[int, float] = {}
+            for r in rows:
+                year_sums[r.birth_year] = year_sums.get(r.birth_year, 0.0) + getattr(r, f"{f}_sum")
+                year_squares[r.birth_year] = year_squares.get(r.birth_year, 0.0) + getattr(r, f"{f}_squares")
+            for year, n in self.counts.items():
+                own = field_stats(n, year_sums[year], year_squares[year])
+                # shrink mean and variance towards all players
+                mean = (year_sums[year] + PRIOR_PLAYERS * overall.mean) / (n + PRIOR_PLAYERS)
+                variance = (n * own.sd ** 2 + PRIOR_PLAYERS * overall.sd ** 2) / (n + PRIOR_PLAYERS)
+                self.years[year][f] = FieldStats(mean=mean, sd=math.sqrt(variance))
+            # deviation of each quarter from the (unshrunk) mean of its birth year
+            deviation = {q: 0.0 for q in range(1, 5)}
+            quarter_counts = {q: 0 for q in range(1, 5)}
+            for r in rows:
+                year_mean = year_sums[r.birth_year] / self.counts[r.birth_year]
+                deviation[r.birth_quarter] += getattr(r, f"{f}_sum") - r.player_count * year_mean
+                quarter_counts[r.birth_quarter] += r.player_count
+            for q in range(1, 5):
+                self.quarter_effects[q][f] = deviation[q] / (quarter_counts[q] + PRIOR_PLAYERS)
+
+    def adjust(self, field: str, value: float, birthdate: date, correct_quarter: bool = False) -> float:
+        """Sub-indicator `field` as it would rank among all players, given the player's birth year."""
+        overall = self.overall.get(field)
+        year = self.years.get(birthdate.year, {}).get(field)
+        if overall is None:
+            return value
+        if correct_quarter:
+            value -= self.quarter_effects[birth_quarter(birthdate)].get(field, 0.0)
+        if year is None:
+            return min(SUB_INDICATOR_MAX, max(SUB_INDICATOR_MIN, value))
+        scale = overall.sd / year.sd if year.sd > 1e-9 else 1.0
+        return min(SUB_INDICATOR_MAX, max(SUB_INDICATOR_MIN, overall.mean + (value - year.mean) * scale))
+
+
+def load_age_baselines(session: Session, model: str = SCORING_MODEL) -> AgeBaselines:
+    return AgeBaselines(session.exec(select(AgeBaseline).where(AgeBaseline.model == model)).all())
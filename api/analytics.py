@@ -0,0 +1,287 @@
+"""
+League-wide aggregates over evaluations and action stats (GET /analytics/...).
+
+A distribution is computed in two steps: one GROUP BY over the fact table
+gives one value per player (per-90 rate of a stat over all the player's
+minutes, mean of a rating), then those rows are split by position group or age
+band and summarised in Python (count, mean, sd, quantiles, histogram). No ORM
+objects are loaded; the scan happens in the database engine.
+
+With DuckDB installed (pip install duckdb) every worker keeps a columnar
+in-memory copy of the two fact tables (ColumnarStore). It is loaded once via
+CSV COPY and then follows the change log (changelog.py): before each query the
+evaluation/actionstat records written since its cursor are read and exactly
+those rows are reloaded, the way percentiles.PercentileIndex follows
+revisions. It is rebuilt every REBUILD_SECONDS, and earlier when the change
+log was purged past its cursor. Without DuckDB the same SQL runs on SQLite
+(the analytics snapshot, when configured).
+"""
+import csv
+import importlib
+import math
+import os
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date
+from typing import Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from sqlalchemy import String, func, type_coerce
+from sqlmodel import Session, select
+
+from balancing import position_group
+from calibration import RATING_FIELDS
+from models import ActionStat, ChangeLog, Evaluation, Player
+from percentiles import age_band
+from weighting import STAT_FIELDS
+
+REBUILD_SECONDS = 3600
+GROUPINGS = ("none", "position_group", "age_band", "position")
+QUANTILES = (0.1, 0.25, 0.5, 0.75, 0.9)
+
+# columns copied into the columnar store, with their DuckDB types
+STORE_COLUMNS = {
+    "evaluation": [("id", "VARCHAR"), ("player_pk", "BIGINT"), ("event_pk", "BIGINT"), ("scout_name", "VARCHAR")]
+    + [(f"rating_{f}", "INTEGER") for f in RATING_FIELDS],
+    "actionstat": [("id", "VARCHAR"), ("player_pk", "BIGINT"), ("event_pk", "BIGINT"), ("minutes", "INTEGER")]
+    + [(f, "INTEGER") for f in STAT_FIELDS],
+}
+STORE_MODELS = {"evaluation": Evaluation, "actionstat": ActionStat}
+
+
+@dataclass
+class Metric:
+    table: str
+    value: str  # per-player SQL aggregate
+    weight: str  # aggregate compared with the minimum (minutes or evaluations)
+
+
+METRICS: Dict[str, Metric] = {
+    **{f"{f}_per90": Metric("actionstat", f"sum({f}) * 90.0 / sum(minutes)", "sum(minutes)") for f in STAT_FIELDS},
+    "minutes": Metric("actionstat", "sum(minutes)", "sum(minutes)"),
+    **{f"rating_{f}": Metric("evaluation", f"avg(rating_{f})", "count(*)") for f in RATING_FIELDS},
+}
+
+
+def duckdb_available() -> bool:
+    try:
+        importlib.import_module("duckdb")
+    except ImportError:
+        return False
+    return True
+
+
+class ColumnarStore:
+    def __init__(self):
+        import duckdb
+
+        self._db = duckdb.connect()
+        self._lock = threading.Lock()
+        self._cursor = 0
+        self._built_at = 0.0
+        for table, columns in STORE_COLUMNS.items():
+            self._db.execute(f"CREATE TABLE {table} ({', '.join(f'{c} {t}' for c, t in columns)})")
+
+    def _copy(self, table: str, rows) -> int:
+        """Bulk load through a CSV file: DuckDB's executemany is far slower than COPY."""
+        fd, path = tempfile.mkstemp(prefix=f"analytics-{table}-", suffix=".csv")
+        written = 0
+        try:
+            with os.fdopen(fd, "w", newline="") as handle:
+                writer = csv.writer(handle)
+                for row in rows:
+                    writer.writerow(["" if v is None else (v.hex if isinstance(v, UUID) else v) for v in row])
+                    written += 1
+            # COPY rejects an empty file (empty table, or every changed row deleted)
+            if written:
+                self._db.execute(f"COPY {table} FROM '{path}' (HEADER false)")
+        finally:
+            os.remove(path)
+        return written
+
+    def _select(self, table: str):
+        model = STORE_MODELS[table]
+        # ids as stored (32 hex digits in SQLite): converting a million UUIDs doubles the load time
+        columns = [type_coerce(model.id, String).label("id")]
+        columns += [getattr(model, c) for c, _ in STORE_COLUMNS[table][1:]]
+        return select(*columns)
+
+    def _rebuild(self, session: Session) -> None:
+        # cursor first: changes committed during the copy are applied again by the next refresh
+        self._cursor = session.exec(select(func.max(ChangeLog.pk))).one() or 0
+        for table in STORE_COLUMNS:
+            self._db.execute(f"DELETE FROM {table}")
+            self._copy(table, session.connection().execute(self._select(table)))
+        self._built_at = time.monotonic()
+
+    def refresh(self, session: Session) -> int:
+        """Apply the change log since the last refresh; returns the number of changed rows."""
+        with self._lock:
+            oldest = session.exec(select(func.min(ChangeLog.pk))).one()
+            purged = oldest is not None and oldest > self._cursor + 1 and self._built_at > 0
+            if not self._built_at or purged or time.monotonic() - self._built_at > REBUILD_SECONDS:
+                self._rebuild(session)
+                return -1
+            # every table is read from the same starting cursor; advancing it per table
+            # would skip earlier records of the tables applied later
+            start, cursor, changed = self._cursor, self._cursor, 0
+            for table, model in STORE_MODELS.items():
+                rows = session.exec(
+                    select(ChangeLog.pk, ChangeLog.entity_id)
+                    .where(ChangeLog.entity == table, ChangeLog.pk > start)
+                    .order_by(ChangeLog.pk)
+                ).all()
+                if not rows:
+                    continue
+                ids = list({row.entity_id for row in rows})
+                self._db.execute(f"DELETE FROM {table} WHERE id IN (SELECT unnest(?))", [[i.hex for i in ids]])
+                self._copy(table, session.connection().execute(self._select(table).where(model.id.in_(ids))))
+                cursor = max(cursor, rows[-1].pk)
+                changed += len(ids)
+            self._cursor = cursor
+            return changed
+
+    def query(self, sql: str, params: Sequence) -> List[tuple]:
+        with self._lock:
+            return self._db.execute(sql, list(params)).fetchall()
+
+
+_store: Optional[ColumnarStore] = None
+_store_lock = threading.Lock()
+
+
+def columnar_store(session: Session) -> Optional[ColumnarStore]:
+    """The process-wide DuckDB store, brought up to date; None without DuckDB."""
+    global _store
+    if not duckdb_available():
+        return None
+    with _store_lock:
+        if _store is None:
+            _store = ColumnarStore()
+    _store.refresh(session)
+    return _store
+
+
+def run_query(session: Session, sql: str, params: Sequence) -> Tuple[List[tuple], str]:
+    """Rows of `sql` (qmark parameters, table names as in SQLite) and the backend that ran it."""
+    store = columnar_store(session)
+    if store is not None:
+        return store.query(sql, params), "duckdb"
+    return session.connection().exec_driver_sql(sql, tuple(params)).fetchall(), "sqlite"
+
+
+def player_values(
+    session: Session, metric: str, event_pk: Optional[int] = None, minimum: float = 0
+) -> Tuple[List[Tuple[int, float]], str]:
+    """(player_pk, value) of every player whose weight (minutes or evaluations) reaches `minimum`."""
+    m = METRICS[metric]
+    where, params = ["player_pk IS NOT NULL"], []
+    if event_pk is not None:
+        where.append("event_pk = ?")
+        params.append(event_pk)
+    # a stat row without minutes must not divide by zero
+    having = f"{m.weight} >= ? AND {m.weight} > 0"
+    params.append(minimum)
+    sql = (
+        f"SELECT player_pk, {m.value} FROM {m.table} WHERE {' AND '.join(where)} "
+        f"GROUP BY player_pk HAVING {having}"
+    )
+    rows, backend = run_query(session, sql, params)
+    return [(pk, float(value)) for pk, value in rows], backend
+
+
+def group_keys(session: Session, group_by: str) -> Dict[int, Optional[str]]:
+    """Group of every player by pk; one scan of the player table."""
+    if group_by == "none":
+        return {}
+    year = date.today().year
+    keys = {}
+    for pk, position, birthdate in session.exec(select(Player.pk, Player.position, Player.birthdate)).all():
+        if group_by == "position_group":
+            keys[pk] = position_group(position)
+        elif group_by == "age_band":
+            keys[pk] = age_band(birthdate, year)
+        else:
+            keys[pk] = (position or "").strip().upper() or None
+    return keys
+
+
+def quantile(ordered: List[float], q: float) -> float:
+    """Linear interpolation between the closest ranks (numpy's default)."""
+    position = (len(ordered) - 1) * q
+    low = math.floor(position)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+
+def summarize(values: List[float], bins: int) -> dict:
+    ordered = sorted(values)
+    n = len(ordered)
+    mean = sum(ordered) / n
+    sd = math.sqrt(sum((v - mean) ** 2 for v in ordered) / (n - 1)) if n > 1 else 0.0
+    low, high = ordered[0], ordered[-1]
+    width = (high - low) / bins if high > low else 1.0
+    counts = [0] * bins
+    for v in ordered:
+        counts[min(int((v - low) / width), bins - 1)] += 1
+    return {
+        "players": n,
+        "mean": round(mean, 4),
+        "sd": round(sd, 4),
+        "min": round(low, 4),
+        "max": round(high, 4),
+        "quantiles": {f"p{round(q * 100)}": round(quantile(ordered, q), 4) for q in QUANTILES},
+        "histogram": [
+            {"from": round(low + i * width, 4), "to": round(low + (i + 1) * width, 4), "count": c}
+            for i, c in enumerate(counts)
+        ],
+    }
+
+
+def distributions(
+    session: Session,
+    metric: str,
+    group_by: str = "none",
+    event_pk: Optional[int] = None,
+    minimum: float = 0,
+    bins: int = 10,
+) -> dict:
+    started = time.perf_counter()
+    values, backend = player_values(session, metric, event_pk, minimum)
+    keys = group_keys(session, group_by)
+    groups: Dict[Optional[str], List[float]] = {}
+    for pk, value in values:
+        groups.setdefault(keys.get(pk), []).append(value)
+    return {
+        "metric": metric,
+        "groupBy": group_by,
+        "backend": backend,
+        "groups": [
+            {"group": key, **summarize(vals, bins)}
+            for key, vals in sorted(groups.items(), key=lambda item: (item[0] is None, item[0] or ""))
+        ],
+        "tookMs": round((time.perf_counter() - started) * 1000, 1),
+    }
+
+
+def scout_averages(session: Session, event_pk: Optional[int] = None) -> dict:
+    """Evaluations per scout with mean and sd of every rating field (raw, before calibration)."""
+    started = time.perf_counter()
+    where, params = ("WHERE event_pk = ?", [event_pk]) if event_pk is not None else ("", [])
+    aggregates = ", ".join(f"avg(rating_{f}), avg(rating_{f} * rating_{f})" for f in RATING_FIELDS)
+    rows, backend = run_query(
+        session,
+        f"SELECT scout_name, count(*), {aggregates} FROM evaluation {where} GROUP BY scout_name ORDER BY count(*) DESC",
+        params,
+    )
+    scouts = []
+    for row in rows:
+        name, count, moments = row[0], row[1], row[2:]
+        ratings = {}
+        for i, f in enumerate(RATING_FIELDS):
+            mean, square = float(moments[2 * i]), float(moments[2 * i + 1])
+            ratings[f] = {"mean": round(mean, 3), "sd": round(math.sqrt(max(0.0, square - mean * mean)), 3)}
+        scouts.append({"scout": name, "evaluations": count, "ratings": ratings})
+    return {"backend": backend, "scouts": scouts, "tookMs": round((time.perf_counter() - started) * 1000, 1)}
@@ -0,0 +1,217 @@
+"""
+Availability of pitches, teams and players over game intervals.
+
+A game occupies [kickoff, kickoff + duration) on its pitch, for both of its
+teams and for every player in its lineup or on the roster of one of its teams.
+
+- Write-time checks (find_conflicts) query the database. Games are indexed by
+  (pitch_pk, kickoff), (team_a_pk, kickoff) and (team_b_pk, kickoff), and no
+  game is longer than MAX_GAME_MINUTES. So the games overlapping an interval
+  are one index range seek on kickoff in (start - MAX_GAME_MINUTES, end) per
+  resource: O(log n), kept current by SQLite on every write and shared by all
+  worker processes.
+- The tournament report (tournament_conflicts) loads the games once and builds
+  a scheduling.IntervalIndex per pitch, team and player.
+"""
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlmodel import Session, or_, select
+
+from models import Game, GameLineup, Player, RosterEntry, Team, VenuePitch
+from scheduling import DEFAULT_GAME_MINUTES, IntervalIndex
+
+# upper bound of duration_minutes; bounds the kickoff range an overlap query has to look at
+MAX_GAME_MINUTES = 240
+
+
+def game_end(kickoff: datetime, minutes: Optional[int]) -> datetime:
+    return kickoff + timedelta(minutes=minutes or DEFAULT_GAME_MINUTES)
+
+
+GAME_SLOT_COLUMNS = (
+    Game.pk,
+    Game.id,
+    Game.tournament_id,
+    Game.kickoff,
+    Game.duration_minutes,
+    Game.pitch_pk,
+    Game.team_a_pk,
+    Game.team_b_pk,
+)
+
+
+def _in_window(query, start: datetime, end: datetime):
+    return query.where(Game.kickoff > start - timedelta(minutes=MAX_GAME_MINUTES), Game.kickoff < end)
+
+
+def _conflict(kind: str, resource_id, row, start: datetime, end: datetime) -> dict:
+    other_end = game_end(row.kickoff, row.duration_minutes)
+    return {
+        "kind": kind,
+        "resourceId": str(resource_id),
+        "gameId": str(row.id),
+        "tournamentId": str(row.tournament_id),
+        "kickoff": row.kickoff.isoformat(),
+        "end": other_end.isoformat(),
+        "overlapStart": max(start, row.kickoff).isoformat(),
+        "overlapEnd": min(end, other_end).isoformat(),
+    }
+
+
+def find_conflicts(
+    session: Session,
+    kickoff: datetime,
+    minutes: Optional[int],
+    pitch_pk: Optional[int] = None,
+    team_pks: Iterable[int] = (),
+    player_pks: Iterable[int] = (),
+    exclude_game_pk: Optional[int] = None,
+) -> List[dict]:
+    """
+    Games overlapping [kickoff, kickoff + minutes) on the pitch, for one of
+    the teams or for one of the players, as conflict dicts (kind pitch | team |
+    player). exclude_game_pk is the game being updated. Players only count
+    through lineups and through rosters of teams other than `team_pks`, and
+    not in games that already conflict through a team.
+    """
+    start, end = kickoff, game_end(kickoff, minutes)
+    team_pks = {t for t in team_pks if t is not None}
+    player_pks = {p for p in player_pks if p is not None}
+
+    def overlapping(query):
+        if exclude_game_pk is not None:
+            query = query.where(Game.pk != exclude_game_pk)
+        return [
+            row for row in session.exec(_in_window(query, start, end)).all()
+            if game_end(row.kickoff, row.duration_minutes) > start
+        ]
+
+    conflicts = []
+    team_games = set()
+    if pitch_pk is not None:
+        pitch_id = session.exec(select(VenuePitch.id).where(VenuePitch.pk == pitch_pk)).first()
+        for row in overlapping(select(*GAME_SLOT_COLUMNS).where(Game.pitch_pk == pitch_pk)):
+            conflicts.append(_conflict("pitch", pitch_id, row, start, end))
+    if team_pks:
+        team_ids = dict(session.exec(select(Team.pk, Team.id).where(Team.pk.in_(team_pks))).all())
+        query = select(*GAME_SLOT_COLUMNS).where(or_(Game.team_a_pk.in_(team_pks), Game.team_b_pk.in_(team_pks)))
+        for row in overlapping(query):
+            team_games.add(row.pk)
+            for team_pk in {row.team_a_pk, row.team_b_pk} & team_pks:
+                conflicts.append(_conflict("team", team_ids.get(team_pk), row, start, end))
+    if player_pks:
+        busy: Dict[int, Tuple[Any, Set[int]]] = {}
+        lineup_query = (
+            select(*GAME_SLOT_COLUMNS, GameLineup.player_pk)
+            .join(GameLineup, GameLineup.game_pk == Game.pk)
+            .where(GameLineup.player_pk.in_(player_pks))
+        )
+        for row in overlapping(lineup_query):
+            busy.setdefault(row.pk, (row, set()))[1].add(row.player_pk)
+        rosters: Dict[int, Set[int]] = {}
+        for team_pk, player_pk in session.exec(
+            select(RosterEntry.team_pk, RosterEntry.player_pk).where(RosterEntry.player_pk.in_(player_pks))
+        ).all():
+            if team_pk not in team_pks:
+                rosters.setdefault(team_pk, set()).add(player_pk)
+        if rosters:
+            query = select(*GAME_SLOT_COLUMNS).where(
+                or_(Game.team_a_pk.in_(list(rosters)), Game.team_b_pk.in_(list(rosters)))
+            )
+            for row in overlapping(query):
+                players = rosters.get(row.team_a_pk, set()) | rosters.get(row.team_b_pk, set())
+                busy.setdefault(row.pk, (row, set()))[1].update(players)
+        for game_pk in team_games:
+            busy.pop(game_pk, None)
+        if busy:
+            wanted = set().union(*(players for _, players in busy.values()))
+            player_ids = dict(session.exec(select(Player.pk, Player.id).where(Player.pk.in_(wanted))).all())
+            for row, players in busy.values():
+                for player_pk in sorted(players):
+                    conflicts.append(_conflict("player", player_ids.get(player_pk), row, start, end))
+    return conflicts
+
+
+def tournament_conflicts(session: Session, tournament_pk: int) -> List[dict]:
+    """
+    All overlapping pairs of games that involve a game of the tournament: on
+    the same pitch (including games of other tournaments there), with a
+    common team, or with a common player (lineup or roster) who is not
+    already covered by a common team.
+    """
+    games = {
+        row.pk: row
+        for row in session.exec(
+            select(*GAME_SLOT_COLUMNS).where(Game.tournament_pk == tournament_pk, Game.kickoff.is_not(None))
+        ).all()
+    }
+    if not games:
+        return []
+    own = set(games)
+    pitch_pks = {row.pitch_pk for row in games.values() if row.pitch_pk is not None}
+    if pitch_pks:
+        first = min(row.kickoff for row in games.values())
+        last = max(game_end(row.kickoff, row.duration_minutes) for row in games.values())
+        query = _in_window(select(*GAME_SLOT_COLUMNS).where(Game.pitch_pk.in_(pitch_pks)), first, last)
+        for row in session.exec(query).all():
+            games.setdefault(row.pk, row)
+
+    team_pks = {t for row in games.values() for t in (row.team_a_pk, row.team_b_pk) if t is not None}
+    roster: Dict[int, Set[int]] = {}
+    for team_pk, player_pk in session.exec(
+        select(RosterEntry.team_pk, RosterEntry.player_pk).where(RosterEntry.team_pk.in_(team_pks))
+    ).all():
+        roster.setdefault(team_pk, set()).add(player_pk)
+    lineup: Dict[int, Set[int]] = {}
+    for game_pk, player_pk in session.exec(
+        select(GameLineup.game_pk, GameLineup.player_pk).where(GameLineup.game_pk.in_(list(games)))
+    ).all():
+        lineup.setdefault(game_pk, set()).add(player_pk)
+
+    indexes: Dict[Tuple[str, int], IntervalIndex] = {}
+    for row in games.values():
+        start, end = row.kickoff, game_end(row.kickoff, row.duration_minutes)
+        teams = {t for t in (row.team_a_pk, row.team_b_pk) if t is not None}
+        resources = [("pitch", row.pitch_pk)] if row.pitch_pk is not None else []
+        if row.pk in own:
+            resources += [("team", t) for t in teams]
+            players = set(lineup.get(row.pk, ()))
+            for t in teams:
+                players |= roster.get(t, set())
+            resources += [("player", p) for p in players]
+        for resource in resources:
+            indexes.setdefault(resource, IntervalIndex()).add(start, end, row.pk)
+
+    pairs: Dict[Tuple[str, int, int, int], Tuple[datetime, datetime]] = {}
+    team_pairs = set()
+    for (kind, resource_pk), index in sorted(indexes.items(), key=lambda item: ("pitch", "team", "player").index(item[0][0])):
+        for start, end, game_pk in index:
+            for other_start, other_end, other_pk in index.overlapping(start, end):
+                if other_pk <= game_pk or (game_pk not in own and other_pk not in own):
+                    continue
+                if kind == "team":
+                    team_pairs.add((game_pk, other_pk))
+                elif kind == "player" and (game_pk, other_pk) in team_pairs:
+                    continue
+                pairs[(kind, resource_pk, game_pk, other_pk)] = (max(start, other_start), min(end, other_end))
+
+    resource_ids = {
+        "pitch": dict(session.exec(select(VenuePitch.pk, VenuePitch.id).where(VenuePitch.pk.in_(pitch_pks))).all()),
+        "team": dict(session.exec(select(Team.pk, Team.id).where(Team.pk.in_(team_pks))).all()),
+        "player": {},
+    }
+    player_pks = {key[1] for key in pairs if key[0] == "player"}
+    if player_pks:
+        resource_ids["player"] = dict(session.exec(select(Player.pk, Player.id).where(Player.pk.in_(player_pks))).all())
+    return [
+        {
+            "kind": kind,
+            "resourceId": str(resource_ids[kind].get(resource_pk)),
+            "gameIds": [str(games[game_pk].id), str(games[other_pk].id)],
+            "tournamentIds": [str(games[game_pk].tournament_id), str(games[other_pk].tournament_id)],
+            "overlapStart": overlap[0].isoformat(),
+            "overlapEnd": overlap[1].isoformat(),
+        }
+        for (kind, resource_pk, game_pk, other_pk), overlap in sorted(pairs.items(), key=lambda item: item[1][0])
+    ]
@@ -0,0 +1,15 @@
+from sqlmodel import Session
+
+from db import engine, migrate
+from scoring import backfill_score_history
+
+
+def main():
+    migrate()
+    with Session(engine) as session:
+        written = backfill_score_history(session)
+    print(f"{written} Score-Snapshots geschrieben.")
+
+
+if __name__ == "__main__":
+    main()
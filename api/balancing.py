@@ -0,0 +1,206 @@
+"""
+Splitting a player pool into balanced teams (scouting days).
+
+Pure code (no database, no FastAPI), like scheduling.py: the tournaments router
+loads the participants with their score, position and age, calls
+balance_teams() and writes the rosters in one transaction.
+
+- Cost of a split: per team the squared deviation of the mean score and the
+  mean age from the pool mean, plus the squared deviation of the number of
+  players per position group (TW, Abwehr, Mittelfeld, Angriff) from an even
+  share. Team sizes differ by at most one.
+- Greedy start: scarce position groups first, strongest players first, each
+  into the smallest team with the fewest players of that group and the lowest
+  score total.
+- Local search: per pair of teams the best swap of two players, repeated
+  while one lowers the cost. The cost change of a swap has a closed form in
+  the two players and the two teams' totals, so a pass over all pairs is
+  O(n²/teams) cheap float operations.
+"""
+from dataclasses import dataclass, field
+from typing import Dict, Hashable, List, Optional, Sequence
+
+POSITION_GROUPS = {
+    "TW": "TW",
+    "IV": "DEF",
+    "RV": "DEF",
+    "LV": "DEF",
+    "DM": "MID",
+    "ZM": "MID",
+    "OM": "MID",
+    "RA": "ATT",
+    "LA": "ATT",
+    "ST": "ATT",
+}
+# weights of the cost terms; score and age are on different scales (0-100 vs. years)
+SCORE_WEIGHT = 1.0
+AGE_WEIGHT = 4.0
+POSITION_WEIGHT = 25.0
+MAX_PASSES = 50
+
+
+class BalanceError(ValueError):
+    """Input the balancer cannot work with (fewer players than teams)."""
+
+
+def position_group(position: Optional[str]) -> Optional[str]:
+    return POSITION_GROUPS.get((position or "").strip().upper())
+
+
+@dataclass
+class Candidate:
+    id: Hashable
+    score: float
+    age: float
+    position: Optional[str] = None
+
+    @property
+    def group(self) -> Optional[str]:
+        return position_group(self.position)
+
+
+@dataclass
+class _Team:
+    players: List[Candidate] = field(default_factory=list)
+    score: float = 0.0
+    age: float = 0.0
+    groups: Dict[str, int] = field(default_factory=dict)
+
+    def add(self, c: Candidate) -> None:
+        self.players.append(c)
+        self.score += c.score
+        self.age += c.age
+        if c.group:
+            self.groups[c.group] = self.groups.get(c.group, 0) + 1
+
+
+class Balancer:
+    def __init__(self, candidates: Sequence[Candidate], team_count: int):
+        if team_count < 2:
+            raise BalanceError("At least two teams are needed")
+        if len(candidates) < team_count:
+            raise BalanceError(f"{len(candidates)} players cannot fill {team_count} teams")
+        self.candidates = list(candidates)
+        self.teams = [_Team() for _ in range(team_count)]
+        n = len(self.candidates)
+        self.mean_score = sum(c.score for c in self.candidates) / n
+        self.mean_age = sum(c.age for c in self.candidates) / n
+        self.group_totals: Dict[str, int] = {}
+        for c in self.candidates:
+            if c.group:
+                self.group_totals[c.group] = self.group_totals.get(c.group, 0) + 1
+        self.share = {g: total / n for g, total in self.group_totals.items()}
+
+    def team_cost(self, size: int, score: float, age: float, groups: Dict[str, int]) -> float:
+        cost = SCORE_WEIGHT * (score / size - self.mean_score) ** 2 + AGE_WEIGHT * (age / size - self.mean_age) ** 2
+        for g, share in self.share.items():
+            cost += POSITION_WEIGHT * (groups.get(g, 0) - share * size) ** 2
+        return cost
+
+    def cost(self) -> float:
+        return sum(self.team_cost(len(t.players), t.score, t.age, t.groups) for t in self.teams)
+
+    def greedy(self) -> None:
+        scarcity = {g: total for g, total in self.group_totals.items()}
+        order = sorted(
+            self.candidates,
+            key=lambda c: (scarcity.get(c.group, len(self.candidates) + 1), -c.score),
+        )
+        for c in order:
+            team = min(
+                self.teams,
+                key=lambda t: (len(t.players), t.groups.get(c.group, 0) if c.group else 0, t.score),
+            )
+            team.add(c)
+
+    def _moves(self, a: _Team, b: _Team) -> Dict[Optional[str], float]:
+        """Position cost of moving one player of each group from a to b."""
+        na, nb = len(a.players), len(b.players)
+        moves: Dict[Optional[str], float] = {None: 0.0}
+        for g, share in self.share.items():
+            dev_a = a.groups.get(g, 0) - share * na
+            dev_b = b.groups.get(g, 0) - share * nb
+            moves[g] = POSITION_WEIGHT * (2 - 2 * dev_a + 2 * dev_b)
+        return moves
+
+    def _best_swap(self, a: _Team, b: _Team):
+        """
+        (delta, i, j) of the best swap of a.players[i] and b.players[j], None if
+        none lowers the cost. Moving d = x.score - y.score from a to b changes
+        the score term by w·d·(d·(1/na² + 1/nb²) - 2·(dev_a/na - dev_b/nb)),
+        likewise for age; the position term only changes for different groups.
+        """
+        na, nb = len(a.players), len(b.players)
+        k = 1 / na ** 2 + 1 / nb ** 2
+        c_score = 2 * ((a.score / na - self.mean_score) / na - (b.score / nb - self.mean_score) / nb)
+        c_age = 2 * ((a.age / na - self.mean_age) / na - (b.age / nb - self.mean_age) / nb)
+        a_to_b, b_to_a = self._moves(a, b), self._moves(b, a)
+        best = None
+        best_delta = -1e-9
+        ys = [(j, y.score, y.age, y.group) for j, y in enumerate(b.players)]
+        for i, x in enumerate(a.players):
+            xs, xa, xg = x.score, x.age, x.group
+            move_x = a_to_b[xg]
+            for j, ys_, ya, yg in ys:
+                d = xs - ys_
+                e = xa - ya
+                delta = SCORE_WEIGHT * d * (d * k - c_score) + AGE_WEIGHT * e * (e * k - c_age)
+                if xg != yg:
+                    delta += move_x + b_to_a[yg]
+                if delta < best_delta:
+                    best_delta, best = delta, (i, j)
+        return None if best is None else (best_delta, *best)
+
+    def _swap(self, a: _Team, b: _Team, i: int, j: int) -> None:
+        x, y = a.players[i], b.players[j]
+        a.players[i], b.players[j] = y, x
+        a.score += y.score - x.score
+        b.score += x.score - y.score
+        a.age += y.age - x.age
+        b.age += x.age - y.age
+        if x.group != y.group:
+            for team, out, into in ((a, x, y), (b, y, x)):
+                if out.group:
+                    team.groups[out.group] -= 1
+                if into.group:
+                    team.groups[into.group] = team.groups.get(into.group, 0) + 1
+
+    def improve(self, max_passes: int = MAX_PASSES) -> int:
+        """Best swap per pair of teams until a full pass finds none; returns the number of swaps."""
+        swaps = 0
+        for _ in range(max_passes):
+            improved = False
+            for ia, a in enumerate(self.teams):
+                for b in self.teams[ia + 1:]:
+                    found = self._best_swap(a, b)
+                    if found is not None:
+                        self._swap(a, b, found[1], found[2])
+                        swaps += 1
+                        improved = True
+            if not improved:
+                break
+        return swaps
+
+
+@dataclass
+class BalancedTeam:
+    players: List[Candidate]
+    avg_score: float
+    avg_age: float
+    positions: Dict[str, int]
+
+
+def balance_teams(candidates: Sequence[Candidate], team_count: int) -> List[BalancedTeam]:
+    balancer = Balancer(candidates, team_count)
+    balancer.greedy()
+    balancer.improve()
+    return [
+        BalancedTeam(
+            # goalkeepers first, then by score, so roster numbers come out in a sensible order
+            players=sorted(t.players, key=lambda c: (c.group != "TW", -c.score)),
+            avg_score=t.score / len(t.players),
+            avg_age=t.age / len(t.players),
+            positions=dict(sorted(t.groups.items())),
+        )
+        for t in balancer.teams
+    ]
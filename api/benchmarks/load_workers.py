@@ -0,0 +1,176 @@
+"""
+Load benchmark: read endpoint throughput vs. number of worker processes.
+
+Seeds a temporary database, starts `serve.py` with WEB_CONCURRENCY=1, 2, 4 ...
+and drives it with client processes on keep-alive connections (player
+profile, score, batch lookup and the cached tournament list). Reports
+requests/s per worker count and the speedup over one worker.
+
+    cd api && python benchmarks/load_workers.py --workers 1,2,4 --clients 8
+
+Client and server share the machine: scaling is bounded by the cores left
+after the clients, so run it on a box with more cores than workers.
+"""
+import argparse
+import http.client
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+API_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def seed(db_path: str, players: int, rows: int) -> None:
+    """Runs in a subprocess so DATABASE_URL is read before db is imported."""
+    code = f"""
+import random, sys
+sys.path.insert(0, {API_DIR!r})
+from sqlmodel import Session
+from db import engine, migrate
+from models import ActionStat, Evaluation, Player, Tournament
+from scoring import backfill_score_history
+from seeding import seed_players
+migrate()
+rnd = random.Random(3)
+with Session(engine) as session:
+    events = [Tournament(name=f"Event {{i}}", country="DE") for i in range(10)]
+    session.add_all(events)
+    session.commit()
+    seed_players(session, count={players}, min_age=10, max_age=40)
+    from sqlmodel import select
+    for p in session.exec(select(Player)).all():
+        for _ in range({rows}):
+            ev = rnd.choice(events)
+            session.add(Evaluation(event_id=ev.id, player_id=p.id, rating_technique=rnd.randint(1, 5)))
+            session.add(ActionStat(event_id=ev.id, player_id=p.id, minutes=90, goals=rnd.randint(0, 2)))
+    session.commit()
+    backfill_score_history(session)
+"""
+    env = {**os.environ, "DATABASE_URL": f"sqlite:///{db_path}"}
+    subprocess.run([sys.executable, "-c", code], env=env, check=True)
+
+
+def player_ids(db_path: str):
+    import sqlite3
+
+    conn = sqlite3.connect(db_path)
+    ids = [row[0] for row in conn.execute("SELECT id FROM player")]
+    conn.close()
+    # stored as 32 hex chars
+    return [f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}" for h in ids]
+
+
+def start_server(db_path: str, workers: int, port: int):
+    env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite:///{db_path}",
+        "WEB_CONCURRENCY": str(workers),
+        "PORT": str(port),
+        "HOST": "127.0.0.1",
+    }
+    proc = subprocess.Popen(
+        [sys.executable, os.path.join(API_DIR, "serve.py")],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            conn.request("GET", "/health")
+            if conn.getresponse().status == 200:
+                # all workers must be up, not just the first one
+                time.sleep(1 + 0.5 * workers)
+                return proc
+        except OSError:
+            time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError("server did not start")
+
+
+def client(args):
+    port, ids, requests, seed_value = args
+    rnd = random.Random(seed_value)
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    errors = 0
+    for _ in range(requests):
+        pick = rnd.random()
+        if pick < 0.4:
+            path = f"/players/{rnd.choice(ids)}/profile"
+        elif pick < 0.7:
+            path = f"/players/{rnd.choice(ids)}/score"
+        elif pick < 0.9:
+            path = "/players?ids=" + ",".join(rnd.sample(ids, 20))
+        else:
+            path = "/tournaments"
+        conn.request("GET", path)
+        response = conn.getresponse()
+        response.read()
+        if response.status != 200:
+            errors += 1
+    conn.close()
+    return errors
+
+
+def run_load(port: int, ids, clients: int, requests: int) -> tuple:
+    per_client = requests // clients
+    with multiprocessing.Pool(clients) as pool:
+        # warm-up: fill caches and connection pools of every worker
+        pool.map(client, [(port, ids, 20, i) for i in range(clients)])
+        start = time.perf_counter()
+        errors = sum(pool.map(client, [(port, ids, per_client, 100 + i) for i in range(clients)]))
+        elapsed = time.perf_counter() - start
+    return per_client * clients / elapsed, errors
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", default="1,2,4", help="comma separated worker counts")
+    parser.add_argument("--clients", type=int, default=8, help="client processes")
+    parser.add_argument("--requests", type=int, default=4000)
+    parser.add_argument("--players", type=int, default=2000)
+    parser.add_argument("--rows", type=int, default=5, help="evaluations and stats per player")
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    try:
+        db_path = os.path.join(tmp, "load.sqlite")
+        seed(db_path, args.players, args.rows)
+        ids = player_ids(db_path)
+        results = []
+        for workers in [int(w) for w in args.workers.split(",")]:
+            port = free_port()
+            proc = start_server(db_path, workers, port)
+            try:
+                rps, errors = run_load(port, ids, args.clients, args.requests)
+            finally:
+                proc.terminate()
+                proc.wait(30)
+            results.append((workers, rps, errors))
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    base = results[0][1] / results[0][0]
+    print(f"{os.cpu_count()} CPUs, {args.clients} client processes, {args.requests} requests per run")
+    print(f"{'workers':>8}{'req/s':>10}{'speedup':>10}{'per worker':>12}{'errors':>8}")
+    for workers, rps, errors in results:
+        print(f"{workers:>8}{rps:>10.0f}{rps / results[0][1]:>10.2f}{rps / workers / base:>12.0%}{errors:>8}")
+    print(json.dumps({str(w): round(r, 1) for w, r, _ in results}))
+
+
+if __name__ == "__main__":
+    main()
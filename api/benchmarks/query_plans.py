@@ -0,0 +1,188 @@
+"""
+EXPLAIN QUERY PLAN check for the hot queries of the API.
+
+Builds the schema in an in-memory SQLite database and fails (exit code 1)
+if any of the listed queries does a full table scan or needs a temp b-tree
+for its ORDER BY.
+
+    cd api && python benchmarks/query_plans.py
+"""
+import os
+import sys
+from datetime import date, datetime
+from uuid import uuid4
+
+from sqlalchemy import create_engine, func, or_
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from sqlmodel import SQLModel, select  # noqa: E402
+
+from db import key_of  # noqa: E402
+from models import (  # noqa: E402
+    ActionStat,
+    ChangeLog,
+    Evaluation,
+    Game,
+    GameAction,
+    GameLineup,
+    GameVideo,
+    Job,
+    Player,
+    PlayerProfile,
+    RosterEntry,
+    ScoreSnapshot,
+    Shortlist,
+    ShortlistEntry,
+    Team,
+    Tournament,
+    TournamentParticipant,
+    VenuePitch,
+)
+
+
+def hot_queries():
+    pid, eid, vid = uuid4(), uuid4(), uuid4()
+    queries = {
+        "list_players": select(Player).order_by(Player.created_at.desc()),
+        "seed_players duplicate probe": select(Player).where(
+            Player.first_name == "a", Player.last_name == "b", Player.birthdate == date(2000, 1, 1)
+        ),
+        "get by public id": select(Player).where(Player.id == pid),
+        "list_tournaments": select(Tournament).order_by(Tournament.created_at.desc()),
+        "tournaments by venue": select(Tournament).where(Tournament.venue_pk == 1),
+        "teams by tournament": select(Team).where(Team.tournament_pk == 1),
+        "roster by team": select(RosterEntry).where(RosterEntry.team_pk == 1),
+        "roster number check": select(RosterEntry).where(RosterEntry.team_pk == 1, RosterEntry.number == "7"),
+        "participants by tournament": select(TournamentParticipant).where(TournamentParticipant.tournament_pk == 1),
+        "games by tournament": select(Game).where(Game.tournament_pk == key_of(Tournament, eid)),
+        "games by team": select(Game).where(or_(Game.team_a_pk == 1, Game.team_b_pk == 1)),
+        "lineup by game": select(GameLineup).where(GameLineup.game_pk == 1),
+        "videos by game": select(GameVideo).where(GameVideo.game_pk == 1),
+        "pitches by venue": select(VenuePitch).where(VenuePitch.venue_pk == 1),
+        "list_evaluations": select(Evaluation)
+        .where(Evaluation.player_pk == key_of(Player, pid))
+        .order_by(Evaluation.created_at.desc()),
+        "score evaluations": select(Evaluation).where(Evaluation.player_pk == 1),
+        "score evaluations by event": select(Evaluation).where(
+            Evaluation.player_pk == 1, Evaluation.event_pk == key_of(Tournament, eid)
+        ),
+        "score stats": select(ActionStat).where(ActionStat.player_pk == 1),
+        "score stats by event": select(ActionStat).where(
+            ActionStat.player_pk == 1, ActionStat.event_pk == key_of(Tournament, eid)
+        ),
+        "score history": select(ScoreSnapshot)
+        .where(ScoreSnapshot.player_pk == 1, ScoreSnapshot.model == "v1")
+        .order_by(ScoreSnapshot.event_date),
+        "score snapshot refresh": select(Evaluation).where(Evaluation.player_pk == 1, Evaluation.event_pk == 1),
+        "import player match": select(Player.pk).where(
+            Player.first_name.in_(["a", "c"]), Player.last_name.in_(["b", "d"]), Player.birthdate.in_([date(2000, 1, 1)])
+        ),
+        "import stat upsert probe": select(ActionStat.pk)
+        .where(ActionStat.player_pk.in_([1, 2]), ActionStat.event_pk.in_([1]))
+        .order_by(ActionStat.pk),
+        "export evaluations by player": select(Evaluation.player_pk)
+        .where(Evaluation.player_pk.is_not(None))
+        .order_by(Evaluation.player_pk),
+        "export stats by player": select(ActionStat.player_pk)
+        .where(ActionStat.player_pk.is_not(None))
+        .order_by(ActionStat.player_pk),
+        "job claim": select(Job.pk).where(Job.status == "queued").order_by(Job.pk).limit(1),
+        "schedule pitch occupancy": select(Game.pk, Game.kickoff).where(
+            Game.pitch_pk.in_([1, 2]), Game.kickoff >= datetime(2025, 6, 1), Game.kickoff <= datetime(2025, 6, 3)
+        ),
+        "conflicts by team": select(Game.pk, Game.kickoff).where(
+            or_(Game.team_a_pk.in_([1, 2]), Game.team_b_pk.in_([1, 2])),
+            Game.kickoff > datetime(2025, 6, 1, 6),
+            Game.kickoff < datetime(2025, 6, 1, 11),
+        ),
+        "conflicts by lineup": select(Game.pk, Game.kickoff)
+        .join(GameLineup, GameLineup.game_pk == Game.pk)
+        .where(GameLineup.player_pk.in_([1, 2]), Game.kickoff > datetime(2025, 6, 1, 6), Game.kickoff < datetime(2025, 6, 1, 11)),
+        "conflicts rosters by player": select(RosterEntry.team_pk).where(RosterEntry.player_pk.in_([1, 2])),
+        "similar index refresh": select(PlayerProfile.player_pk, Player.birthdate)
+        .join(Player, Player.pk == PlayerProfile.player_pk)
+        .where(PlayerProfile.model == "v1", PlayerProfile.revision > 100)
+        .order_by(PlayerProfile.revision),
+        "percentile index refresh": select(ScoreSnapshot.player_pk, Player.birthdate)
+        .join(Player, Player.pk == ScoreSnapshot.player_pk)
+        .where(ScoreSnapshot.model == "v1", ScoreSnapshot.revision > 100)
+        .order_by(ScoreSnapshot.revision),
+        "snapshot revision seed": select(func.max(ScoreSnapshot.revision)).where(ScoreSnapshot.model == "v1"),
+        "profile revision seed": select(func.max(PlayerProfile.revision)).where(PlayerProfile.model == "v1"),
+        "rankings": select(PlayerProfile.player_pk, Player.position)
+        .join(Player, Player.pk == PlayerProfile.player_pk)
+        .where(PlayerProfile.model == "v1")
+        .order_by(PlayerProfile.score.desc())
+        .limit(50),
+        "player profile refresh": select(Evaluation.player_pk, Evaluation.rating_impact).where(
+            Evaluation.player_pk.in_([1, 2])
+        ),
+        "shortlist members": select(ShortlistEntry.sort_order, Player.last_name, PlayerProfile.score)
+        .join(Player, Player.pk == ShortlistEntry.player_pk)
+        .outerjoin(PlayerProfile, (PlayerProfile.player_pk == Player.pk) & (PlayerProfile.model == "v1"))
+        .where(ShortlistEntry.shortlist_pk == 1)
+        .order_by(ShortlistEntry.sort_order),
+        "shortlist membership": select(ShortlistEntry).where(
+            ShortlistEntry.shortlist_pk == 1, ShortlistEntry.player_pk.in_([1, 2])
+        ),
+        "shortlists of player": select(Shortlist)
+        .join(ShortlistEntry, ShortlistEntry.shortlist_pk == Shortlist.pk)
+        .where(ShortlistEntry.player_pk == 1),
+        "shortlists by owner": select(Shortlist).where(Shortlist.owner == "a").order_by(Shortlist.name),
+        "changes after cursor": select(ChangeLog).where(ChangeLog.pk > 1).order_by(ChangeLog.pk),
+        "changes of entity": select(ChangeLog)
+        .where(ChangeLog.pk > 1, ChangeLog.entity == "player")
+        .order_by(ChangeLog.pk),
+        "changes of row": select(ChangeLog)
+        .where(ChangeLog.pk > 1, ChangeLog.entity_id == pid)
+        .order_by(ChangeLog.pk),
+        "change log retention": select(ChangeLog.pk).where(ChangeLog.created_at < datetime(2020, 1, 1)),
+        "shots of player in game": select(GameAction)
+        .where(GameAction.game_pk == 1, GameAction.player_pk == 1, GameAction.action == "shot")
+        .order_by(GameAction.second),
+        "game action timeline": select(GameAction).where(GameAction.game_pk == 1).order_by(GameAction.second),
+        "actions of player": select(GameAction).where(GameAction.player_pk == 1, GameAction.action == "shot"),
+        "game action rollup": select(GameAction.player_pk, GameAction.event_pk, func.count())
+        .where(GameAction.player_pk.in_([1, 2]), GameAction.event_pk.in_([1]))
+        .group_by(GameAction.player_pk, GameAction.event_pk, GameAction.game_pk),
+        "derived action stats": select(ActionStat.pk).where(
+            ActionStat.source == "game_actions", ActionStat.player_pk.in_([1, 2]), ActionStat.event_pk.in_([1])
+        ),
+    }
+    for model in (RosterEntry, TournamentParticipant, Evaluation, ActionStat, GameAction, GameLineup, ShortlistEntry):
+        queries[f"dedupe {model.__tablename__}"] = select(model).where(model.player_pk == 1)
+    return queries
+
+
+def explain(conn, stmt):
+    compiled = stmt.compile(dialect=conn.dialect, compile_kwargs={"render_postcompile": True})
+    params = tuple(None for _ in compiled.positiontup or ())
+    rows = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + str(compiled), params).fetchall()
+    return [row[-1] for row in rows]
+
+
+def is_bad(detail: str) -> bool:
+    if detail.startswith("SCAN") and "USING" not in detail:
+        return True
+    return "TEMP B-TREE" in detail
+
+
+def main() -> int:
+    engine = create_engine("sqlite://")
+    SQLModel.metadata.create_all(engine)
+    failures = 0
+    with engine.connect() as conn:
+        for name, stmt in hot_queries().items():
+            plan = explain(conn, stmt)
+            bad = [d for d in plan if is_bad(d)]
+            failures += bool(bad)
+            print(f"{'FAIL' if bad else 'ok  '} {name}: {' | '.join(plan)}")
+    if failures:
+        print(f"{failures} queries without a usable index")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
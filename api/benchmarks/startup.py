@@ -0,0 +1,195 @@
+"""
+Startup benchmark: import time and time to first request.
+
+1. `python -X importtime -c "import <module>"` for the app (main) and the
+   modules CLIs and jobs import (db, scoring, importer, exporter, jobs):
+   cumulative import time, and whether FastAPI was loaded along the way.
+2. Starts `uvicorn main:app` against a database in each state and measures the
+   time from process spawn until GET /health and GET /ready answer 200:
+   - current: schema already migrated (the normal restart / cold start)
+   - empty:   no database file yet (first deploy)
+   - legacy:  copy of api/db.sqlite, if present (old schema, full migration)
+
+With --ref the same numbers are taken for the api/ directory of a git revision
+(extracted with git archive) and printed next to the working tree:
+
+    cd api && python benchmarks/startup.py --runs 5 --ref HEAD~1
+"""
+import argparse
+import http.client
+import os
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+
+API_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+PACKAGES = ("fastapi", "sqlalchemy", "sqlmodel", "pydantic", "pydantic_settings")
+MODULES = ("main", "db", "scoring", "importer", "exporter", "jobs")
+
+
+def import_time(api_dir: str, module: str, env) -> tuple:
+    """(cumulative ms per package/module, fastapi loaded) for a fresh `import module`; None if it does not exist."""
+    if not os.path.exists(os.path.join(api_dir, f"{module}.py")):
+        return None
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import sys; sys.path.insert(0, {api_dir!r}); import {module}"],
+        env=env,
+        cwd=api_dir,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        name = name.strip()
+        if cumulative.strip().isdigit() and name not in times:
+            times[name] = int(cumulative) / 1000
+    return times, "fastapi" in times
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for(port: int, path: str, deadline: float) -> float:
+    while time.perf_counter() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            conn.request("GET", path)
+            if conn.getresponse().status == 200:
+                return time.perf_counter()
+        except OSError:
+            pass
+        time.sleep(0.005)
+    raise RuntimeError(f"{path} not ready")
+
+
+def time_to_first_request(api_dir: str, db_path: str) -> tuple:
+    port = free_port()
+    env = {**os.environ, "DATABASE_URL": f"sqlite:///{db_path}"}
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--app-dir", api_dir, "--port", str(port), "--log-level", "warning"],
+        env=env,
+        cwd=os.path.dirname(db_path),
+    )
+    try:
+        health = wait_for(port, "/health", start + 120) - start
+        ready = wait_for(port, "/ready", start + 120) - start
+    finally:
+        proc.terminate()
+        proc.wait(30)
+    return health, ready
+
+
+def prepare(api_dir: str, state: str, tmp: str) -> str:
+    db_path = os.path.join(tmp, f"{state}.sqlite")
+    for suffix in ("", "-wal", "-shm", ".migrate.lock"):
+        if os.path.exists(db_path + suffix):
+            os.remove(db_path + suffix)
+    if state == "legacy":
+        shutil.copy(os.path.join(API_DIR, "db.sqlite"), db_path)
+    elif state == "current":
+        env = {**os.environ, "DATABASE_URL": f"sqlite:///{db_path}"}
+        # trees before the split of main.py only have main.migrate
+        module = "db" if os.path.exists(os.path.join(api_dir, "db.py")) else "main"
+        code = f"import sys; sys.path.insert(0, {api_dir!r}); import {module}; {module}.migrate()"
+        subprocess.run([sys.executable, "-c", code], env=env, check=True)
+    return db_path
+
+
+def checkout(ref: str, tmp: str) -> str:
+    """api/ of a git revision, extracted to tmp; returns its path."""
+    repo = os.path.dirname(API_DIR)
+    archive = os.path.join(tmp, "ref.tar")
+    with open(archive, "wb") as handle:
+        subprocess.run(["git", "-C", repo, "archive", ref, "api"], stdout=handle, check=True)
+    with tarfile.open(archive) as tar:
+        tar.extractall(os.path.join(tmp, "ref"), filter="data")
+    return os.path.join(tmp, "ref", "api")
+
+
+def measure(trees: dict, states, runs: int, tmp: str) -> dict:
+    """Runs alternate between the trees, so load drift on the machine hits all of them alike."""
+    env = {**os.environ, "DATABASE_URL": f"sqlite:///{os.path.join(tmp, 'import.sqlite')}"}
+    samples = {label: {"imports": {}, "fastapi": {}, "requests": {}} for label in trees}
+    for _ in range(runs):
+        for label, api_dir in trees.items():
+            for module in MODULES:
+                measured = import_time(api_dir, module, env)
+                if measured is None:
+                    continue
+                times, loads_fastapi = measured
+                samples[label]["fastapi"][module] = loads_fastapi
+                for name in (module,) + PACKAGES if module == "main" else (module,):
+                    if name in times:
+                        key = f"{name} (main)" if name in PACKAGES else name
+                        samples[label]["imports"].setdefault(key, []).append(times[name])
+            for state in states:
+                timing = time_to_first_request(api_dir, prepare(api_dir, state, tmp))
+                samples[label]["requests"].setdefault(state, []).append(timing)
+    return {
+        label: {
+            "imports": {key: statistics.median(values) for key, values in sample["imports"].items()},
+            "fastapi": sample["fastapi"],
+            "requests": {
+                state: (
+                    statistics.median(t[0] for t in timings) * 1000,
+                    statistics.median(t[1] for t in timings) * 1000,
+                )
+                for state, timings in sample["requests"].items()
+            },
+        }
+        for label, sample in samples.items()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--ref", help="git revision to compare against, e.g. HEAD~1")
+    args = parser.parse_args()
+
+    states = ["current", "empty"]
+    if os.path.exists(os.path.join(API_DIR, "db.sqlite")):
+        states.append("legacy")
+    with tempfile.TemporaryDirectory() as tmp:
+        trees = {"working tree": API_DIR}
+        if args.ref:
+            trees = {args.ref: checkout(args.ref, tmp), **trees}
+        results = measure(trees, states, args.runs, tmp)
+
+    labels = list(results)
+    width = max(14, *(len(label) + 2 for label in labels))
+    print("import time (ms, median of cumulative; * = loads fastapi):")
+    print(f"  {'':26}" + "".join(f"{label:>{width}}" for label in labels))
+    keys = list(dict.fromkeys(key for r in results.values() for key in r["imports"]))
+    for key in keys:
+        cells = []
+        for label in labels:
+            value = results[label]["imports"].get(key)
+            loads = results[label]["fastapi"].get(key) and key != "main"
+            cells.append(f"{value:.0f}{'*' if loads else ''}" if value is not None else "-")
+        print(f"  {key:26}" + "".join(f"{cell:>{width}}" for cell in cells))
+
+    print("time to first request (ms, median, /health / /ready):")
+    print(f"  {'database':26}" + "".join(f"{label:>{width}}" for label in labels))
+    for state in states:
+        cells = [
+            "{:.0f} / {:.0f}".format(*results[label]["requests"][state]) for label in labels
+        ]
+        print(f"  {state:26}" + "".join(f"{cell:>{width}}" for cell in cells))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""
+Benchmark: UUID keys vs. integer surrogate keys.
+
+Builds two databases with identical data (players, evaluations, action
+stats): one with the old layout (UUID primary keys, UUID foreign key
+indexes, unique index on unique_id) and one from the current models
+(integer `pk`, `<name>_pk` foreign keys). Reports index/table sizes and
+timings for the joins the scoring endpoints do.
+
+    cd api && python benchmarks/surrogate_keys.py --players 20000 --rows 10
+"""
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from uuid import uuid4
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from sqlalchemy import create_engine  # noqa: E402
+from sqlmodel import SQLModel  # noqa: E402
+
+from models import ActionStat, Evaluation, Player, Tournament  # noqa: E402
+
+LEGACY_SCHEMA = """
+CREATE TABLE tournament (id CHAR(32) PRIMARY KEY, unique_id VARCHAR, name VARCHAR, country VARCHAR,
+    created_at DATETIME);
+CREATE UNIQUE INDEX ix_tournament_unique_id ON tournament (unique_id);
+CREATE TABLE player (id CHAR(32) PRIMARY KEY, unique_id VARCHAR, first_name VARCHAR, last_name VARCHAR,
+    birthdate DATE, nation VARCHAR, shortlisted BOOLEAN, created_at DATETIME);
+CREATE UNIQUE INDEX ix_player_unique_id ON player (unique_id);
+CREATE TABLE evaluation (id CHAR(32) PRIMARY KEY, event_id CHAR(32), player_id CHAR(32), scout_name VARCHAR,
+    rating_technique INTEGER, rating_physical INTEGER, rating_intelligence INTEGER, rating_mentality INTEGER,
+    rating_impact INTEGER, created_at DATETIME);
+CREATE INDEX ix_evaluation_event_id ON evaluation (event_id);
+CREATE INDEX ix_evaluation_player_created ON evaluation (player_id, created_at);
+CREATE INDEX ix_evaluation_player_event ON evaluation (player_id, event_id);
+CREATE TABLE actionstat (id CHAR(32) PRIMARY KEY, event_id CHAR(32), player_id CHAR(32), minutes INTEGER,
+    shots INTEGER, passes INTEGER, duels INTEGER, goals INTEGER, assists INTEGER);
+CREATE INDEX ix_actionstat_event_id ON actionstat (event_id);
+CREATE INDEX ix_actionstat_player_event ON actionstat (player_id, event_id);
+"""
+
+TABLES = [Tournament.__table__, Player.__table__, Evaluation.__table__, ActionStat.__table__]
+
+
+def generate(players: int, rows: int, events: int):
+    rnd = random.Random(7)
+    event_ids = [uuid4().hex for _ in range(events)]
+    player_ids = [uuid4().hex for _ in range(players)]
+    evals, stats = [], []
+    for pid in player_ids:
+        for _ in range(rows):
+            eid = rnd.choice(event_ids)
+            evals.append((uuid4().hex, eid, pid, *[rnd.randint(1, 5) for _ in range(5)]))
+            stats.append((uuid4().hex, eid, pid, rnd.choice([45, 90]), *[rnd.randint(0, 20) for _ in range(5)]))
+    return event_ids, player_ids, evals, stats
+
+
+def load_legacy(path, data):
+    event_ids, player_ids, evals, stats = data
+    conn = sqlite3.connect(path)
+    conn.executescript(LEGACY_SCHEMA)
+    conn.executemany(
+        "INSERT INTO tournament VALUES (?, ?, 'Event', 'DE', '2026-01-01')", [(e, uuid4().hex) for e in event_ids]
+    )
+    conn.executemany(
+        "INSERT INTO player VALUES (?, ?, 'A', 'B', '2008-01-01', 'DE', 0, '2026-01-01')",
+        [(p, uuid4().hex) for p in player_ids],
+    )
+    conn.executemany(
+        "INSERT INTO evaluation VALUES (?, ?, ?, 'Scout', ?, ?, ?, ?, ?, '2026-01-01')", evals
+    )
+    conn.executemany("INSERT INTO actionstat VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", stats)
+    conn.commit()
+    return conn
+
+
+def load_surrogate(path, data):
+    event_ids, player_ids, evals, stats = data
+    engine = create_engine(f"sqlite:///{path}")
+    SQLModel.metadata.create_all(engine, tables=TABLES)
+    engine.dispose()
+    conn = sqlite3.connect(path)
+    conn.executemany(
+        "INSERT INTO tournament (id, unique_id, name, country, created_at) VALUES (?, ?, 'Event', 'DE', '2026-01-01')",
+        [(e, uuid4().hex) for e in event_ids],
+    )
+    conn.executemany(
+        "INSERT INTO player (id, unique_id, first_name, last_name, birthdate, nation, shortlisted, created_at) "
+        "VALUES (?, ?, 'A', 'B', '2008-01-01', 'DE', 0, '2026-01-01')",
+        [(p, uuid4().hex) for p in player_ids],
+    )
+    event_pk = dict(conn.execute("SELECT id, pk FROM tournament"))
+    player_pk = dict(conn.execute("SELECT id, pk FROM player"))
+    conn.executemany(
+        "INSERT INTO evaluation (id, event_id, event_pk, player_id, player_pk, scout_name, rating_technique, "
+        "rating_physical, rating_intelligence, rating_mentality, rating_impact, created_at) "
+        "VALUES (?, ?, ?, ?, ?, 'Scout', ?, ?, ?, ?, ?, '2026-01-01')",
+        [(e[0], e[1], event_pk[e[1]], e[2], player_pk[e[2]], *e[3:]) for e in evals],
+    )
+    conn.executemany(
+        "INSERT INTO actionstat (id, event_id, event_pk, player_id, player_pk, minutes, shots, passes, duels, "
+        "goals, assists) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        [(s[0], s[1], event_pk[s[1]], s[2], player_pk[s[2]], *s[3:]) for s in stats],
+    )
+    conn.commit()
+    return conn
+
+
+def sizes(conn):
+    try:
+        rows = conn.execute("SELECT name, SUM(pgsize) FROM dbstat GROUP BY name").fetchall()
+    except sqlite3.OperationalError:  # SQLite built without dbstat
+        return None, None
+    kinds = dict(conn.execute("SELECT name, type FROM sqlite_master"))
+    index = sum(size for name, size in rows if kinds.get(name) == "index" or name.startswith("sqlite_autoindex"))
+    table = sum(size for name, size in rows if kinds.get(name) == "table")
+    return table, index
+
+
+def timed(conn, sql, params_list, repeat=1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for params in params_list:
+            conn.execute(sql, params).fetchall()
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--players", type=int, default=20000)
+    parser.add_argument("--rows", type=int, default=10, help="evaluations and stats per player")
+    parser.add_argument("--events", type=int, default=50)
+    parser.add_argument("--lookups", type=int, default=2000)
+    args = parser.parse_args()
+
+    data = generate(args.players, args.rows, args.events)
+    sample = random.Random(1).sample(data[1], min(args.lookups, len(data[1])))
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy = load_legacy(os.path.join(tmp, "legacy.sqlite"), data)
+        surrogate = load_surrogate(os.path.join(tmp, "surrogate.sqlite"), data)
+        pk_of = dict(surrogate.execute("SELECT id, pk FROM player"))
+
+        results = {}
+        for label, conn in (("uuid", legacy), ("surrogate", surrogate)):
+            table, index = sizes(conn)
+            results[label] = {"table_kb": table and table // 1024, "index_kb": index and index // 1024}
+        results["uuid"]["join_ms"] = timed(
+            legacy,
+            "SELECT p.nation, AVG(e.rating_technique), SUM(s.minutes) FROM player p "
+            "JOIN evaluation e ON e.player_id = p.id JOIN actionstat s ON s.player_id = p.id GROUP BY p.nation",
+            [()],
+        )
+        results["surrogate"]["join_ms"] = timed(
+            surrogate,
+            "SELECT p.nation, AVG(e.rating_technique), SUM(s.minutes) FROM player p "
+            "JOIN evaluation e ON e.player_pk = p.pk JOIN actionstat s ON s.player_pk = p.pk GROUP BY p.nation",
+            [()],
+        )
+        results["uuid"]["score_lookups_ms"] = timed(
+            legacy,
+            "SELECT * FROM evaluation WHERE player_id = ? ORDER BY created_at DESC",
+            [(pid,) for pid in sample],
+        )
+        results["surrogate"]["score_lookups_ms"] = timed(
+            surrogate,
+            "SELECT * FROM evaluation WHERE player_pk = ? ORDER BY created_at DESC",
+            [(pk_of[pid],) for pid in sample],
+        )
+
+    print(f"{args.players} players, {args.players * args.rows} evaluations and stats each")
+    print(f"{'':12}{'table KB':>10}{'index KB':>10}{'join ms':>10}{'lookups ms':>12}")
+    for label, r in results.items():
+        print(
+            f"{label:12}{r['table_kb'] or '-':>10}{r['index_kb'] or '-':>10}"
+            f"{r['join_ms']:>10.1f}{r['score_lookups_ms']:>12.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+Notifications between the worker processes of one deployment.
+
+All workers share the SQLite file, so the channel is the broadcast_message
+table: publish() notifies the subscribers of the own process right away and
+inserts a row; a listener thread in every process polls for rows of other
+processes (settings.broadcast_interval) and dispatches them locally. Used to
+invalidate in-process caches (see cached()) and to wake job runners.
+
+Other workers see a message after at most one poll interval; the own process
+sees it before publish() returns.
+"""
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import delete, func, insert, select
+
+from db import engine, settings
+from models import BroadcastMessage
+
+logger = logging.getLogger("talentlab.broadcast")
+
+# messages are only needed until every worker has polled them
+RETENTION = timedelta(minutes=10)
+
+_subscribers: Dict[str, List[Callable[[Optional[dict]], None]]] = {}
+
+
+def origin() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def subscribe(topic: str, callback: Callable[[Optional[dict]], None]) -> None:
+    _subscribers.setdefault(topic, []).append(callback)
+
+
+def dispatch(topic: str, payload: Optional[dict]) -> None:
+    for callback in _subscribers.get(topic, []):
+        try:
+            callback(payload)
+        except Exception:
+            logger.exception("subscriber for %s failed", topic)
+
+
+def publish(topic: str, payload: Optional[dict] = None) -> None:
+    dispatch(topic, payload)
+    table = BroadcastMessage.__table__
+    with engine.begin() as conn:
+        conn.execute(
+            insert(table).values(
+                topic=topic,
+                payload=json.dumps(payload) if payload is not None else None,
+                origin=origin(),
+                created_at=datetime.utcnow(),
+            )
+        )
+
+
+class Listener:
+    def __init__(self):
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._last_pk = 0
+        self._last_prune = 0.0
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        table = BroadcastMessage.__table__
+        with engine.connect() as conn:
+            # only messages published after this worker started are relevant
+            self._last_pk = conn.execute(select(func.max(table.c.pk))).scalar() or 0
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="broadcast-listener", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 2.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._thread = None
+
+    def poll(self) -> int:
+        table = BroadcastMessage.__table__
+        me = origin()
+        with engine.connect() as conn:
+            rows = conn.execute(
+                select(table.c.pk, table.c.topic, table.c.payload, table.c.origin)
+                .where(table.c.pk > self._last_pk)
+                .order_by(table.c.pk)
+            ).all()
+        for pk, topic, payload, sender in rows:
+            self._last_pk = pk
+            if sender != me:
+                dispatch(topic, json.loads(payload) if payload else None)
+        return len(rows)
+
+    def prune(self) -> None:
+        table = BroadcastMessage.__table__
+        with engine.begin() as conn:
+            conn.execute(delete(table).where(table.c.created_at < datetime.utcnow() - RETENTION))
+
+    def _loop(self) -> None:
+        while not self._stop.wait(settings.broadcast_interval):
+            try:
+                self.poll()
+                if time.monotonic() - self._last_prune > 60:
+                    self._last_prune = time.monotonic()
+                    self.prune()
+            except Exception:
+                logger.exception("broadcast poll failed")
+
+
+listener = Listener()
+
+
+class LocalCache:
+    """
+    One cached value per topic and process, dropped whenever the topic is published.
+    A load that overlaps an invalidation is returned but not stored.
+    """
+
+    def __init__(self, topic: str):
+        self._value: Any = None
+        self._filled = False
+        self._generation = 0
+        self._lock = threading.Lock()
+        subscribe(topic, self.invalidate)
+
+    def invalidate(self, payload: Optional[dict] = None) -> None:
+        with self._lock:
+            self._generation += 1
+            self._filled = False
+            self._value = None
+
+    def get(self, load: Callable[[], Any]) -> Any:
+        with self._lock:
+            if self._filled:
+                return self._value
+            generation = self._generation
+        value = load()
+        with self._lock:
+            if generation == self._generation:
+                self._value, self._filled = value, True
+        return value
+
+
+_caches: Dict[str, LocalCache] = {}
+
+
+def cached(topic: str, load: Callable[[], Any]) -> Any:
+    cache = _caches.get(topic)
+    if cache is None:
+        cache = _caches.setdefault(topic, LocalCache(topic))
+    return cache.get(load)
@@ -0,0 +1,98 @@
+"""
+Scout calibration: per-scout bias and spread of the ratings, used by
+compute_score (scoring model v2) to normalize each rating before averaging.
+
+The sufficient statistics (count, sum, sum of squares per rating field and
+scout) live in ScoutCalibration and are maintained by triggers on evaluation
+(db.sync_scout_calibration()), so they are exact after every write and loading
+them is one small query; nothing is refitted per request.
+
+Normalization of a rating r of scout s in one field:
+
+    r' = mean + (r - mean_s) * sd / sd_s
+
+with mean/sd over all ratings and mean_s/sd_s of the scout, both shrunk towards
+the overall values by PRIOR_RATINGS pseudo-ratings, so a scout with a handful of
+evaluations is barely corrected. Results are clamped to the rating scale.
+"""
+import math
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from sqlmodel import Session, select
+
+from models import ScoutCalibration
+
+# rating_<field> columns of Evaluation, <field>_sum/_squares columns of ScoutCalibration
+RATING_FIELDS = ("technique", "physical", "intelligence", "mentality", "impact")
+# weight of the overall distribution in a scout's estimate, in ratings
+PRIOR_RATINGS = 20
+RATING_MIN, RATING_MAX = 1, 5
+
+
+@dataclass
+class FieldStats:
+    mean: float
+    sd: float
+
+
+def field_stats(count: float, total: float, squares: float) -> Optional[FieldStats]:
+    if count <= 0:
+        return None
+    mean = total / count
+    return FieldStats(mean=mean, sd=math.sqrt(max(squares / count - mean * mean, 0.0)))
+
+
+class Calibration:
+    def __init__(self, rows):
+        rows = [r for r in rows if r.evaluation_count > 0]
+        self.counts: Dict[str, int] = {r.scout_name: r.evaluation_count for r in rows}
+        self.overall: Dict[str, Optional[FieldStats]] = {}
+        self.scouts: Dict[str, Dict[str, FieldStats]] = {r.scout_name: {} for r in rows}
+        total_count = sum(self.counts.values())
+        for f in RATING_FIELDS:
+            overall = field_stats(
+                total_count,
+                sum(getattr(r, f"{f}_sum") for r in rows),
+                sum(getattr(r, f"{f}_squares") for r in rows),
+            )
+            self.overall[f] = overall
+            if overall is None:
+                continue
+            for r in rows:
+                n = r.evaluation_count
+                # shrink mean and variance towards the overall distribution
+                mean = (getattr(r, f"{f}_sum") + PRIOR_RATINGS * overall.mean) / (n + PRIOR_RATINGS)
+                own = field_stats(n, getattr(r, f"{f}_sum"), getattr(r, f"{f}_squares"))
+                variance = (n * own.sd ** 2 + PRIOR_RATINGS * overall.sd ** 2) / (n + PRIOR_RATINGS)
+                self.scouts[r.scout_name][f] = FieldStats(mean=mean, sd=math.sqrt(variance))
+
+    def normalize(self, scout_name: Optional[str], field: str, rating: float) -> float:
+        """Rating of `field` ("technique", ...) as an average scout would have given it."""
+        overall = self.overall.get(field)
+        scout = self.scouts.get(scout_name or "Scout", {}).get(field)
+        if overall is None or scout is None:
+            return rating
+        scale = overall.sd / scout.sd if scout.sd > 1e-9 else 1.0
+        return min(RATING_MAX, max(RATING_MIN, overall.mean + (rating - scout.mean) * scale))
+
+    def scout_parameters(self) -> list:
+        """Per scout and field: bias (mean minus overall mean) and spread (sd relative to overall sd)."""
+        return [
+            {
+                "scoutName": name,
+                "evaluations": self.counts[name],
+                "fields": {
+                    f: {
+                        "bias": round(stats.mean - self.overall[f].mean, 3),
+                        "spread": round(stats.sd / self.overall[f].sd, 3) if self.overall[f].sd > 1e-9 else 1.0,
+                    }
+                    for f, stats in fields.items()
+                },
+            }
+            for name, fields in sorted(self.scouts.items())
+        ]
+
+
+def load_calibration(session: Session) -> Calibration:
+    return Calibration(session.exec(select(ScoutCalibration)).all())
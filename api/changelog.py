@@ -0,0 +1,222 @@
+"""
+Change log (audit trail and change-data-capture) of the AUDITED_MODELS.
+
+Session events in db.py collect one record per written row:
+
+- insert: the non-null column values of the new row
+- update: {column: [old, new]} of the changed columns only
+- delete: the column values the row had
+
+ORM writes are read from the attribute history after each flush; Core
+statements executed through Session.execute (bulk insert/update/delete of the
+routers and the importer) are captured in do_orm_execute, updates and deletes
+with one extra SELECT of the affected rows. Surrogate keys (`pk`, `<name>_pk`)
+are left out, large columns (OMITTED_COLUMNS) only record whether they are set.
+Rows changed by database triggers (shortlist flag, surrogate keys) are not seen.
+
+Records are buffered on the session and written with one executemany INSERT
+right before the commit, in the same transaction: a request costs one extra
+statement, not one per row, and a rolled-back write leaves no record.
+
+ChangeLog.pk is the cursor of GET /changes. Records older than
+settings.change_retention_days are deleted; older than
+settings.change_compact_days, runs of updates of one row by the same actor are
+merged into the last of them (compact()), so consumers reading older positions
+see fewer, coarser updates.
+"""
+import json
+from contextvars import ContextVar
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from sqlalchemy import delete, insert, inspect, select, update
+
+from models import AUDITED_MODELS, ChangeLog
+
+# columns whose values are too large for the log; recorded as set/unset
+OMITTED_COLUMNS = {"photo_data"}
+# executemany UPDATEs identify their rows by this parameter (importer)
+ROW_KEY_PARAM = "b_pk"
+
+AUDITED_TABLES = {model.__tablename__: model.__table__ for model in AUDITED_MODELS}
+
+# X-User header of the current request, set by the middleware in main.py
+current_actor: ContextVar[Optional[str]] = ContextVar("current_actor", default=None)
+
+
+def jsonable(value: Any) -> Any:
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def logged_value(column: str, value: Any) -> Any:
+    return value is not None if column in OMITTED_COLUMNS else jsonable(value)
+
+
+def is_logged(column: str) -> bool:
+    return column != "pk" and not column.endswith("_pk")
+
+
+def row_values(values: Dict[str, Any]) -> Dict[str, Any]:
+    return {c: logged_value(c, v) for c, v in values.items() if is_logged(c) and v is not None}
+
+
+def row_diff(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, list]:
+    diff = {}
+    for c, value in new.items():
+        if is_logged(c) and old.get(c) != value:
+            diff[c] = [logged_value(c, old.get(c)), logged_value(c, value)]
+    return diff
+
+
+def record(session, table: str, entity_id: UUID, op: str, diff: dict) -> None:
+    """Queue a record for the next commit of `session`."""
+    session.info.setdefault("change_log", []).append({
+        "entity": table,
+        "entity_id": entity_id,
+        "op": op,
+        "diff": json.dumps(diff, separators=(",", ":")),
+        "actor": session.info.get("actor") or current_actor.get(),
+        "created_at": datetime.utcnow(),
+    })
+
+
+def loaded_columns(obj) -> Dict[str, Any]:
+    return {key: value for key, value in inspect(obj).dict.items() if key in obj.__table__.c}
+
+
+def collect_flush(session) -> None:
+    """Records for the ORM writes of the flush that just ran (history is still in place)."""
+    for obj in session.new:
+        if isinstance(obj, AUDITED_MODELS):
+            record(session, obj.__tablename__, obj.id, "insert", row_values(loaded_columns(obj)))
+    for obj in session.dirty:
+        if not isinstance(obj, AUDITED_MODELS):
+            continue
+        diff = {}
+        for attr in inspect(obj).attrs:
+            history = attr.history
+            if attr.key in obj.__table__.c and is_logged(attr.key) and history.has_changes():
+                old = history.deleted[0] if history.deleted else None
+                new = history.added[0] if history.added else None
+                if old != new:
+                    diff[attr.key] = [logged_value(attr.key, old), logged_value(attr.key, new)]
+        if diff:
+            record(session, obj.__tablename__, obj.id, "update", diff)
+    for obj in session.deleted:
+        if isinstance(obj, AUDITED_MODELS):
+            record(session, obj.__tablename__, obj.id, "delete", row_values(loaded_columns(obj)))
+
+
+def capture_statement(state) -> Any:
+    """
+    do_orm_execute hook for Core insert/update/delete on audited tables. Returns
+    the statement's result when it had to run it itself (updates: before/after
+    images), else None and the session runs it as usual.
+    """
+    if not (state.is_insert or state.is_update or state.is_delete):
+        return None
+    table = getattr(state.statement, "table", None)
+    if table is None or AUDITED_TABLES.get(table.name) is not table:
+        return None
+    session, params = state.session, state.parameters
+    if state.is_insert:
+        if isinstance(params, list):
+            rows = params
+        else:
+            rows = [{**state.statement.compile().params, **(params or {})}]
+        for row in rows:
+            if row.get("id") is not None:
+                record(session, table.name, row["id"], "insert", row_values(row))
+        return None
+
+    conn = session.connection()
+    if isinstance(params, list):
+        where = table.c.pk.in_([p[ROW_KEY_PARAM] for p in params if ROW_KEY_PARAM in p])
+    else:
+        where = state.statement.whereclause
+    query = select(table) if where is None else select(table).where(where)
+    before = {row.pk: row._asdict() for row in conn.execute(query)}
+    if state.is_delete:
+        for values in before.values():
+            record(session, table.name, values["id"], "delete", row_values(values))
+        return None
+    result = state.invoke_statement()
+    if before:
+        for row in conn.execute(select(table).where(table.c.pk.in_(list(before)))):
+            diff = row_diff(before[row.pk], row._asdict())
+            if diff:
+                record(session, table.name, row.id, "update", diff)
+    return result
+
+
+def flush_records(session) -> int:
+    """Write the queued records in one executemany INSERT; called before the commit."""
+    records: List[dict] = session.info.pop("change_log", None)
+    if records:
+        session.connection().execute(insert(ChangeLog.__table__), records)
+    return len(records or [])
+
+
+def purge(conn, cutoff: datetime) -> int:
+    table = ChangeLog.__table__
+    return conn.execute(delete(table).where(table.c.created_at < cutoff)).rowcount
+
+
+def merge_diffs(diffs: List[dict]) -> dict:
+    merged: Dict[str, list] = {}
+    for diff in diffs:
+        for column, (old, new) in diff.items():
+            merged[column] = [merged[column][0] if column in merged else old, new]
+    return {c: change for c, change in merged.items() if change[0] != change[1]}
+
+
+def compact(conn, cutoff: datetime) -> int:
+    """
+    Merge runs of consecutive updates of one row by the same actor written
+    before `cutoff` into the last update of the run; returns the number of
+    records removed.
+    """
+    table = ChangeLog.__table__
+    rows = conn.execute(
+        select(table.c.pk, table.c.entity_id, table.c.op, table.c.diff, table.c.actor)
+        # a row exists between two of its updates, so inserts and deletes never split a run
+        .where(table.c.created_at < cutoff, table.c.op == "update")
+        .order_by(table.c.entity_id, table.c.pk)
+    ).all()
+    removed = 0
+    run: List[Any] = []
+
+    def close_run():
+        nonlocal removed
+        if len(run) > 1:
+            merged = merge_diffs([json.loads(r.diff) for r in run])
+            keep = run[-1].pk if merged else None
+            conn.execute(delete(table).where(table.c.pk.in_([r.pk for r in run if r.pk != keep])))
+            if keep is not None:
+                conn.execute(update(table).where(table.c.pk == keep).values(diff=json.dumps(merged, separators=(",", ":"))))
+            removed += len(run) - (keep is not None)
+        run.clear()
+
+    for row in rows:
+        if run and (row.entity_id != run[-1].entity_id or row.actor != run[-1].actor):
+            close_run()
+        run.append(row)
+    close_run()
+    return removed
+
+
+def change_to_dict(c: ChangeLog) -> dict:
+    return {
+        "cursor": c.pk,
+        "entity": c.entity,
+        "entityId": str(c.entity_id),
+        "op": c.op,
+        "diff": json.loads(c.diff),
+        "actor": c.actor,
+        "createdAt": c.created_at.isoformat(),
+    }
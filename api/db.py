@@ -0,0 +1,592 @@
+"""
+Settings, engine, schema migrations and the session dependency.
+
+Importing this module registers every table (via models) but does not load
+FastAPI; CLIs call migrate() and open Session(engine) directly.
+"""
+import zlib
+from contextlib import contextmanager
+from datetime import datetime
+from functools import lru_cache
+from itertools import chain
+from typing import Optional
+from uuid import UUID, uuid4
+
+from pydantic_settings import BaseSettings
+from sqlalchemy import event
+from sqlalchemy.schema import CreateIndex, CreateTable
+from sqlmodel import SQLModel, Session, create_engine, select
+
+import changelog
+from age_baselines import SUB_INDICATORS
+from calibration import RATING_FIELDS
+from models import (
+    ActionStat,
+    Evaluation,
+    Job,
+    SCORING_MODEL,
+    Shortlist,
+    TOURNAMENT_VIEW_MODELS,
+    WEIGHTED_SCORING_MODEL,
+)
+from weighting import STAT_FIELDS
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process dev server, no lock needed
+    fcntl = None
+
+
+class Settings(BaseSettings):
+    """Deployment settings from the environment (DATABASE_URL, WEB_CONCURRENCY, JOB_WORKERS, ...)."""
+
+    database_url: str = "sqlite:///./db.sqlite"
+    host: str = "0.0.0.0"
+    port: int = 8000
+    web_concurrency: int = 1  # uvicorn worker processes, see serve.py
+    job_workers: int = 2  # job threads per process
+    job_retention_days: int = 14
+    change_retention_days: int = 180  # ChangeLog records, see changelog.py
+    change_compact_days: int = 7
+    broadcast_interval: float = 0.25  # seconds between polls for other workers' messages
+    snapshot_interval: float = 0  # seconds between copies of the analytics snapshot, 0 = off (snapshot.py)
+    snapshot_path: Optional[str] = None  # default: <database>.snapshot
+    replica_database_url: Optional[str] = None  # read replica for analytics instead of the snapshot
+    video_dir: str = "./videos"  # uploaded videos with thumbnail and preview, one directory each (videos.py)
+    video_max_bytes: int = 20 * 1024**3
+    video_workers: int = 1  # ffmpeg processes per worker process
+    video_upload_expiry_hours: int = 48  # unfinished uploads without a new chunk are deleted after this
+
+
+settings = Settings()
+
+
+sqlite_url = settings.database_url
+
+
+# several worker processes share the file: wait for the write lock instead of failing after 5s
+engine = create_engine(sqlite_url, echo=False, connect_args={"check_same_thread": False, "timeout": 30})
+
+
+@lru_cache(maxsize=None)
+def schema_fingerprint() -> int:
+    """
+    Hash of the DDL of all models and of the scoring model versions; stored in
+    PRAGMA user_version once a database is migrated. A SCORING_MODEL bump
+    therefore migrates too, which queues the score backfill.
+    """
+    ddl = [f"scoring {SCORING_MODEL} {WEIGHTED_SCORING_MODEL}"]
+    for table in SQLModel.metadata.sorted_tables:
+        ddl.append(str(CreateTable(table).compile(engine)))
+        ddl.extend(sorted(str(CreateIndex(ix).compile(engine)) for ix in table.indexes))
+    return zlib.crc32("\n".join(ddl).encode()) & 0x7FFFFFFF
+
+
+@contextmanager
+def migration_lock():
+    """Exclusive file lock next to the database, so only one process migrates at a time."""
+    database = engine.url.database
+    if not database or database == ":memory:" or fcntl is None:
+        yield
+        return
+    with open(f"{database}.migrate.lock", "w") as handle:
+        fcntl.flock(handle, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+def schema_is_current() -> bool:
+    with engine.connect() as conn:
+        return conn.exec_driver_sql("PRAGMA user_version").scalar() == schema_fingerprint()
+
+
+def migrate() -> bool:
+    """
+    Run create_db_and_tables() once per schema version. Safe to call from every
+    worker process: the first one migrates under the lock, the others find the
+    fingerprint in user_version and skip. Returns whether migrations ran.
+    """
+    version = schema_fingerprint()
+    with migration_lock():
+        if schema_is_current():
+            return False
+        create_db_and_tables()
+        with engine.connect() as conn:
+            # WAL: readers in other workers are not blocked by a writer
+            conn.exec_driver_sql("PRAGMA journal_mode=WAL")
+            conn.exec_driver_sql(f"PRAGMA user_version = {version}")
+        queue_score_backfill()
+        return True
+
+
+def queue_score_backfill() -> bool:
+    """
+    After a migration, stored scores and profiles may be missing (new tables)
+    or of an older SCORING_MODEL: queue one backfill_score_history job (run by
+    jobs.JobRunner), unless one is pending or there is nothing to score.
+    """
+    with Session(engine) as session:
+        pending = select(Job.pk).where(Job.kind == "backfill_score_history", Job.status.in_(("queued", "running")))
+        if session.exec(pending.limit(1)).first() is not None:
+            return False
+        has_data = session.exec(select(Evaluation.pk).limit(1)).first() is not None
+        if not has_data and session.exec(select(ActionStat.pk).limit(1)).first() is None:
+            return False
+        session.add(Job(kind="backfill_score_history", params="{}"))
+        session.commit()
+    return True
+
+
+def create_db_and_tables():
+    SQLModel.metadata.create_all(engine)
+    # lightweight column migrations for Player extras
+    with engine.connect() as conn:
+        cols = {row[1] for row in conn.exec_driver_sql("PRAGMA table_info('player')").fetchall()}
+        if "position" not in cols:
+            conn.exec_driver_sql("ALTER TABLE player ADD COLUMN position VARCHAR;")
+        if "shortlisted" not in cols:
+            conn.exec_driver_sql("ALTER TABLE player ADD COLUMN shortlisted BOOLEAN DEFAULT 0;")
+        gcols = {row[1] for row in conn.exec_driver_sql("PRAGMA table_info('game')").fetchall()}
+        if "pitch_id" not in gcols:
+            conn.exec_driver_sql("ALTER TABLE game ADD COLUMN pitch_id VARCHAR;")
+        if "team_b_id" not in gcols:
+            conn.exec_driver_sql("ALTER TABLE game ADD COLUMN team_b_id VARCHAR;")
+        if "duration_minutes" not in gcols:
+            conn.exec_driver_sql("ALTER TABLE game ADD COLUMN duration_minutes INTEGER;")
+        scols = {row[1] for row in conn.exec_driver_sql("PRAGMA table_info('scoresnapshot')").fetchall()}
+        if "revision" not in scols:
+            conn.exec_driver_sql("ALTER TABLE scoresnapshot ADD COLUMN revision INTEGER DEFAULT 0;")
+        vcols = {row[1] for row in conn.exec_driver_sql("PRAGMA table_info('gamevideo')").fetchall()}
+        for name, ddl in (
+            ("start_second", "FLOAT DEFAULT 0 NOT NULL"),
+            ("filename", "VARCHAR"),
+            ("content_type", "VARCHAR"),
+            ("size_bytes", "INTEGER"),
+            ("received_bytes", "INTEGER DEFAULT 0 NOT NULL"),
+            ("duration_seconds", "FLOAT"),
+            ("width", "INTEGER"),
+            ("height", "INTEGER"),
+            ("codec", "VARCHAR"),
+            ("has_thumbnail", "BOOLEAN DEFAULT 0 NOT NULL"),
+            ("has_preview", "BOOLEAN DEFAULT 0 NOT NULL"),
+            ("error", "VARCHAR"),
+            ("created_at", "DATETIME"),
+            ("updated_at", "DATETIME"),
+        ):
+            if name not in vcols:
+                conn.exec_driver_sql(f"ALTER TABLE gamevideo ADD COLUMN {name} {ddl};")
+        acols = {row[1] for row in conn.exec_driver_sql("PRAGMA table_info('actionstat')").fetchall()}
+        if "source" not in acols:
+            conn.exec_driver_sql("ALTER TABLE actionstat ADD COLUMN source VARCHAR DEFAULT 'manual' NOT NULL;")
+        pcols = {row[1] for row in conn.exec_driver_sql("PRAGMA table_info('playerprofile')").fetchall()}
+        if "birthdate" not in pcols:
+            conn.exec_driver_sql("ALTER TABLE playerprofile ADD COLUMN birthdate DATE;")
+            conn.exec_driver_sql(
+                "UPDATE playerprofile SET birthdate = (SELECT birthdate FROM player WHERE player.pk = playerprofile.player_pk)"
+            )
+            conn.commit()
+    migrate_broadcast_autoincrement()
+    migrate_surrogate_keys()
+    sync_indexes()
+    sync_surrogate_keys()
+    sync_scout_calibration()
+    sync_age_baselines()
+    sync_action_stat_totals()
+    sync_default_shortlist()
+
+
+def migrate_broadcast_autoincrement():
+    """Recreate a broadcastmessage table from before AUTOINCREMENT; copying the rows seeds its sequence."""
+    with engine.begin() as conn:
+        ddl = conn.exec_driver_sql("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'broadcastmessage'").scalar()
+        if not ddl or "AUTOINCREMENT" in ddl.upper():
+            return
+        conn.exec_driver_sql("BEGIN")
+        conn.exec_driver_sql("ALTER TABLE broadcastmessage RENAME TO broadcastmessage_old")
+        conn.execute(CreateTable(SQLModel.metadata.tables["broadcastmessage"]))
+        conn.exec_driver_sql("INSERT INTO broadcastmessage SELECT pk, topic, payload, origin, created_at FROM broadcastmessage_old")
+        conn.exec_driver_sql("DROP TABLE broadcastmessage_old")
+
+
+def surrogate_key_columns(table):
+    """(shadow column, uuid column, parent table) for every `<name>_pk` column of a table."""
+    result = []
+    for col in table.columns:
+        if not col.name.endswith("_pk"):
+            continue
+        uuid_col = table.columns[col.name[:-3] + "_id"]
+        parent = next(iter(uuid_col.foreign_keys)).column.table
+        result.append((col.name, uuid_col.name, parent.name))
+    return result
+
+
+def migrate_surrogate_keys():
+    """
+    Rebuild tables created before the integer surrogate keys existed.
+    SQLite cannot add an INTEGER PRIMARY KEY via ALTER TABLE, so each legacy
+    table is renamed, recreated from the model and copied over (rowid order is
+    kept, so pk follows the original insertion order).
+    """
+    with engine.begin() as conn:
+        # pysqlite does not open a transaction for DDL on its own
+        conn.exec_driver_sql("BEGIN")
+        # keep REFERENCES clauses of other tables pointing at the new tables
+        conn.exec_driver_sql("PRAGMA legacy_alter_table = ON")
+        for table in SQLModel.metadata.sorted_tables:
+            cols = [row[1] for row in conn.exec_driver_sql(f"PRAGMA table_info('{table.name}')").fetchall()]
+            if "pk" in cols:
+                continue
+            legacy = f"{table.name}__legacy"
+            for (name,) in conn.exec_driver_sql(
+                "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL",
+                (table.name,),
+            ).fetchall():
+                conn.exec_driver_sql(f'DROP INDEX "{name}"')
+            conn.exec_driver_sql(f'ALTER TABLE "{table.name}" RENAME TO "{legacy}"')
+            table.create(conn)
+            common = ", ".join(f'"{c.name}"' for c in table.columns if c.name in cols)
+            conn.exec_driver_sql(
+                f'INSERT INTO "{table.name}" ({common}) SELECT {common} FROM "{legacy}" ORDER BY rowid'
+            )
+            conn.exec_driver_sql(f'DROP TABLE "{legacy}"')
+        conn.exec_driver_sql("PRAGMA legacy_alter_table = OFF")
+
+
+def sync_surrogate_keys():
+    """
+    Install the triggers that keep `<name>_pk` in sync with `<name>_id` and
+    backfill rows written before the triggers existed.
+    """
+    with engine.begin() as conn:
+        for table in SQLModel.metadata.sorted_tables:
+            for shadow, uuid_col, parent in surrogate_key_columns(table):
+                lookup = f'(SELECT pk FROM "{parent}" WHERE id = NEW."{uuid_col}")'
+                conn.exec_driver_sql(
+                    f'CREATE TRIGGER IF NOT EXISTS "trg_{table.name}_{shadow}_insert" '
+                    f'AFTER INSERT ON "{table.name}" BEGIN '
+                    f'UPDATE "{table.name}" SET "{shadow}" = {lookup} WHERE pk = NEW.pk; END'
+                )
+                conn.exec_driver_sql(
+                    f'CREATE TRIGGER IF NOT EXISTS "trg_{table.name}_{shadow}_update" '
+                    f'AFTER UPDATE OF "{uuid_col}" ON "{table.name}" BEGIN '
+                    f'UPDATE "{table.name}" SET "{shadow}" = {lookup} WHERE pk = NEW.pk; END'
+                )
+                conn.exec_driver_sql(
+                    f'UPDATE "{table.name}" SET "{shadow}" = '
+                    f'(SELECT pk FROM "{parent}" WHERE "{parent}".id = "{table.name}"."{uuid_col}") '
+                    f'WHERE "{shadow}" IS NULL AND "{uuid_col}" IS NOT NULL'
+                )
+
+
+def sync_scout_calibration():
+    """
+    Install the triggers that add (and on delete remove) the ratings of every
+    evaluation to the ScoutCalibration row of its scout, whichever way the
+    evaluation is written (API, import, seed, dedupe), and rebuild all rows from
+    the evaluations once.
+    """
+    columns = ", ".join(
+        ["scout_name", "evaluation_count"] + [f"{f}_{part}" for f in RATING_FIELDS for part in ("sum", "squares")]
+    )
+
+    def add(row: str) -> str:
+        values = ", ".join(
+            [f"coalesce({row}.scout_name, 'Scout')", "1"]
+            + [
+                expr
+                for f in RATING_FIELDS
+                for expr in (f"{row}.rating_{f}", f"{row}.rating_{f} * {row}.rating_{f}")
+            ]
+        )
+        updates = ", ".join(
+            ["evaluation_count = evaluation_count + 1"]
+            + [f"{c} = {c} + excluded.{c}" for f in RATING_FIELDS for c in (f"{f}_sum", f"{f}_squares")]
+        )
+        return f"INSERT INTO scoutcalibration ({columns}) VALUES ({values}) ON CONFLICT (scout_name) DO UPDATE SET {updates};"
+
+    def remove(row: str) -> str:
+        updates = ", ".join(
+            ["evaluation_count = evaluation_count - 1"]
+            + [
+                assignment
+                for f in RATING_FIELDS
+                for assignment in (
+                    f"{f}_sum = {f}_sum - {row}.rating_{f}",
+                    f"{f}_squares = {f}_squares - {row}.rating_{f} * {row}.rating_{f}",
+                )
+            ]
+        )
+        return f"UPDATE scoutcalibration SET {updates} WHERE scout_name = coalesce({row}.scout_name, 'Scout');"
+
+    rating_columns = ", ".join(["scout_name"] + [f"rating_{f}" for f in RATING_FIELDS])
+    aggregates = ", ".join(
+        ["coalesce(scout_name, 'Scout')", "count(*)"]
+        + [expr for f in RATING_FIELDS for expr in (f"sum(rating_{f})", f"sum(rating_{f} * rating_{f})")]
+    )
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            'CREATE TRIGGER IF NOT EXISTS "trg_evaluation_calibration_insert" '
+            f"AFTER INSERT ON evaluation BEGIN {add('NEW')} END"
+        )
+        conn.exec_driver_sql(
+            'CREATE TRIGGER IF NOT EXISTS "trg_evaluation_calibration_delete" '
+            f"AFTER DELETE ON evaluation BEGIN {remove('OLD')} END"
+        )
+        conn.exec_driver_sql(
+            'CREATE TRIGGER IF NOT EXISTS "trg_evaluation_calibration_update" '
+            f"AFTER UPDATE OF {rating_columns} ON evaluation BEGIN {remove('OLD')} {add('NEW')} END"
+        )
+        conn.exec_driver_sql("DELETE FROM scoutcalibration")
+        conn.exec_driver_sql(
+            f"INSERT INTO scoutcalibration ({columns}) "
+            f"SELECT {aggregates} FROM evaluation GROUP BY coalesce(scout_name, 'Scout')"
+        )
+
+
+DEFAULT_SHORTLIST_NAME = "Shortlist"
+
+
+def sync_default_shortlist():
+    """
+    Make sure the default shortlist exists and install the triggers that keep
+    Player.shortlisted and membership in it equal, whichever side is written
+    (toggle endpoint, player update, import, shortlist endpoints). Flagged
+    players missing from the list (e.g. from before shortlists existed) are
+    appended.
+    """
+    default_pk = "(SELECT pk FROM shortlist WHERE is_default ORDER BY pk LIMIT 1)"
+    entry_columns = "id, shortlist_id, shortlist_pk, player_id, player_pk, sort_order, created_at"
+
+    def add_player(condition: str) -> str:
+        # ids are stored as 32 hex digits (sqlalchemy Uuid on SQLite)
+        return (
+            f"INSERT INTO shortlistentry ({entry_columns}) "
+            "SELECT lower(hex(randomblob(16))), s.id, s.pk, NEW.id, NEW.pk, "
+            "coalesce((SELECT max(sort_order) FROM shortlistentry WHERE shortlist_pk = s.pk), 0) + 1, "
+            "strftime('%Y-%m-%d %H:%M:%f', 'now') "
+            f"FROM shortlist s WHERE s.pk = {default_pk} AND {condition} AND NOT EXISTS "
+            "(SELECT 1 FROM shortlistentry e WHERE e.shortlist_pk = s.pk AND e.player_pk = NEW.pk) "
+            # an entry being inserted right now (its _pk trigger may not have run yet)
+            "AND NOT EXISTS (SELECT 1 FROM shortlistentry e WHERE e.player_pk IS NULL AND e.player_id = NEW.id);"
+        )
+
+    # match new entries by uuid: their _pk columns are filled by the surrogate key triggers, possibly after these
+    default_id = f"(SELECT id FROM shortlist WHERE pk = {default_pk})"
+    with engine.begin() as conn:
+        if conn.exec_driver_sql("SELECT 1 FROM shortlist WHERE is_default").first() is None:
+            conn.execute(
+                Shortlist.__table__.insert().values(
+                    id=uuid4(), name=DEFAULT_SHORTLIST_NAME, is_default=True, created_at=datetime.utcnow()
+                )
+            )
+        conn.exec_driver_sql(
+            'CREATE TRIGGER IF NOT EXISTS "trg_player_shortlisted_insert" '
+            f"AFTER INSERT ON player WHEN NEW.shortlisted BEGIN {add_player('1')} END"
+        )
+        conn.exec_driver_sql(
+            'CREATE TRIGGER IF NOT EXISTS "trg_player_shortlisted_update" '
+            "AFTER UPDATE OF shortlisted ON player WHEN NEW.shortlisted IS NOT OLD.shortlisted BEGIN "
+            f"{add_player('NEW.shortlisted')} "
+            f"DELETE FROM shortlistentry WHERE NOT NEW.shortlisted AND player_pk = NEW.pk AND shortlist_pk = {default_pk}; "
+            "END"
+        )
+        conn.exec_driver_sql(
+            'CREATE TRIGGER IF NOT EXISTS "trg_shortlistentry_default_insert" '
+            f"AFTER INSERT ON shortlistentry WHEN NEW.shortlist_id = {default_id} BEGIN "
+            "UPDATE player SET shortlisted = 1 WHERE id = NEW.player_id AND NOT shortlisted; END"
+        )
+        conn.exec_driver_sql(
+            'CREATE TRIGGER IF NOT EXISTS "trg_shortlistentry_default_delete" '
+            f"AFTER DELETE ON shortlistentry WHEN OLD.shortlist_id = {default_id} BEGIN "
+            "UPDATE player SET shortlisted = 0 WHERE id = OLD.player_id AND shortlisted; END"
+        )
+        conn.exec_driver_sql(
+            f"INSERT INTO shortlistentry ({entry_columns}) "
+            "SELECT lower(hex(randomblob(16))), s.id, s.pk, p.id, p.pk, "
+            "coalesce((SELECT max(sort_order) FROM shortlistentry WHERE shortlist_pk = s.pk), 0) "
+            "+ row_number() OVER (ORDER BY p.created_at, p.pk), "
+            "strftime('%Y-%m-%d %H:%M:%f', 'now') "
+            f"FROM player p JOIN shortlist s ON s.pk = {default_pk} "
+            "WHERE p.shortlisted AND NOT EXISTS "
+            "(SELECT 1 FROM shortlistentry e WHERE e.shortlist_pk = s.pk AND e.player_pk = p.pk)"
+        )
+
+
+def sync_action_stat_totals():
+    """
+    Install the triggers that keep the single ActionStatTotal row equal to the
+    column sums over all action stats, and rebuild it once.
+    """
+    fields = ("minutes",) + STAT_FIELDS
+
+    def change(row: str, sign: str) -> str:
+        updates = ", ".join([f"stat_count = stat_count {sign} 1"] + [f"{f} = {f} {sign} {row}.{f}" for f in fields])
+        return f"UPDATE actionstattotal SET {updates} WHERE pk = 1;"
+
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            'CREATE TRIGGER IF NOT EXISTS "trg_actionstat_total_insert" '
+            f"AFTER INSERT ON actionstat BEGIN {change('NEW', '+')} END"
+        )
+        conn.exec_driver_sql(
+            'CREATE TRIGGER IF NOT EXISTS "trg_actionstat_total_delete" '
+            f"AFTER DELETE ON actionstat BEGIN {change('OLD', '-')} END"
+        )
+        conn.exec_driver_sql(
+            'CREATE TRIGGER IF NOT EXISTS "trg_actionstat_total_update" '
+            f"AFTER UPDATE OF {', '.join(fields)} ON actionstat BEGIN {change('OLD', '-')} {change('NEW', '+')} END"
+        )
+        conn.exec_driver_sql("DELETE FROM actionstattotal")
+        conn.exec_driver_sql(
+            f"INSERT INTO actionstattotal (pk, stat_count, {', '.join(fields)}) "
+            f"SELECT 1, count(*), {', '.join(f'coalesce(sum({f}), 0)' for f in fields)} FROM actionstat"
+        )
+
+
+def sync_age_baselines():
+    """
+    Install the triggers that add (and on delete remove) the sub-indicators of
+    every player profile to the AgeBaseline row of its model, birth year and
+    birth quarter, and rebuild all rows from the profiles once. Profiles
+    without a birthdate are left out.
+    """
+    columns = ", ".join(
+        ["model", "birth_year", "birth_quarter", "player_count"]
+        + [f"{f}_{part}" for f in SUB_INDICATORS for part in ("sum", "squares")]
+    )
+
+    def year(row: str) -> str:
+        return f"CAST(strftime('%Y', {row}.birthdate) AS INTEGER)"
+
+    def quarter(row: str) -> str:
+        return f"(CAST(strftime('%m', {row}.birthdate) AS INTEGER) + 2) / 3"
+
+    def add(row: str) -> str:
+        values = ", ".join(
+            [f"{row}.model", year(row), quarter(row), "1"]
+            + [expr for f in SUB_INDICATORS for expr in (f"{row}.{f}", f"{row}.{f} * {row}.{f}")]
+        )
+        updates = ", ".join(
+            ["player_count = player_count + 1"]
+            + [f"{c} = {c} + excluded.{c}" for f in SUB_INDICATORS for c in (f"{f}_sum", f"{f}_squares")]
+        )
+        # the WHERE keeps the ON CONFLICT clause unambiguous for SQLite's parser
+        return (
+            f"INSERT INTO agebaseline ({columns}) SELECT {values} WHERE {row}.birthdate IS NOT NULL "
+            f"ON CONFLICT (model, birth_year, birth_quarter) DO UPDATE SET {updates};"
+        )
+
+    def remove(row: str) -> str:
+        updates = ", ".join(
+            ["player_count = player_count - 1"]
+            + [
+                assignment
+                for f in SUB_INDICATORS
+                for assignment in (f"{f}_sum = {f}_sum - {row}.{f}", f"{f}_squares = {f}_squares - {row}.{f} * {row}.{f}")
+            ]
+        )
+        return (
+            f"UPDATE agebaseline SET {updates} "
+            f"WHERE model = {row}.model AND birth_year = {year(row)} AND birth_quarter = {quarter(row)};"
+        )
+
+    profile_columns = ", ".join(["model", "birthdate"] + list(SUB_INDICATORS))
+    aggregates = ", ".join(
+        ["model", year("playerprofile"), quarter("playerprofile"), "count(*)"]
+        + [expr for f in SUB_INDICATORS for expr in (f"sum({f})", f"sum({f} * {f})")]
+    )
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            'CREATE TRIGGER IF NOT EXISTS "trg_playerprofile_baseline_insert" '
+            f"AFTER INSERT ON playerprofile BEGIN {add('NEW')} END"
+        )
+        conn.exec_driver_sql(
+            'CREATE TRIGGER IF NOT EXISTS "trg_playerprofile_baseline_delete" '
+            f"AFTER DELETE ON playerprofile BEGIN {remove('OLD')} END"
+        )
+        conn.exec_driver_sql(
+            'CREATE TRIGGER IF NOT EXISTS "trg_playerprofile_baseline_update" '
+            f"AFTER UPDATE OF {profile_columns} ON playerprofile BEGIN {remove('OLD')} {add('NEW')} END"
+        )
+        conn.exec_driver_sql("DELETE FROM agebaseline")
+        conn.exec_driver_sql(
+            f"INSERT INTO agebaseline ({columns}) SELECT {aggregates} FROM playerprofile "
+            "WHERE birthdate IS NOT NULL GROUP BY 1, 2, 3"
+        )
+
+
+def sync_indexes():
+    """
+    Bring the indexes of an existing database in line with the models.
+    create_all only indexes tables it creates, so older databases keep the
+    single-column ix_* indexes (incl. the redundant ones on primary keys).
+    Indexes named ix_* that are no longer declared are dropped, declared ones
+    are created if missing.
+    """
+    with engine.begin() as conn:
+        for table in SQLModel.metadata.sorted_tables:
+            declared = {ix.name for ix in table.indexes}
+            existing = conn.exec_driver_sql(
+                "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = ?", (table.name,)
+            ).fetchall()
+            for (name,) in existing:
+                if name.startswith("ix_") and name not in declared:
+                    conn.exec_driver_sql(f'DROP INDEX IF EXISTS "{name}"')
+            for ix in table.indexes:
+                ix.create(conn, checkfirst=True)
+
+
+def get_session():
+    with Session(engine) as session:
+        yield session
+
+
+def mark_changed(session: Session, topic: str) -> None:
+    """Publish `topic` after the next commit; needed for Core statements, which bypass before_flush."""
+    session.info.setdefault("changed_topics", set()).add(topic)
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_changed_topics(session, flush_context, instances):
+    if any(isinstance(obj, TOURNAMENT_VIEW_MODELS) for obj in chain(session.new, session.dirty, session.deleted)):
+        mark_changed(session, "tournaments")
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_changed_topics(session):
+    topics = session.info.pop("changed_topics", None)
+    if topics:
+        import broadcast
+
+        for topic in topics:
+            broadcast.publish(topic)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changed_topics(session):
+    session.info.pop("changed_topics", None)
+    session.info.pop("change_log", None)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_orm_changes(session, flush_context):
+    changelog.collect_flush(session)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_core_changes(orm_execute_state):
+    return changelog.capture_statement(orm_execute_state)
+
+
+@event.listens_for(Session, "before_commit")
+def _write_change_log(session):
+    # the commit's own flush would run after this event
+    session.flush()
+    changelog.flush_records(session)
+
+
+def key_of(model, id: UUID):
+    """Surrogate key of the row with public id `id`, as a scalar subquery."""
+    return select(model.pk).where(model.id == id).scalar_subquery()
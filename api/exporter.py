@@ -0,0 +1,450 @@
+"""
+Streaming export of players, evaluations, action stats and score snapshots.
+
+Rows come straight from database cursors (yield_per) and are written batch by
+batch, so memory stays constant regardless of the table size. The players
+export carries compute_score over each player's evaluations and stats; both
+tables are streamed ordered by player and merged with the player cursor
+instead of scoring player by player.
+
+    python exporter.py players --format csv > spieler.csv
+    python exporter.py evaluations --event-id <uuid> --format parquet -o bewertungen.parquet
+"""
+import argparse
+import csv
+import importlib
+import io
+import json
+import sys
+from datetime import date, datetime
+from itertools import groupby
+from typing import Dict, Iterator, List, Optional, Tuple
+from uuid import UUID
+
+from sqlmodel import Session, select
+
+from age_baselines import load_age_baselines
+from calibration import load_calibration
+from db import engine
+from models import ActionStat, Evaluation, Player, ScoreSnapshot, Tournament
+from scoring import EVALUATION_SCORE_COLUMNS, SCORING_MODEL, STAT_SCORE_COLUMNS, age_adjust, compute_score, event_dates
+
+EXPORT_DATASETS = ("players", "evaluations", "action_stats", "scores")
+EXPORT_FORMATS = ("csv", "ndjson", "parquet", "xlsx")
+MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+DEFAULT_BATCH_SIZE = 1000
+
+SCORE_COLUMNS = [
+    ("score", "float"),
+    ("technique", "float"),
+    ("physical", "float"),
+    ("intelligence", "float"),
+    ("mentality", "float"),
+    ("impact", "float"),
+    ("minutes", "int"),
+    ("evaluations", "int"),
+]
+
+# (column, type) per dataset; the types drive the Parquet schema
+COLUMNS: Dict[str, List[Tuple[str, str]]] = {
+    "players": [
+        ("id", "string"),
+        ("firstName", "string"),
+        ("lastName", "string"),
+        ("birthdate", "date"),
+        ("nation", "string"),
+        ("playsIn", "string"),
+        ("position", "string"),
+        ("club", "string"),
+        ("level", "string"),
+        ("height", "string"),
+        ("foot", "string"),
+        ("shortlisted", "bool"),
+        ("createdAt", "datetime"),
+        *SCORE_COLUMNS,
+        ("ageAdjustedScore", "float"),
+    ],
+    "evaluations": [
+        ("id", "string"),
+        ("eventId", "string"),
+        ("eventName", "string"),
+        ("playerId", "string"),
+        ("firstName", "string"),
+        ("lastName", "string"),
+        ("scoutName", "string"),
+        ("ratingTechnique", "int"),
+        ("ratingPhysical", "int"),
+        ("ratingIntelligence", "int"),
+        ("ratingMentality", "int"),
+        ("ratingImpact", "int"),
+        ("strengths", "string"),
+        ("weaknesses", "string"),
+        ("remarks", "string"),
+        ("createdAt", "datetime"),
+    ],
+    "action_stats": [
+        ("id", "string"),
+        ("eventId", "string"),
+        ("eventName", "string"),
+        ("playerId", "string"),
+        ("firstName", "string"),
+        ("lastName", "string"),
+        ("minutes", "int"),
+        ("shots", "int"),
+        ("passes", "int"),
+        ("duels", "int"),
+        ("goals", "int"),
+        ("assists", "int"),
+    ],
+    "scores": [
+        ("playerId", "string"),
+        ("firstName", "string"),
+        ("lastName", "string"),
+        ("eventId", "string"),
+        ("eventName", "string"),
+        ("eventDate", "date"),
+        ("model", "string"),
+        *SCORE_COLUMNS,
+        ("computedAt", "datetime"),
+    ],
+}
+
+
+def export_event_pks(
+    session: Session,
+    event_id: Optional[UUID] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+) -> Optional[List[int]]:
+    """Event filter as a list of tournament pks (None = no filter). Dates refer to the event date."""
+    if event_id is None and date_from is None and date_to is None:
+        return None
+    dates = event_dates(session)
+    pks = set(dates)
+    if event_id is not None:
+        pks &= set(session.exec(select(Tournament.pk).where(Tournament.id == event_id)).all())
+    if date_from is not None:
+        pks = {pk for pk in pks if dates[pk] >= date_from}
+    if date_to is not None:
+        pks = {pk for pk in pks if dates[pk] <= date_to}
+    return sorted(pks)
+
+
+def _score_fields(evals, stats, calibration, birthdate, baselines) -> dict:
+    result = compute_score(evals, stats, calibration)
+    sub = result["subIndicators"]
+    return {
+        "score": result["score"],
+        **sub,
+        "minutes": result["explain"]["per90"]["minutes"],
+        "evaluations": len(evals),
+        "ageAdjustedScore": age_adjust(result, birthdate, baselines)["score"],
+    }
+
+
+def _by_player(session: Session, columns, model, event_pks, batch_size):
+    query = select(*columns).where(model.player_pk.is_not(None))
+    if event_pks is not None:
+        query = query.where(model.event_pk.in_(event_pks))
+    query = query.order_by(model.player_pk).execution_options(yield_per=batch_size)
+    for player_pk, group in groupby(session.exec(query), key=lambda r: r.player_pk):
+        yield player_pk, list(group)
+
+
+# everything but photo_data and note
+PLAYER_EXPORT_COLUMNS = (
+    Player.pk,
+    Player.id,
+    Player.first_name,
+    Player.last_name,
+    Player.birthdate,
+    Player.nation,
+    Player.plays_in,
+    Player.position,
+    Player.club,
+    Player.level,
+    Player.height,
+    Player.foot,
+    Player.shortlisted,
+    Player.created_at,
+)
+
+
+def iter_players(session: Session, event_pks=None, batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[dict]:
+    """
+    Players with compute_score (scout-calibrated) over their (filtered) evaluations and stats,
+    plus the score adjusted to their birth year (scoring.age_adjust).
+    With an event filter only players with data at those events are exported.
+    """
+    calibration = load_calibration(session)
+    baselines = load_age_baselines(session)
+    evals = _by_player(session, EVALUATION_SCORE_COLUMNS, Evaluation, event_pks, batch_size)
+    stats = _by_player(session, STAT_SCORE_COLUMNS, ActionStat, event_pks, batch_size)
+    ev, st = next(evals, None), next(stats, None)
+    players = session.exec(
+        select(*PLAYER_EXPORT_COLUMNS).order_by(Player.pk).execution_options(yield_per=batch_size)
+    )
+    for p in players:
+        while ev is not None and ev[0] < p.pk:
+            ev = next(evals, None)
+        while st is not None and st[0] < p.pk:
+            st = next(stats, None)
+        player_evals = ev[1] if ev is not None and ev[0] == p.pk else []
+        player_stats = st[1] if st is not None and st[0] == p.pk else []
+        if event_pks is not None and not player_evals and not player_stats:
+            continue
+        yield {
+            "id": str(p.id),
+            "firstName": p.first_name,
+            "lastName": p.last_name,
+            "birthdate": p.birthdate,
+            "nation": p.nation,
+            "playsIn": p.plays_in,
+            "position": p.position,
+            "club": p.club,
+            "level": p.level,
+            "height": p.height,
+            "foot": p.foot,
+            "shortlisted": p.shortlisted,
+            "createdAt": p.created_at,
+            **_score_fields(player_evals, player_stats, calibration, p.birthdate, baselines),
+        }
+
+
+def _joined(session: Session, model, event_pks, batch_size):
+    query = (
+        select(model, Player.first_name, Player.last_name, Tournament.name)
+        .join(Player, Player.pk == model.player_pk)
+        .outerjoin(Tournament, Tournament.pk == model.event_pk)
+    )
+    if event_pks is not None:
+        query = query.where(model.event_pk.in_(event_pks))
+    return session.exec(query.order_by(model.pk).execution_options(yield_per=batch_size))
+
+
+def iter_evaluations(session: Session, event_pks=None, batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[dict]:
+    for r, first_name, last_name, event_name in _joined(session, Evaluation, event_pks, batch_size):
+        yield {
+            "id": str(r.id),
+            "eventId": str(r.event_id),
+            "eventName": event_name,
+            "playerId": str(r.player_id),
+            "firstName": first_name,
+            "lastName": last_name,
+            "scoutName": r.scout_name,
+            "ratingTechnique": r.rating_technique,
+            "ratingPhysical": r.rating_physical,
+            "ratingIntelligence": r.rating_intelligence,
+            "ratingMentality": r.rating_mentality,
+            "ratingImpact": r.rating_impact,
+            "strengths": r.strengths,
+            "weaknesses": r.weaknesses,
+            "remarks": r.remarks,
+            "createdAt": r.created_at,
+        }
+
+
+def iter_action_stats(session: Session, event_pks=None, batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[dict]:
+    for r, first_name, last_name, event_name in _joined(session, ActionStat, event_pks, batch_size):
+        yield {
+            "id": str(r.id),
+            "eventId": str(r.event_id),
+            "eventName": event_name,
+            "playerId": str(r.player_id),
+            "firstName": first_name,
+            "lastName": last_name,
+            "minutes": r.minutes,
+            "shots": r.shots,
+            "passes": r.passes,
+            "duels": r.duels,
+            "goals": r.goals,
+            "assists": r.assists,
+        }
+
+
+def iter_scores(
+    session: Session, event_pks=None, batch_size: int = DEFAULT_BATCH_SIZE, model: str = SCORING_MODEL
+) -> Iterator[dict]:
+    """Stored ScoreSnapshots (see backfill_score_history) per player and event."""
+    query = (
+        select(ScoreSnapshot, Player.first_name, Player.last_name, Tournament.name)
+        .join(Player, Player.pk == ScoreSnapshot.player_pk)
+        .join(Tournament, Tournament.pk == ScoreSnapshot.event_pk)
+        .where(ScoreSnapshot.model == model)
+    )
+    if event_pks is not None:
+        query = query.where(ScoreSnapshot.event_pk.in_(event_pks))
+    query = query.order_by(ScoreSnapshot.pk).execution_options(yield_per=batch_size)
+    for s, first_name, last_name, event_name in session.exec(query):
+        yield {
+            "playerId": str(s.player_id),
+            "firstName": first_name,
+            "lastName": last_name,
+            "eventId": str(s.event_id),
+            "eventName": event_name,
+            "eventDate": s.event_date,
+            "model": s.model,
+            "score": s.score,
+            "technique": s.technique,
+            "physical": s.physical,
+            "intelligence": s.intelligence,
+            "mentality": s.mentality,
+            "impact": s.impact,
+            "minutes": s.minutes,
+            "evaluations": s.evaluation_count,
+            "computedAt": s.computed_at,
+        }
+
+
+def iter_rows(
+    session: Session,
+    dataset: str,
+    event_id: Optional[UUID] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    model: str = SCORING_MODEL,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> Iterator[dict]:
+    event_pks = export_event_pks(session, event_id, date_from, date_to)
+    if dataset == "scores":
+        return iter_scores(session, event_pks, batch_size, model=model)
+    producer = {"players": iter_players, "evaluations": iter_evaluations, "action_stats": iter_action_stats}[dataset]
+    return producer(session, event_pks, batch_size)
+
+
+def _text(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def _batched(rows: Iterator[dict], size: int) -> Iterator[List[dict]]:
+    batch: List[dict] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def write_csv(rows: Iterator[dict], columns, batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[bytes]:
+    names = [name for name, _ in columns]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(names)
+    for batch in _batched(rows, batch_size):
+        writer.writerows([_text(row[name]) for name in names] for row in batch)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def write_ndjson(rows: Iterator[dict], columns, batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[bytes]:
+    names = [name for name, _ in columns]
+    for batch in _batched(rows, batch_size):
+        yield "".join(
+            json.dumps({name: _text(row[name]) for name in names}, ensure_ascii=False) + "\n" for row in batch
+        ).encode("utf-8")
+
+
+def write_parquet(rows: Iterator[dict], columns, path, batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Parquet export requires pyarrow (pip install pyarrow)")
+    types = {"string": pa.string(), "int": pa.int64(), "float": pa.float64(), "bool": pa.bool_(),
+             "date": pa.date32(), "datetime": pa.timestamp("us")}
+    schema = pa.schema([(name, types[kind]) for name, kind in columns])
+    written = 0
+    with pq.ParquetWriter(path, schema) as writer:
+        for batch in _batched(rows, batch_size):
+            writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+            written += len(batch)
+    return written
+
+
+def write_xlsx(rows: Iterator[dict], columns, path) -> int:
+    try:
+        from openpyxl import Workbook
+    except ImportError:
+        raise ImportError("Excel export requires openpyxl (pip install openpyxl)")
+    names = [name for name, _ in columns]
+    # write-only mode streams rows to disk instead of building the sheet in memory
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(names)
+    written = 0
+    for row in rows:
+        sheet.append([row[name] for name in names])
+        written += 1
+    workbook.save(path)
+    return written
+
+
+OPTIONAL_WRITERS = {"parquet": "pyarrow", "xlsx": "openpyxl"}
+
+
+def check_format(fmt: str) -> None:
+    """Raise ImportError before streaming starts if the optional writer for `fmt` is missing."""
+    module = OPTIONAL_WRITERS.get(fmt)
+    if module:
+        try:
+            importlib.import_module(module)
+        except ImportError:
+            raise ImportError(f"{fmt} export requires {module} (pip install {module})")
+
+
+def stream_export(dataset: str, fmt: str, bind=None, **filters) -> Iterator[bytes]:
+    """CSV/NDJSON byte stream; owns its session so it can outlive the request scope."""
+    writer = write_csv if fmt == "csv" else write_ndjson
+    with Session(bind or engine) as session:
+        yield from writer(iter_rows(session, dataset, **filters), COLUMNS[dataset])
+
+
+def export_to_file(dataset: str, fmt: str, path: str, bind=None, **filters) -> None:
+    with Session(bind or engine) as session:
+        rows = iter_rows(session, dataset, **filters)
+        if fmt == "parquet":
+            write_parquet(rows, COLUMNS[dataset], path)
+        elif fmt == "xlsx":
+            write_xlsx(rows, COLUMNS[dataset], path)
+        else:
+            writer = write_csv if fmt == "csv" else write_ndjson
+            with open(path, "wb") as handle:
+                for chunk in writer(rows, COLUMNS[dataset]):
+                    handle.write(chunk)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export players, evaluations, action stats or scores.")
+    parser.add_argument("dataset", choices=EXPORT_DATASETS)
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default="csv")
+    parser.add_argument("-o", "--output", help="file to write (default: stdout for csv/ndjson)")
+    parser.add_argument("--event-id", type=UUID)
+    parser.add_argument("--from", dest="date_from", type=date.fromisoformat, help="event date from (YYYY-MM-DD)")
+    parser.add_argument("--to", dest="date_to", type=date.fromisoformat, help="event date to (YYYY-MM-DD)")
+    parser.add_argument("--model", default=SCORING_MODEL, help="scoring model for the scores export")
+    args = parser.parse_args()
+
+    filters = {"event_id": args.event_id, "date_from": args.date_from, "date_to": args.date_to, "model": args.model}
+    if args.output:
+        export_to_file(args.dataset, args.format, args.output, **filters)
+    elif args.format in ("csv", "ndjson"):
+        for chunk in stream_export(args.dataset, args.format, **filters):
+            sys.stdout.buffer.write(chunk)
+    else:
+        parser.error(f"--output is required for {args.format}")
+
+
+if __name__ == "__main__":
+    main()
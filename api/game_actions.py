@@ -0,0 +1,178 @@
+"""
+Event-level stats: GameActions tagged on a game's timeline, and their roll-up
+into ActionStat.
+
+A GameAction is one shot, pass or duel of a player at a game-clock second,
+with an outcome (ACTION_OUTCOMES) and optionally the pitch position. They are
+written in bulk per game (POST /tournaments/{id}/games/{id}/actions).
+
+Roll-up: per player and event (tournament) one ActionStat row with
+source="game_actions" holds the totals of the player's actions (ROLLUP) and
+as minutes the length of every game with at least one action of the player
+(Game.duration_minutes, else scheduling.DEFAULT_GAME_MINUTES). rollup()
+rewrites exactly the rows of the touched (player, event) pairs after every
+write, deletes rows left without actions and refreshes the score snapshots
+and profiles of those pairs, so scoring, weighting and the ActionStatTotal
+triggers see tagged games like entered totals. Manually entered stats of the
+same player and event are added on top; the importer only updates manual rows.
+
+Clips: a GameVideo covers the game clock from its start_second for its
+duration; clip() maps an action to the video and the seconds within it.
+"""
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from uuid import uuid4
+
+from sqlalchemy import bindparam, case, delete as sa_delete, func, insert as sa_insert, update as sa_update
+from sqlmodel import Session, select
+
+from changelog import ROW_KEY_PARAM
+from models import ActionStat, Game, GameAction, GameVideo, Player, Tournament
+from scheduling import DEFAULT_GAME_MINUTES
+
+# action -> allowed outcomes (None: no outcome recorded)
+ACTION_OUTCOMES: Dict[str, Tuple[Optional[str], ...]] = {
+    "shot": ("goal", "on_target", "off_target", "blocked", None),
+    "pass": ("complete", "incomplete", "assist", None),
+    "duel": ("won", "lost", None),
+}
+
+# ActionStat column -> condition on a GameAction counted into it
+ROLLUP = {
+    "shots": GameAction.action == "shot",
+    "goals": (GameAction.action == "shot") & (GameAction.outcome == "goal"),
+    "passes": GameAction.action == "pass",
+    "assists": (GameAction.action == "pass") & (GameAction.outcome == "assist"),
+    "duels": GameAction.action == "duel",
+}
+ROLLUP_SOURCE = "game_actions"
+
+# video states that can be played
+PLAYABLE = ("uploaded", "processing", "ready")
+
+
+def validation_error(action: str, outcome: Optional[str]) -> Optional[str]:
+    if action not in ACTION_OUTCOMES:
+        return f"action must be one of {', '.join(ACTION_OUTCOMES)}"
+    if outcome not in ACTION_OUTCOMES[action]:
+        allowed = ", ".join(o for o in ACTION_OUTCOMES[action] if o)
+        return f"outcome of a {action} must be one of {allowed} or empty"
+    return None
+
+
+def rollup(session: Session, pairs: Iterable[Tuple[int, int]]) -> int:
+    """
+    Rewrite the derived ActionStat rows of these (player_pk, event_pk) pairs
+    from their GameActions and refresh their scores; the caller commits.
+    Returns the number of derived rows written or removed.
+    """
+    from scoring import refresh_score_snapshots
+
+    pairs = {(p, e) for p, e in pairs if p is not None and e is not None}
+    if not pairs:
+        return 0
+    player_pks = {p for p, _ in pairs}
+    event_pks = {e for _, e in pairs}
+    totals: Dict[tuple, dict] = {}
+    for row in session.exec(
+        select(
+            GameAction.player_pk,
+            GameAction.event_pk,
+            Game.duration_minutes,
+            *(func.sum(case((condition, 1), else_=0)).label(column) for column, condition in ROLLUP.items()),
+        )
+        .join(Game, Game.pk == GameAction.game_pk)
+        .where(GameAction.player_pk.in_(player_pks), GameAction.event_pk.in_(event_pks))
+        .group_by(GameAction.player_pk, GameAction.event_pk, GameAction.game_pk)
+    ):
+        key = (row.player_pk, row.event_pk)
+        if key not in pairs:
+            continue
+        total = totals.setdefault(key, {"minutes": 0, **{column: 0 for column in ROLLUP}})
+        total["minutes"] += row.duration_minutes or DEFAULT_GAME_MINUTES
+        for column in ROLLUP:
+            total[column] += getattr(row, column)
+    existing: Dict[tuple, int] = {}
+    for pk, player_pk, event_pk in session.exec(
+        select(ActionStat.pk, ActionStat.player_pk, ActionStat.event_pk).where(
+            ActionStat.source == ROLLUP_SOURCE,
+            ActionStat.player_pk.in_(player_pks),
+            ActionStat.event_pk.in_(event_pks),
+        )
+    ):
+        if (player_pk, event_pk) in pairs:
+            existing[(player_pk, event_pk)] = pk
+    table = ActionStat.__table__
+    updates = [{ROW_KEY_PARAM: existing[key], **values} for key, values in totals.items() if key in existing]
+    if updates:
+        fields = list(updates[0].keys() - {ROW_KEY_PARAM})
+        stmt = sa_update(table).where(table.c.pk == bindparam(ROW_KEY_PARAM)).values({f: bindparam(f) for f in fields})
+        session.execute(stmt, updates)
+    new = [key for key in totals if key not in existing]
+    if new:
+        player_ids = dict(session.exec(select(Player.pk, Player.id).where(Player.pk.in_({p for p, _ in new}))).all())
+        event_ids = dict(session.exec(select(Tournament.pk, Tournament.id).where(Tournament.pk.in_({e for _, e in new}))).all())
+        session.execute(
+            sa_insert(table),
+            [
+                {
+                    "id": uuid4(),
+                    "player_id": player_ids[p],
+                    "player_pk": p,
+                    "event_id": event_ids[e],
+                    "event_pk": e,
+                    "source": ROLLUP_SOURCE,
+                    **totals[(p, e)],
+                }
+                for p, e in new
+            ],
+        )
+    gone = [pk for key, pk in existing.items() if key not in totals]
+    if gone:
+        session.execute(sa_delete(table).where(table.c.pk.in_(gone)))
+    refresh_score_snapshots(session, pairs)
+    return len(totals) + len(gone)
+
+
+def delete_for_games(session: Session, game_pks: List[int]) -> Set[Tuple[int, int]]:
+    """Delete the actions of these games (game deleted) and roll up the affected players; the caller commits."""
+    if not game_pks:
+        return set()
+    table = GameAction.__table__
+    pairs = set(
+        session.exec(
+            select(GameAction.player_pk, GameAction.event_pk).where(GameAction.game_pk.in_(game_pks)).distinct()
+        ).all()
+    )
+    session.execute(sa_delete(table).where(table.c.game_pk.in_(game_pks)))
+    rollup(session, pairs)
+    return pairs
+
+
+def clip(videos: List[GameVideo], second: float, before: float, after: float) -> Optional[dict]:
+    """Video covering game second `second` and the clip window around it (seconds within the video)."""
+    covering = [
+        v
+        for v in videos
+        if v.status in PLAYABLE
+        and v.size_bytes
+        and v.start_second <= second
+        and (v.duration_seconds is None or second <= v.start_second + v.duration_seconds)
+    ]
+    if not covering:
+        return None
+    # overlapping recordings: the one that started last, i.e. the current half
+    video = max(covering, key=lambda v: v.start_second)
+    offset = second - video.start_second
+    start = max(0.0, offset - before)
+    end = offset + after
+    if video.duration_seconds is not None:
+        end = min(end, video.duration_seconds)
+    start, end = round(start, 2), round(end, 2)
+    return {
+        "videoId": str(video.id),
+        "videoName": video.name,
+        "start": start,
+        "end": end,
+        # W3C media fragment: browsers play exactly this window
+        "url": f"/videos/{video.id}/content#t={start},{end}",
+    }
@@ -0,0 +1,510 @@
+"""
+Bulk import of players, action stats and evaluations from CSV or Parquet.
+
+Files are read in chunks (csv.DictReader / pyarrow iter_batches), every row
+is validated and mapped onto the models, and each chunk is written in one
+transaction together with the progress of its ImportRun. Players are matched
+by first name, last name and birthdate and updated in place; stats are
+upserted per player and event, evaluations are appended.
+
+    python importer.py spieler.csv --kind players
+    python importer.py stats.parquet --kind action_stats --event-id <uuid>
+"""
+import argparse
+import csv
+import json
+import os
+import re
+import tempfile
+from datetime import date, datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from uuid import UUID, uuid4
+
+from pydantic import BaseModel, Field, ValidationError, model_validator
+from sqlalchemy import bindparam, insert, update
+from sqlmodel import Session, select
+
+from db import engine, migrate
+from models import ActionStat, Evaluation, ImportRun, Player, Tournament
+from schemas import PlayerCreate
+from scoring import refresh_score_snapshots
+
+IMPORT_KINDS = ("players", "action_stats", "evaluations")
+IMPORT_FORMATS = ("csv", "parquet")
+DEFAULT_CHUNK_SIZE = 1000
+# row errors kept on the ImportRun; counts are always complete
+MAX_STORED_ERRORS = 200
+
+
+class PlayerRef(BaseModel):
+    playerId: Optional[UUID] = None
+    firstName: Optional[str] = None
+    lastName: Optional[str] = None
+    birthdate: Optional[date] = None
+
+    @model_validator(mode="after")
+    def check_player_ref(self):
+        if self.playerId is None and not (self.firstName and self.lastName and self.birthdate):
+            raise ValueError("playerId or firstName, lastName and birthdate required")
+        return self
+
+
+class ActionStatImportRow(PlayerRef):
+    eventId: UUID
+    minutes: int = Field(default=0, ge=0)
+    shots: int = Field(default=0, ge=0)
+    passes: int = Field(default=0, ge=0)
+    duels: int = Field(default=0, ge=0)
+    goals: int = Field(default=0, ge=0)
+    assists: int = Field(default=0, ge=0)
+
+
+class EvaluationImportRow(PlayerRef):
+    eventId: UUID
+    scoutName: str = "Scout"
+    ratingTechnique: int = Field(default=3, ge=1, le=5)
+    ratingPhysical: int = Field(default=3, ge=1, le=5)
+    ratingIntelligence: int = Field(default=3, ge=1, le=5)
+    ratingMentality: int = Field(default=3, ge=1, le=5)
+    ratingImpact: int = Field(default=3, ge=1, le=5)
+    strengths: Optional[str] = None
+    weaknesses: Optional[str] = None
+    remarks: Optional[str] = None
+
+
+ROW_MODELS = {
+    "players": PlayerCreate,
+    "action_stats": ActionStatImportRow,
+    "evaluations": EvaluationImportRow,
+}
+
+# header aliases (normalized: lower case, without spaces/underscores/dashes)
+HEADER_ALIASES = {
+    "vorname": "firstName",
+    "nachname": "lastName",
+    "name": "lastName",
+    "geburtsdatum": "birthdate",
+    "dob": "birthdate",
+    "nationalitaet": "nation",
+    "nationalität": "nation",
+    "land": "playsIn",
+    "verein": "club",
+    "liga": "level",
+    "groesse": "height",
+    "größe": "height",
+    "fuss": "foot",
+    "fuß": "foot",
+    "notiz": "note",
+    "spielerid": "playerId",
+    "eventid": "eventId",
+    "turnierid": "eventId",
+    "minuten": "minutes",
+    "schuesse": "shots",
+    "schüsse": "shots",
+    "paesse": "passes",
+    "pässe": "passes",
+    "zweikaempfe": "duels",
+    "zweikämpfe": "duels",
+    "tore": "goals",
+    "vorlagen": "assists",
+    "scout": "scoutName",
+    "staerken": "strengths",
+    "stärken": "strengths",
+    "schwaechen": "weaknesses",
+    "schwächen": "weaknesses",
+    "bemerkungen": "remarks",
+}
+
+GERMAN_DATE = re.compile(r"^(\d{1,2})\.(\d{1,2})\.(\d{4})$")
+
+
+def normalize_header(name: str) -> str:
+    return re.sub(r"[\s_\-]", "", str(name)).lower()
+
+
+def build_column_map(headers: List[str], kind: str, mapping: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    """File header -> row model field. Explicit `mapping` entries win over aliases."""
+    fields = ROW_MODELS[kind].model_fields
+    by_normalized = {normalize_header(f): f for f in fields}
+    by_normalized.update({k: v for k, v in HEADER_ALIASES.items() if v in fields})
+    # snake_case model column names (first_name, event_id, ...) normalize to the same keys
+    column_map = {}
+    for header in headers:
+        field = (mapping or {}).get(header) or by_normalized.get(normalize_header(header))
+        if field in fields:
+            column_map[header] = field
+    return column_map
+
+
+def clean_value(field: str, value: Any) -> Any:
+    if value is None:
+        return None
+    if isinstance(value, float) and value != value:  # NaN from Parquet
+        return None
+    if isinstance(value, str):
+        value = value.strip()
+        if value == "":
+            return None
+        if field == "birthdate":
+            match = GERMAN_DATE.match(value)
+            if match:
+                day, month, year = match.groups()
+                return f"{year}-{int(month):02d}-{int(day):02d}"
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def iter_csv_chunks(path: str, chunk_size: int) -> Iterator[Tuple[List[str], List[dict]]]:
+    with open(path, newline="", encoding="utf-8-sig") as handle:
+        sample = handle.read(8192)
+        handle.seek(0)
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=",;\t")
+        except csv.Error:
+            dialect = csv.excel
+        reader = csv.DictReader(handle, dialect=dialect)
+        chunk: List[dict] = []
+        for row in reader:
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                yield reader.fieldnames or [], chunk
+                chunk = []
+        if chunk:
+            yield reader.fieldnames or [], chunk
+
+
+def iter_parquet_chunks(path: str, chunk_size: int) -> Iterator[Tuple[List[str], List[dict]]]:
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Parquet import requires pyarrow (pip install pyarrow)")
+    parquet = pq.ParquetFile(path)
+    headers = parquet.schema_arrow.names
+    for batch in parquet.iter_batches(batch_size=chunk_size):
+        yield headers, batch.to_pylist()
+
+
+def iter_chunks(path: str, fmt: str, chunk_size: int):
+    if fmt == "parquet":
+        return iter_parquet_chunks(path, chunk_size)
+    return iter_csv_chunks(path, chunk_size)
+
+
+def validate_chunk(kind: str, rows: List[dict], column_map: Dict[str, str], first_row: int, defaults: Dict[str, Any]):
+    model = ROW_MODELS[kind]
+    valid, errors = [], []
+    for offset, raw in enumerate(rows):
+        data = dict(defaults)
+        for header, field in column_map.items():
+            value = clean_value(field, raw.get(header))
+            if value is not None:
+                data[field] = value
+        try:
+            valid.append((first_row + offset, model.model_validate(data)))
+        except ValidationError as exc:
+            message = "; ".join(f"{'.'.join(str(p) for p in e['loc']) or 'row'}: {e['msg']}" for e in exc.errors())
+            errors.append({"row": first_row + offset, "error": message})
+    return valid, errors
+
+
+def find_players(session: Session, keys) -> Dict[tuple, Tuple[int, UUID]]:
+    """
+    (first_name, last_name, birthdate) -> (pk, id). One query with an IN list per
+    column (SQLite only searches ix_player_name_birthdate for those, not for row
+    values); exact keys are matched here.
+    """
+    keys = set(keys)
+    if not keys:
+        return {}
+    rows = session.exec(
+        select(Player.first_name, Player.last_name, Player.birthdate, Player.pk, Player.id).where(
+            Player.first_name.in_({k[0] for k in keys}),
+            Player.last_name.in_({k[1] for k in keys}),
+            Player.birthdate.in_({k[2] for k in keys}),
+        )
+    ).all()
+    found = {}
+    for r in rows:
+        key = (r.first_name, r.last_name, r.birthdate)
+        if key in keys:
+            found.setdefault(key, (r.pk, r.id))
+    return found
+
+
+PLAYER_COLUMNS = {
+    "firstName": "first_name",
+    "lastName": "last_name",
+    "birthdate": "birthdate",
+    "nation": "nation",
+    "playsIn": "plays_in",
+    "position": "position",
+    "club": "club",
+    "level": "level",
+    "height": "height",
+    "foot": "foot",
+    "note": "note",
+    "photoData": "photo_data",
+    "shortlisted": "shortlisted",
+}
+
+
+def write_players(session: Session, rows: List[Tuple[int, PlayerCreate]]) -> int:
+    existing = find_players(session, [(r.firstName, r.lastName, r.birthdate) for _, r in rows])
+    inserts: Dict[tuple, dict] = {}
+    updates: Dict[frozenset, List[dict]] = {}
+    for _, row in rows:
+        key = (row.firstName, row.lastName, row.birthdate)
+        values = {PLAYER_COLUMNS[f]: v for f, v in row.model_dump(exclude_unset=True).items() if v is not None}
+        if key in existing:
+            # only the fields present in the file are overwritten
+            values["b_pk"] = existing[key][0]
+            updates.setdefault(frozenset(values), []).append(values)
+        else:
+            # later rows for the same player within a chunk win
+            inserts.setdefault(key, {}).update(values)
+    if inserts:
+        # executemany needs the same keys in every row
+        base = {column: None for column in PLAYER_COLUMNS.values()}
+        base.update(shortlisted=False, created_at=datetime.utcnow())
+        session.execute(
+            insert(Player.__table__),
+            [{**base, "id": uuid4(), "unique_id": uuid4().hex, **values} for values in inserts.values()],
+        )
+    for columns, params in updates.items():
+        stmt = (
+            update(Player.__table__)
+            .where(Player.__table__.c.pk == bindparam("b_pk"))
+            .values({c: bindparam(c) for c in columns if c != "b_pk"})
+        )
+        session.execute(stmt, params)
+    return len(rows)
+
+
+def resolve_refs(session: Session, rows) -> Tuple[list, list]:
+    """Attach (player_pk, player_id, event_pk) to stat/evaluation rows; rows with unknown refs become errors."""
+    by_name = find_players(
+        session, [(r.firstName, r.lastName, r.birthdate) for _, r in rows if r.playerId is None]
+    )
+    player_ids = {r.playerId for _, r in rows if r.playerId is not None}
+    by_id = {}
+    if player_ids:
+        by_id = {pid: pk for pk, pid in session.exec(select(Player.pk, Player.id).where(Player.id.in_(player_ids)))}
+    event_ids = {r.eventId for _, r in rows}
+    events = {eid: pk for pk, eid in session.exec(select(Tournament.pk, Tournament.id).where(Tournament.id.in_(event_ids)))}
+    resolved, errors = [], []
+    for line, row in rows:
+        if row.playerId is not None:
+            player = (by_id[row.playerId], row.playerId) if row.playerId in by_id else None
+        else:
+            player = by_name.get((row.firstName, row.lastName, row.birthdate))
+        if player is None:
+            errors.append({"row": line, "error": "player not found"})
+        elif row.eventId not in events:
+            errors.append({"row": line, "error": "event not found"})
+        else:
+            resolved.append((row, player[0], player[1], events[row.eventId]))
+    return resolved, errors
+
+
+STAT_FIELDS = ("minutes", "shots", "passes", "duels", "goals", "assists")
+
+
+def write_action_stats(session: Session, resolved) -> int:
+    pairs = {(player_pk, event_pk) for _, player_pk, _, event_pk in resolved}
+    existing: Dict[tuple, int] = {}
+    if pairs:
+        for pk, player_pk, event_pk in session.exec(
+            select(ActionStat.pk, ActionStat.player_pk, ActionStat.event_pk)
+            .where(
+                # rows rolled up from tagged game actions are rewritten by game_actions.rollup()
+                ActionStat.source == "manual",
+                ActionStat.player_pk.in_({p for p, _ in pairs}),
+                ActionStat.event_pk.in_({e for _, e in pairs}),
+            )
+            .order_by(ActionStat.pk)
+        ):
+            if (player_pk, event_pk) in pairs:
+                existing.setdefault((player_pk, event_pk), pk)
+    inserts: Dict[tuple, dict] = {}
+    updates: Dict[tuple, dict] = {}
+    for row, player_pk, player_id, event_pk in resolved:
+        values = {f: getattr(row, f) for f in STAT_FIELDS}
+        key = (player_pk, event_pk)
+        if key in existing:
+            updates[key] = {"b_pk": existing[key], **values}
+        else:
+            inserts[key] = {
+                "id": uuid4(),
+                "player_id": player_id,
+                "player_pk": player_pk,
+                "event_id": row.eventId,
+                "event_pk": event_pk,
+                **values,
+            }
+    if inserts:
+        session.execute(insert(ActionStat.__table__), list(inserts.values()))
+    if updates:
+        table = ActionStat.__table__
+        stmt = update(table).where(table.c.pk == bindparam("b_pk")).values({f: bindparam(f) for f in STAT_FIELDS})
+        session.execute(stmt, list(updates.values()))
+    refresh_score_snapshots(session, pairs)
+    return len(resolved)
+
+
+def write_evaluations(session: Session, resolved) -> int:
+    now = datetime.utcnow()
+    session.execute(
+        insert(Evaluation.__table__),
+        [
+            {
+                "id": uuid4(),
+                "player_id": player_id,
+                "player_pk": player_pk,
+                "event_id": row.eventId,
+                "event_pk": event_pk,
+                "scout_name": row.scoutName,
+                "rating_technique": row.ratingTechnique,
+                "rating_physical": row.ratingPhysical,
+                "rating_intelligence": row.ratingIntelligence,
+                "rating_mentality": row.ratingMentality,
+                "rating_impact": row.ratingImpact,
+                "strengths": row.strengths,
+                "weaknesses": row.weaknesses,
+                "remarks": row.remarks,
+                "created_at": now,
+            }
+            for row, player_pk, player_id, event_pk in resolved
+        ],
+    )
+    refresh_score_snapshots(session, {(player_pk, event_pk) for _, player_pk, _, event_pk in resolved})
+    return len(resolved)
+
+
+def run_import(
+    run_id: UUID,
+    path: str,
+    kind: str,
+    fmt: str = "csv",
+    mapping: Optional[Dict[str, str]] = None,
+    event_id: Optional[UUID] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    on_progress=None,
+) -> ImportRun:
+    """Process one file for an existing ImportRun. Every chunk is committed with the run's progress."""
+    from jobs import JobCancelled
+
+    defaults = {"eventId": event_id} if event_id and kind != "players" else {}
+    cancelled = False
+    with Session(engine, info={"actor": f"import:{run_id}"}) as session:
+        run = session.get(ImportRun, run_id)
+        run.status = "running"
+        session.add(run)
+        session.commit()
+        errors: List[dict] = []
+        line = 2  # first data line after the header
+        try:
+            for headers, rows in iter_chunks(path, fmt, chunk_size):
+                column_map = build_column_map(headers, kind, mapping)
+                valid, chunk_errors = validate_chunk(kind, rows, column_map, line, defaults)
+                line += len(rows)
+                if kind == "players":
+                    imported = write_players(session, valid) if valid else 0
+                else:
+                    resolved, ref_errors = resolve_refs(session, valid) if valid else ([], [])
+                    chunk_errors += ref_errors
+                    writer = write_action_stats if kind == "action_stats" else write_evaluations
+                    imported = writer(session, resolved) if resolved else 0
+                errors.extend(chunk_errors[: max(0, MAX_STORED_ERRORS - len(errors))])
+                run.rows_read += len(rows)
+                run.rows_imported += imported
+                run.rows_failed += len(chunk_errors)
+                run.errors = json.dumps(errors)
+                session.add(run)
+                session.commit()
+                if on_progress:
+                    on_progress(run)
+            run.status = "done"
+        except JobCancelled:  # raised by on_progress; the committed chunks stay
+            cancelled = True
+            run.status = "cancelled"
+        except Exception as exc:  # keep the committed chunks, report the failure on the run
+            session.rollback()
+            run = session.get(ImportRun, run_id)
+            run.status = "failed"
+            run.message = str(exc) or exc.__class__.__name__
+        run.finished_at = datetime.utcnow()
+        session.add(run)
+        session.commit()
+        session.refresh(run)
+        if cancelled:
+            raise JobCancelled()
+        return run
+
+
+def upload_path(run_id: UUID, fmt: str) -> str:
+    """Where POST /imports keeps the uploaded file of a run until its job has processed it."""
+    return os.path.join(tempfile.gettempdir(), f"import-{run_id.hex}.{fmt}")
+
+
+def run_import_file(run_id: UUID, mapping, event_id, on_progress=None) -> None:
+    """Job wrapper: imports the upload of an ImportRun and removes it afterwards.
+    Kind, format and file come from the run row, never from job params."""
+    with Session(engine) as session:
+        run = session.get(ImportRun, run_id)
+        if run is None:
+            raise ValueError(f"Unknown import run {run_id}")
+        kind, fmt = run.kind, run.format
+    if kind not in IMPORT_KINDS or fmt not in IMPORT_FORMATS:
+        raise ValueError(f"Unsupported import {kind}/{fmt}")
+    path = upload_path(run_id, fmt)
+    try:
+        run_import(run_id, path, kind, fmt, mapping=mapping, event_id=event_id, on_progress=on_progress)
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def parse_mapping(pairs: Optional[List[str]]) -> Dict[str, str]:
+    """["Spalte=firstName", ...] or "Spalte=firstName,Andere=lastName" -> dict."""
+    result = {}
+    for pair in pairs or []:
+        for part in pair.split(","):
+            if "=" in part:
+                src, dst = part.split("=", 1)
+                result[src.strip()] = dst.strip()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import players, action stats or evaluations from CSV/Parquet.")
+    parser.add_argument("path")
+    parser.add_argument("--kind", choices=IMPORT_KINDS, required=True)
+    parser.add_argument("--format", choices=IMPORT_FORMATS, help="default: from the file extension")
+    parser.add_argument("--event-id", type=UUID, help="event for rows without an eventId column")
+    parser.add_argument("--map", action="append", help="column mapping, e.g. --map 'Spieler Vorname=firstName'")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    fmt = args.format or ("parquet" if args.path.endswith(".parquet") else "csv")
+    migrate()
+    with Session(engine) as session:
+        run = ImportRun(kind=args.kind, format=fmt, filename=os.path.basename(args.path))
+        session.add(run)
+        session.commit()
+        run_id = run.id
+
+    def progress(r: ImportRun):
+        print(f"{r.rows_read} Zeilen gelesen, {r.rows_imported} importiert, {r.rows_failed} fehlerhaft")
+
+    run = run_import(
+        run_id, args.path, args.kind, fmt, mapping=parse_mapping(args.map), event_id=args.event_id,
+        chunk_size=args.chunk_size, on_progress=progress,
+    )
+    for error in json.loads(run.errors or "[]")[:20]:
+        print(f"Zeile {error['row']}: {error['error']}")
+    print(f"Import {run.status}: {run.rows_imported}/{run.rows_read} Zeilen" + (f" ({run.message})" if run.message else ""))
+
+
+if __name__ == "__main__":
+    main()
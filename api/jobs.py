@@ -0,0 +1,333 @@
+"""
+Background jobs backed by the `job` table (no external broker).
+
+Endpoints enqueue a Job row and return right away; worker threads claim
+queued jobs with a single UPDATE ... RETURNING, which SQLite executes
+atomically, so several threads or processes can share the queue. A handler
+gets the job params and a JobContext for progress reports; the result (or the
+error) is stored on the row and kept for settings.job_retention_days.
+
+Cancellation is cooperative: queued jobs are cancelled immediately, running
+jobs raise JobCancelled at their next progress report. Handlers commit before
+reporting progress (SQLite allows one writer), so a cancelled job keeps the
+batches it finished.
+"""
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional
+from uuid import UUID
+
+from sqlalchemy import delete, select as sa_select, update
+from sqlmodel import Session
+
+import broadcast
+from db import engine, settings
+from maintenance import dedupe_players
+from models import Job
+from scoring import SCORING_MODEL, backfill_score_history
+
+logger = logging.getLogger("talentlab.jobs")
+
+# fallback when no broadcast wakes the runner (e.g. a job enqueued by a CLI)
+POLL_INTERVAL = 2.0
+# running jobs without a heartbeat for this long belong to a dead worker
+STALE_AFTER = timedelta(minutes=10)
+# minimum seconds between two progress writes of one job
+PROGRESS_INTERVAL = 0.5
+# seconds between heartbeats of JobContext.keepalive(), well below STALE_AFTER
+HEARTBEAT_INTERVAL = 60.0
+
+FINISHED = ("done", "failed", "cancelled")
+
+JOB_HANDLERS: Dict[str, Callable[["JobContext", Dict[str, Any]], Any]] = {}
+# kinds clients may enqueue via POST /jobs; the others ("import", "process_video")
+# are queued by their own endpoints and act on server-side rows
+PUBLIC_JOB_KINDS = ("seed_players", "dedupe_players", "backfill_score_history")
+
+
+def job_handler(kind: str):
+    def register(fn):
+        JOB_HANDLERS[kind] = fn
+        return fn
+
+    return register
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class JobContext:
+    """Passed to handlers: progress reporting doubles as heartbeat and cancellation check."""
+
+    def __init__(self, job_id: UUID):
+        self.job_id = job_id
+        self._last_write = 0.0
+
+    def progress(self, done: int, total: Optional[int] = None, message: Optional[str] = None) -> None:
+        now = time.monotonic()
+        if now - self._last_write < PROGRESS_INTERVAL and (total is None or done < total):
+            return
+        self._last_write = now
+        table = Job.__table__
+        values = {"heartbeat_at": datetime.utcnow(), "message": message or f"{done}" + (f"/{total}" if total else "")}
+        if total:
+            values["progress"] = min(1.0, done / total)
+        with engine.begin() as conn:
+            conn.execute(update(table).where(table.c.id == self.job_id).values(values))
+            cancel = conn.execute(sa_select(table.c.cancel_requested).where(table.c.id == self.job_id)).scalar()
+        if cancel:
+            raise JobCancelled()
+
+    def heartbeat(self) -> None:
+        table = Job.__table__
+        with engine.begin() as conn:
+            conn.execute(update(table).where(table.c.id == self.job_id).values(heartbeat_at=datetime.utcnow()))
+
+    @contextmanager
+    def keepalive(self, interval: float = HEARTBEAT_INTERVAL):
+        """
+        Heartbeats from a timer thread while the body blocks without progress
+        reports (waiting for an ffmpeg slot, probing), so recover_stale() does
+        not fail a job that is still running.
+        """
+        stop = threading.Event()
+
+        def beat():
+            while not stop.wait(interval):
+                try:
+                    self.heartbeat()
+                except Exception:
+                    logger.exception("heartbeat of job %s failed", self.job_id)
+
+        thread = threading.Thread(target=beat, name=f"job-heartbeat-{self.job_id.hex[:8]}", daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            thread.join()
+
+    def check_cancelled(self) -> None:
+        with Session(engine) as session:
+            job = session.get(Job, self.job_id)
+            if job is not None and job.cancel_requested:
+                raise JobCancelled()
+
+
+def enqueue(session: Session, kind: str, params: Dict[str, Any]) -> Job:
+    job = Job(kind=kind, params=json.dumps(params, default=str))
+    session.add(job)
+    session.commit()
+    session.refresh(job)
+    # wakes an idle runner in every worker process
+    broadcast.publish("jobs")
+    return job
+
+
+def request_cancel(session: Session, job: Job) -> Job:
+    if job.status == "queued":
+        job.status = "cancelled"
+        job.finished_at = datetime.utcnow()
+    elif job.status == "running":
+        job.cancel_requested = True
+    session.add(job)
+    session.commit()
+    session.refresh(job)
+    return job
+
+
+def claim_next(worker: str) -> Optional[UUID]:
+    table = Job.__table__
+    now = datetime.utcnow()
+    oldest = sa_select(table.c.pk).where(table.c.status == "queued").order_by(table.c.pk).limit(1).scalar_subquery()
+    stmt = (
+        update(table)
+        .where(table.c.pk == oldest, table.c.status == "queued")
+        .values(status="running", worker=worker, started_at=now, heartbeat_at=now)
+        .returning(table.c.id)
+    )
+    with engine.begin() as conn:
+        return conn.execute(stmt).scalar()
+
+
+def finish(job_id: UUID, status: str, result: Any = None, error: Optional[str] = None) -> None:
+    table = Job.__table__
+    values = {"status": status, "finished_at": datetime.utcnow(), "error": error}
+    if status == "done":
+        values.update(progress=1.0, result=json.dumps(result, default=str))
+    with engine.begin() as conn:
+        # a job recover_stale() already failed keeps that state
+        conn.execute(update(table).where(table.c.id == job_id, table.c.status == "running").values(values))
+
+
+def run_job(job_id: UUID) -> None:
+    with Session(engine) as session:
+        job = session.get(Job, job_id)
+        kind, params = job.kind, json.loads(job.params or "{}")
+    handler = JOB_HANDLERS.get(kind)
+    if handler is None:
+        finish(job_id, "failed", error=f"unknown job kind {kind}")
+        return
+    try:
+        result = handler(JobContext(job_id), params)
+    except JobCancelled:
+        finish(job_id, "cancelled")
+    except Exception as exc:
+        logger.exception("job %s (%s) failed", job_id, kind)
+        finish(job_id, "failed", error=str(exc) or exc.__class__.__name__)
+    else:
+        finish(job_id, "done", result=result)
+
+
+def recover_stale() -> int:
+    """Fail jobs whose worker stopped sending heartbeats (process killed or restarted)."""
+    table = Job.__table__
+    cutoff = datetime.utcnow() - STALE_AFTER
+    with engine.begin() as conn:
+        return conn.execute(
+            update(table)
+            .where(table.c.status == "running", table.c.heartbeat_at < cutoff)
+            .values(status="failed", error="worker lost", finished_at=datetime.utcnow())
+        ).rowcount
+
+
+def purge_finished(retention_days: Optional[int] = None) -> int:
+    table = Job.__table__
+    cutoff = datetime.utcnow() - timedelta(days=retention_days or settings.job_retention_days)
+    with engine.begin() as conn:
+        return conn.execute(
+            delete(table).where(table.c.status.in_(FINISHED), table.c.finished_at < cutoff)
+        ).rowcount
+
+
+def prune_change_log() -> Dict[str, int]:
+    """Retention and compaction of the change log (changelog.py)."""
+    import changelog
+
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        purged = changelog.purge(conn, now - timedelta(days=settings.change_retention_days))
+        merged = changelog.compact(conn, now - timedelta(days=settings.change_compact_days))
+    return {"purged": purged, "merged": merged}
+
+
+def purge_video_files() -> Dict[str, int]:
+    """Abandoned uploads and files of deleted videos (videos.py)."""
+    import videos
+
+    return videos.purge_files()
+
+
+class JobRunner:
+    def __init__(self):
+        self._threads = []
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._last_maintenance = 0.0
+
+    def start(self, workers: int) -> None:
+        if self._threads or workers <= 0:
+            return
+        self._stop.clear()
+        self.maintenance()
+        prefix = f"{socket.gethostname()}:{os.getpid()}"
+        for i in range(workers):
+            thread = threading.Thread(target=self._loop, args=(f"{prefix}:{i}",), name=f"job-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def wake(self) -> None:
+        self._wake.set()
+
+    def maintenance(self) -> None:
+        self._last_maintenance = time.monotonic()
+        try:
+            recover_stale()
+            purge_finished()
+            prune_change_log()
+            purge_video_files()
+        except Exception:
+            logger.exception("job maintenance failed")
+
+    def _loop(self, worker: str) -> None:
+        while not self._stop.is_set():
+            try:
+                job_id = claim_next(worker)
+            except Exception:
+                logger.exception("claiming a job failed")
+                job_id = None
+            if job_id is not None:
+                run_job(job_id)
+                continue
+            if time.monotonic() - self._last_maintenance > 3600:
+                self.maintenance()
+            self._wake.wait(POLL_INTERVAL)
+            self._wake.clear()
+
+
+runner = JobRunner()
+broadcast.subscribe("jobs", lambda payload: runner.wake())
+
+
+@job_handler("seed_players")
+def handle_seed_players(ctx: JobContext, params: Dict[str, Any]):
+    from seeding import seed_players
+
+    count = int(params.get("count", 50))
+    with Session(engine, info={"actor": "job:seed_players"}) as session:
+        created = seed_players(
+            session,
+            count=count,
+            min_age=int(params.get("min_age", 17)),
+            max_age=int(params.get("max_age", 28)),
+            progress=ctx.progress,
+        )
+    return {"created": created, "requested": count}
+
+
+@job_handler("dedupe_players")
+def handle_dedupe_players(ctx: JobContext, params: Dict[str, Any]):
+    with Session(engine, info={"actor": "job:dedupe_players"}) as session:
+        return dedupe_players(session, progress=ctx.progress)
+
+
+@job_handler("backfill_score_history")
+def handle_backfill_score_history(ctx: JobContext, params: Dict[str, Any]):
+    with Session(engine) as session:
+        written = backfill_score_history(session, progress=ctx.progress)
+    return {"snapshots": written, "model": SCORING_MODEL}
+
+
+@job_handler("import")
+def handle_import(ctx: JobContext, params: Dict[str, Any]):
+    import importer
+
+    event_id = UUID(params["eventId"]) if params.get("eventId") else None
+    importer.run_import_file(
+        UUID(params["runId"]), params.get("mapping") or None, event_id,
+        on_progress=lambda run: ctx.progress(run.rows_read),
+    )
+    ctx.check_cancelled()
+    return {"importId": params["runId"]}
+
+
+@job_handler("process_video")
+def handle_process_video(ctx: JobContext, params: Dict[str, Any]):
+    import videos
+
+    with ctx.keepalive():
+        return videos.process_video(UUID(params["videoId"]), progress=ctx.progress)
@@ -0,0 +1,51 @@
+"""Data clean-up run as background jobs (see jobs.py)."""
+from typing import Dict, List
+
+from sqlmodel import Session, select
+
+from models import (
+    ActionStat,
+    Evaluation,
+    GameAction,
+    GameLineup,
+    Player,
+    PlayerProfile,
+    RosterEntry,
+    ScoreSnapshot,
+    ShortlistEntry,
+    TournamentParticipant,
+)
+
+
+def dedupe_players(session: Session, progress=None) -> Dict[str, int]:
+    """
+    Entfernt doppelte Spieler basierend auf Vor- und Nachname (case-insensitiv).
+    Behalten wird jeweils der älteste Eintrag (created_at); alle anderen mit gleichem Namen werden gelöscht.
+    Referenzen in Roster/Evaluations/ActionStats/GameActions/Turnier-Teilnahmen/Lineups/Shortlists werden vorher entfernt.
+    """
+    players = session.exec(select(Player).order_by(Player.created_at.asc())).all()
+    seen: Dict[str, Player] = {}
+    to_delete: List[Player] = []
+    for p in players:
+        key = f"{p.first_name.strip().lower()}::{p.last_name.strip().lower()}"
+        if key not in seen:
+            seen[key] = p
+        else:
+            to_delete.append(p)
+
+    removed = 0
+    for dup in to_delete:
+        for model in (
+            RosterEntry, TournamentParticipant, Evaluation, ActionStat, GameAction, GameLineup, ScoreSnapshot, PlayerProfile,
+            ShortlistEntry,
+        ):
+            rows = session.exec(select(model).where(model.player_pk == dup.pk)).all()
+            for row in rows:
+                session.delete(row)
+        session.delete(dup)
+        removed += 1
+        if progress and removed % 50 == 0:
+            session.commit()
+            progress(removed, len(to_delete))
+    session.commit()
+    return {"removed": removed, "kept": len(seen)}
@@ -0,0 +1,565 @@
+"""
+Database tables (SQLModel). Free of FastAPI, like db.py and scoring.py, so CLIs
+and background jobs can import them without loading the web app.
+"""
+from datetime import date, datetime
+from typing import Optional
+from uuid import UUID, uuid4
+
+from sqlalchemy import Index
+from sqlmodel import Field as SQLField, SQLModel
+
+
+# identifies the compute_score variant a ScoreSnapshot was produced with
+# v1: plain mean of the ratings; v2: ratings normalized per scout (calibration.py)
+SCORING_MODEL = "v2"
+# v2 with recency weights and minutes shrinkage (weighting.py); stored as PlayerProfile only
+WEIGHTED_SCORING_MODEL = "v2-weighted"
+
+
+# Every table has an integer surrogate key `pk` (SQLite rowid alias) that is
+# used for joins and indexes. The UUID `id` stays the public identifier and the
+# ORM identity (session.get works with UUIDs). Foreign keys keep their UUID
+# column and get an integer `<name>_pk` shadow column filled by triggers, see
+# sync_surrogate_keys().
+class Player(SQLModel, table=True):
+    __table_args__ = (
+        # seed_players duplicate probe
+        Index("ix_player_name_birthdate", "first_name", "last_name", "birthdate"),
+    )
+    __mapper_args__ = {"primary_key": ["id"]}
+
+    pk: Optional[int] = SQLField(default=None, primary_key=True)
+    id: UUID = SQLField(default_factory=uuid4, unique=True)
+    unique_id: str = SQLField(default_factory=lambda: uuid4().hex)
+    first_name: str
+    last_name: str
+    birthdate: date
+    nation: str
+    plays_in: Optional[str] = None
+    position: Optional[str] = None
+    club: Optional[str] = None
+    level: Optional[str] = None
+    height: Optional[str] = None
+    foot: Optional[str] = None
+    note: Optional[str] = None
+    photo_data: Optional[str] = None  # base64 or data URL placeholder
+    shortlisted: bool = SQLField(default=False)  # membership in the default Shortlist, see sync_default_shortlist()
+    created_at: datetime = SQLField(default_factory=datetime.utcnow, index=True)
+
+
+class Shortlist(SQLModel, table=True):
+    """Named player list of a scout or project; exactly one is the default list behind Player.shortlisted."""
+
+    __table_args__ = (
+        # GET /shortlists?owner=
+        Index("ix_shortlist_owner_name", "owner", "name"),
+    )
+    __mapper_args__ = {"primary_key": ["id"]}
+
+    pk: Optional[int] = SQLField(default=None, primary_key=True)
+    id: UUID = SQLField(default_factory=uuid4, unique=True)
+    name: str
+    owner: Optional[str] = None  # scout or project
+    note: Optional[str] = None
+    is_default: bool = False
+    created_at: datetime = SQLField(default_factory=datetime.utcnow)
+
+
+class ShortlistEntry(SQLModel, table=True):
+    __table_args__ = (
+        # membership check and bulk add/remove; one entry per player and list
+        Index("ix_shortlistentry_shortlist_player", "shortlist_pk", "player_pk", unique=True),
+        # GET /shortlists/{id}: ordered members
+        Index("ix_shortlistentry_shortlist_order", "shortlist_pk", "sort_order"),
+    )
+    __mapper_args__ = {"primary_key": ["id"]}
+
+    pk: Optional[int] = SQLField(default=None, primary_key=True)
+    id: UUID = SQLField(default_factory=uuid4, unique=True)
+    shortlist_id: UUID = SQLField(foreign_key="shortlist.id")
+    shortlist_pk: Optional[int] = None
+    player_id: UUID = SQLField(foreign_key="player.id")
+    player_pk: Optional[int] = SQLField(default=None, index=True)
+    sort_order: int = 0
+    note: Optional[str] = None
+    tags: Optional[str] = None  # JSON list of strings
+    created_at: datetime = SQLField(default_factory=datetime.utcnow)
+
+
+class RosterEntry(SQLModel, table=True):
+    __table_args__ = (
+        # roster loads by team and the per-team shirt number check
+        Index("ix_rosterentry_team_number", "team_pk", "number"),
+    )
+    __mapper_args__ = {"primary_key": ["id"]}
+
+    pk: Optional[int] = SQLField(default=None, primary_key=True)
+    id: UUID = SQLField(default_factory=uuid4, unique=True)
+    team_id: UUID = SQLField(foreign_key="team.id")
+    team_pk: Optional[int] = None
+    player_id: UUID = SQLField(foreign_key="player.id")
+    player_pk: Optional[int] = SQLField(default=None, index=True)
+    number: str
+
+
+class Team(SQLModel, table=True):
+    __mapper_args__ = {"primary_key": ["id"]}
+
+    pk: Optional[int] = SQLField(default=None, primary_key=True)
+    id: UUID = SQLField(default_factory=uuid4, unique=True)
+    unique_id: str = SQLField(default_factory=lambda: uuid4().hex)
+    tournament_id: UUID = SQLField(foreign_key="tournament.id")
+    tournament_pk: Optional[int] = SQLField(default=None, index=True)
+    name: str
+    kit_color: Optional[str] = None
+
+
+class TournamentParticipant(SQLModel, table=True):
+    __table_args__ = (
+        # covers the participant id list of a tournament
+        Index("ix_tournamentparticipant_tournament_player", "tournament_pk", "player_pk"),
+    )
+    __mapper_args__ = {"primary_key": ["id"]}
+
+    pk: Optional[int] = SQLField(default=None, primary_key=True)
+    id: UUID = SQLField(default_factory=uuid4, unique=True)
+    tournament_id: UUID = SQLField(foreign_key="tournament.id")
+    tournament_pk: Optional[int] = None
+    player_id: UUID = SQLField(foreign_key="player.id")
+    player_pk: Optional[int] = SQLField(default=None, index=True)
+
+
+class Game(SQLModel, table=True):
+    __table_args__ = (
+        # pitch occupancy in a time range (schedule generator)
+        Index("ix_game_pitch_kickoff", "pitch_pk", "kickoff"),
+        # games of a team around a time (availability.find_conflicts), also serve lookups by team alone
+        Index("ix_game_team_a_kickoff", "team_a_pk", "kickoff"),
+        Index("ix_game_team_b_kickoff", "team_b_pk", "kickoff"),
+    )
+    __mapper_args__ = {"primary_key": ["id"]}
+
+    pk: Optional[int] = SQLField(default=None, primary_key=True)
+    id: UUID = SQLField(default_factory=uuid4, unique=True)
+    tournament_id: UUID = SQLField(foreign_key="tournament.id")
+    tournament_pk: Optional[int] = SQLField(default=None, index=True)
+    team_a_id: UUID = SQLField(foreign_key="team.id")
+    team_a_pk: Optional[int] = None
+    team_b_id: Optional[UUID] = SQLField(default=None, foreign_key="team.id")
+    team_b_pk: Optional[int] = None
+    kickoff: Optional[datetime] = None
+    kit_a: Optional[str] = None
+    kit_b: Optional[str] = None
+    note: Optional[str] = None
+    pitch_id: Optional[UUID] = SQLField(default=None, foreign_key="venuepitch.id")
+    pitch_pk: Optional[int] = None
+    duration_minutes: Optional[int] = None  # None: scheduling.DEFAULT_GAME_MINUTES, at most availability.MAX_GAME_MINUTES
+
+
+class GameLineup(SQLModel, table=True):
+    __mapper_args__ = {"primary_key": ["id"]}
+
+    pk: Optional[int] = SQLField(default=None, primary_key=True)
+    id: UUID = SQLField(default_factory=uuid4, unique=True)
+    game_id: UUID = SQLField(foreign_key="game.id")
+    game_pk: Optional[int] = SQLField(default=None, index=True)
+    player_id: UUID = SQLField(foreign_key="player.id")
+    player_pk: Optional[int] = SQLField(default=None, index=True)
+    team_id: UUID = SQLField(foreign_key="team.id")
+    team_pk: Optional[int] = None
+    number: str
+    kit: Optional[str] = None
+    position: Optional[str] = None
+
+
+class GameVideo(SQLModel, table=True):
+    __mapper_args__ = {"primary_key": ["id"]}
+
+    pk: Optional[int] = SQLField(default=None, primary_key=True)
+    id: UUID = SQLField(default_factory=uuid4, unique=True)
+    game_id: UUID = SQLField(foreign_key="game.id")
+    game_pk: Optional[int] = SQLField(default=None, index=True)
+    name: str
+    status: str = "uploaded"  # uploading | uploaded | processing | ready | failed (see videos.py)
+    start_second: float = 0  # game clock at the first frame, e.g. 2700 for a second-half recording
+    filename: Optional[str] = None
+    content_type: Optional[str] = None
+    size_bytes: Optional[int] = None  # announced when the upload is created
+    received_bytes: int = 0  # resume offset of the upload
+    duration_seconds: Optional[float] = None
+    width: Optional[int] = None
+    height: Optional[int] = None
+    codec: Optional[str] = None
+    has_thumbnail: bool = False
+    has_preview: bool = False
+    error: Optional[str] = None
+    created_at: Optional[datetime] = SQLField(default_factory=datetime.utcnow)
+    updated_at: Optional[datetime] = None
+
+
+class Venue(SQLModel, table=True):
+    __mapper_args__ = {"primary_key": ["id"]}
+
+    pk: Optional[int] = SQLField(default=None, primary_key=True)
+    id: UUID = SQLField(default_factory=uuid4, unique=True)
+    name: str
+    address: Optional[str] = None
+    home_club: Optional[str] = None
+    contact: Optional[str] = None
+    price: Optional[str] = None
+    note: Optional[str] = None
+    photo_data: Optional[str] = None
+
+
+class VenuePitch(SQLModel, table=True):
+    __mapper_args__ = {"primary_key": ["id"]}
+
+    pk: Optional[int] = SQLField(default=None, primary_key=True)
+    id: UUID = SQLField(default_factory=uuid4, unique=True)
+    venue_id: UUID = SQLField(foreign_key="venue.id")
+    venue_pk: Optional[int] = SQLField(default=None, index=True)
+    label: str
+    surface: Optional[str] = None  # e.g., Rasen, Kunstrasen, Hartplatz
+    lights: Optional[bool] = None
+
+
+class Tournament(SQLModel, table=True):
+    __mapper_args__ = {"primary_key": ["id"]}
+
+    pk: Optional[int] = SQLField(default=None, primary_key=True)
+    id: UUID = SQLField(default_factory=uuid4, unique=True)
+    unique_id: str = SQLField(default_factory=lambda: uuid4().hex)
+    name: str
+    country: str
+    start: Optional[date] = None
+    end: Optional[date] = None
+    note: Optional[str] = None
+    venue_id: Optional[UUID] = SQLField(default=None, foreign_key="venue.id")
+    venue_pk: Optional[int] = SQLField(default=None, index=True)
+    created_at: datetime = SQLField(default_factory=datetime.utcnow, index=True)
+
+
+class Evaluation(SQLModel, table=True):
+    __table_args__ = (
+        # list_evaluations: player = ? ORDER BY created_at DESC
+        Index("ix_evaluation_player_created", "player_pk", "created_at"),
+        # get_player_score with event_id
+        Index("ix_evaluation_player_event", "player_pk", "event_pk"),
+    )
+    __mapper_args__ = {"primary_key": ["id"]}
+
+    pk: Optional[int] = SQLField(default=None, primary_key=True)
+    id: UUID = SQLField(default_factory=uuid4, unique=True)
+    event_id: UUID = SQLField(foreign_key="tournament.id")
+    event_pk: Optional[int] = SQLField(default=None, index=True)
+    player_id: UUID = SQLField(foreign_key="player.id")
+    player_pk: Optional[int] = None
+    scout_name: str = "Scout"
+    rating_technique: int = 3
+    rating_physical: int = 3
+    rating_intelligence: int = 3
+    rating_mentality: int = 3
+    rating_impact: int = 3
+    strengths: Optional[str] = None
+    weaknesses: Optional[str] = None
+    remarks: Optional[str] = None
+    created_at: datetime = SQLField(default_factory=datetime.utcnow)
+
+
+class ActionStat(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_actionstat_player_event", "player_pk", "event_pk"),
+    )
+    __mapper_args__ = {"primary_key": ["id"]}
+
+    pk: Optional[int] = SQLField(default=None, primary_key=True)
+    id: UUID = SQLField(default_factory=uuid4, unique=True)
+    event_id: UUID = SQLField(foreign_key="tournament.id")
+    event_pk: Optional[int] = SQLField(default=None, index=True)
+    player_id: UUID = SQLField(foreign_key="player.id")
+    player_pk: Optional[int] = None
+    minutes: int = 0
+    shots: int = 0
+    passes: int = 0
+    duels: int = 0
+    goals: int = 0
+    assists: int = 0
+    # "manual" (API, import) or "game_actions": the totals of the player's tagged GameActions
+    # at this event, rewritten by game_actions.rollup()
+    source: str = "manual"
+
+
+class GameAction(SQLModel, table=True):
+    """One tagged action of a player at a moment of a game (see game_actions.py)."""
+
+    __table_args__ = (
+        # "all shots of player X in game Y", in game order
+        Index("ix_gameaction_game_player_action_second", "game_pk", "player_pk", "action", "second"),
+        # timeline of a game
+        Index("ix_gameaction_game_second", "game_pk", "second"),
+        # actions of a player over all games; rollup per player and event
+        Index("ix_gameaction_player_action", "player_pk", "action"),
+        Index("ix_gameaction_player_event_game", "player_pk", "event_pk", "game_pk"),
+    )
+    __mapper_args__ = {"primary_key": ["id"]}
+
+    pk: Optional[int] = SQLField(default=None, primary_key=True)
+    id: UUID = SQLField(default_factory=uuid4, unique=True)
+    game_id: UUID = SQLField(foreign_key="game.id")
+    game_pk: Optional[int] = None
+    event_id: UUID = SQLField(foreign_key="tournament.id")  # the game's tournament
+    event_pk: Optional[int] = None
+    player_id: UUID = SQLField(foreign_key="player.id")
+    player_pk: Optional[int] = None
+    second: float  # game clock since kickoff
+    action: str  # game_actions.ACTION_OUTCOMES
+    outcome: Optional[str] = None
+    x: Optional[float] = None  # pitch position in percent of length/width, attacking left to right
+    y: Optional[float] = None
+    created_at: datetime = SQLField(default_factory=datetime.utcnow)
+
+
+class ActionStatTotal(SQLModel, table=True):
+    """
+    Sums over all action stats (one row), kept current by triggers on actionstat,
+    see sync_action_stat_totals(); the average per-90 rates of weighting.py.
+    """
+
+    pk: Optional[int] = SQLField(default=None, primary_key=True)
+    stat_count: int = 0
+    minutes: int = 0
+    shots: int = 0
+    passes: int = 0
+    duels: int = 0
+    goals: int = 0
+    assists: int = 0
+
+
+class ScoreSnapshot(SQLModel, table=True):
+    """compute_score result per player, event and scoring model (see refresh_score_snapshot)."""
+
+    __table_args__ = (
+        Index("ix_scoresnapshot_player_event_model", "player_pk", "event_pk", "model", unique=True),
+        # score-history: player = ? AND model = ? ORDER BY event_date
+        Index("ix_scoresnapshot_player_model_date", "player_pk", "model", "event_date"),
+        # incremental percentile index refresh: model = ? AND revision > last seen
+        Index("ix_scoresnapshot_model_revision", "model", "revision"),
+    )
+    __mapper_args__ = {"primary_key": ["id"]}
+
+    pk: Optional[int] = SQLField(default=None, primary_key=True)
+    id: UUID = SQLField(default_factory=uuid4, unique=True)
+    player_id: UUID = SQLField(foreign_key="player.id")
+    player_pk: Optional[int] = None
+    event_id: UUID = SQLField(foreign_key="tournament.id")
+    event_pk: Optional[int] = None
+    model: str = SCORING_MODEL
+    event_date: Optional[date] = None
+    score: float = 0
+    technique: float = 0
+    physical: float = 0
+    intelligence: float = 0
+    mentality: float = 0
+    impact: float = 0
+    minutes: int = 0
+    evaluation_count: int = 0
+    computed_at: datetime = SQLField(default_factory=datetime.utcnow)
+    # next value of its RevisionCounter on every write, like PlayerProfile.revision
+    revision: int = 0
+
+
+class ScoutCalibration(SQLModel, table=True):
+    """
+    Sufficient statistics of all ratings per scout (count, sum and sum of squares
+    per rating field), kept current by triggers on evaluation, see
+    sync_scout_calibration() and calibration.py.
+    """
+
+    pk: Optional[int] = SQLField(default=None, primary_key=True)
+    scout_name: str = SQLField(unique=True)
+    evaluation_count: int = 0
+    technique_sum: float = 0
+    technique_squares: float = 0
+    physical_sum: float = 0
+    physical_squares: float = 0
+    intelligence_sum: float = 0
+    intelligence_squares: float = 0
+    mentality_sum: float = 0
+    mentality_squares: float = 0
+    impact_sum: float = 0
+    impact_squares: float = 0
+
+
+class AgeBaseline(SQLModel, table=True):
+    """
+    Sufficient statistics of the PlayerProfile sub-indicators per scoring model,
+    birth year and birth quarter, kept current by triggers on playerprofile, see
+    sync_age_baselines() and age_baselines.py.
+    """
+
+    __table_args__ = (
+        Index("ix_agebaseline_model_year_quarter", "model", "birth_year", "birth_quarter", unique=True),
+    )
+
+    pk: Optional[int] = SQLField(default=None, primary_key=True)
+    model: str
+    birth_year: int
+    birth_quarter: int
+    player_count: int = 0
+    technique_sum: float = 0
+    technique_squares: float = 0
+    physical_sum: float = 0
+    physical_squares: float = 0
+    intelligence_sum: float = 0
+    intelligence_squares: float = 0
+    mentality_sum: float = 0
+    mentality_squares: float = 0
+    impact_sum: float = 0
+    impact_squares: float = 0
+
+
+class PlayerProfile(SQLModel, table=True):
+    """
+    compute_score over all evaluations and stats of a player, per scoring model:
+    the vectors of the similar-player index (see similarity.py).
+    """
+
+    __table_args__ = (
+        Index("ix_playerprofile_player_model", "player_pk", "model", unique=True),
+        # GET /rankings: model = ? ORDER BY score DESC
+        Index("ix_playerprofile_model_score", "model", "score"),
+        # incremental index refresh: model = ? AND revision > last seen
+        Index("ix_playerprofile_model_revision", "model", "revision"),
+    )
+    __mapper_args__ = {"primary_key": ["id"]}
+
+    pk: Optional[int] = SQLField(default=None, primary_key=True)
+    id: UUID = SQLField(default_factory=uuid4, unique=True)
+    player_id: UUID = SQLField(foreign_key="player.id")
+    player_pk: Optional[int] = None
+    model: str = SCORING_MODEL
+    birthdate: Optional[date] = None  # copy of Player.birthdate, the key of the age baselines
+    score: float = 0
+    technique: float = 0
+    physical: float = 0
+    intelligence: float = 0
+    mentality: float = 0
+    impact: float = 0
+    goals_p90: float = 0
+    assists_p90: float = 0
+    passes_p90: float = 0
+    duels_p90: float = 0
+    minutes: int = 0
+    evaluation_count: int = 0
+    # next value of its RevisionCounter on every write; SQLite has one writer at a time, so it grows in commit order
+    revision: int = 0
+    computed_at: datetime = SQLField(default_factory=datetime.utcnow)
+
+
+class RevisionCounter(SQLModel, table=True):
+    """
+    Last revision handed out per table and scoring model (scoring.next_revision()).
+    Unlike max(revision) + 1 a value is never handed out twice, also after the
+    row holding it was deleted; the incremental indexes read revision > last seen.
+    """
+
+    pk: Optional[int] = SQLField(default=None, primary_key=True)
+    name: str = SQLField(unique=True)  # "<table>:<model>"
+    value: int = 0
+
+
+class ImportRun(SQLModel, table=True):
+    """Progress and row errors of one bulk import (see importer.py)."""
+
+    __mapper_args__ = {"primary_key": ["id"]}
+
+    pk: Optional[int] = SQLField(default=None, primary_key=True)
+    id: UUID = SQLField(default_factory=uuid4, unique=True)
+    kind: str
+    format: str = "csv"
+    filename: Optional[str] = None
+    status: str = "queued"  # queued | running | done | failed | cancelled
+    rows_read: int = 0
+    rows_imported: int = 0
+    rows_failed: int = 0
+    errors: Optional[str] = None  # JSON list of {"row", "error"}, capped at importer.MAX_STORED_ERRORS
+    message: Optional[str] = None
+    created_at: datetime = SQLField(default_factory=datetime.utcnow, index=True)
+    finished_at: Optional[datetime] = None
+
+
+class Job(SQLModel, table=True):
+    """Background job queued by POST /jobs or the ops endpoints, processed by jobs.JobRunner."""
+
+    __mapper_args__ = {"primary_key": ["id"]}
+
+    pk: Optional[int] = SQLField(default=None, primary_key=True)
+    id: UUID = SQLField(default_factory=uuid4, unique=True)
+    kind: str
+    # queued | running | done | failed | cancelled; claimed in pk order over ix_job_status
+    status: str = SQLField(default="queued", index=True)
+    params: Optional[str] = None  # JSON
+    result: Optional[str] = None  # JSON
+    error: Optional[str] = None
+    progress: Optional[float] = None  # 0..1 if the handler knows its total
+    message: Optional[str] = None
+    cancel_requested: bool = False
+    worker: Optional[str] = None
+    created_at: datetime = SQLField(default_factory=datetime.utcnow)
+    started_at: Optional[datetime] = None
+    heartbeat_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+
+class BroadcastMessage(SQLModel, table=True):
+    """Cross-worker notification (cache invalidation, job wake-up), see broadcast.py."""
+
+    # listeners follow pk: never reuse one after prune() emptied the table
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    pk: Optional[int] = SQLField(default=None, primary_key=True)
+    topic: str
+    payload: Optional[str] = None  # JSON
+    origin: str  # host:pid of the publishing process
+    created_at: datetime = SQLField(default_factory=datetime.utcnow)
+
+
+class ChangeLog(SQLModel, table=True):
+    """
+    Append-only log of the writes to AUDITED_MODELS, one row per changed row
+    (see changelog.py); pk is the cursor of GET /changes.
+    """
+
+    __table_args__ = (
+        # history of one row
+        Index("ix_changelog_entity_id_pk", "entity_id", "pk"),
+        # GET /changes?entity=
+        Index("ix_changelog_entity_pk", "entity", "pk"),
+        # retention and compaction
+        Index("ix_changelog_created_at", "created_at"),
+        # never reuse a cursor value, even after the newest rows were purged
+        {"sqlite_autoincrement": True},
+    )
+
+    pk: Optional[int] = SQLField(default=None, primary_key=True)
+    entity: str  # table name
+    entity_id: UUID
+    op: str  # insert | update | delete
+    diff: str  # JSON: values (insert, delete) or {column: [old, new]} (update)
+    actor: Optional[str] = None  # X-User header of the request
+    created_at: datetime = SQLField(default_factory=datetime.utcnow)
+
+
+# models rendered by tournament_view; committing changes to them invalidates
+# the cached GET /tournaments response in every worker
+TOURNAMENT_VIEW_MODELS = (
+    Tournament, Team, RosterEntry, TournamentParticipant, Game, GameLineup, GameVideo, Venue, VenuePitch,
+)
+
+# user-facing data; writes to these are recorded in ChangeLog. Derived tables
+# (profiles, snapshots, baselines, totals) and the job/broadcast queues are not.
+AUDITED_MODELS = (
+    Player, Shortlist, ShortlistEntry, Tournament, TournamentParticipant, Team, RosterEntry,
+    Game, GameLineup, GameVideo, GameAction, Venue, VenuePitch, Evaluation, ActionStat,
+)
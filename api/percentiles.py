@@ -0,0 +1,162 @@
+"""
+Percentile ranks of stored scores within cohorts: event x position group x age
+band (ScoreSnapshot), and position group x age band over all events
+(PlayerProfile, event None).
+
+Every worker keeps one sorted score list per cohort (PercentileIndex). Like
+similarity.ProfileIndex it pulls only the rows written since its last refresh
+(revision > last seen, range seeks on ix_scoresnapshot_model_revision and
+ix_playerprofile_model_revision) and moves changed scores between the sorted
+lists, so a lookup is two bisections instead of sorting a cohort per request.
+
+Rows of deleted players are not seen by the revision scan; they drop out when
+the index is rebuilt, which happens every REBUILD_SECONDS and when the year
+changes (age bands count in birth years).
+"""
+import threading
+import time
+from bisect import bisect_left, bisect_right, insort
+from dataclasses import dataclass
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+from sqlmodel import Session, select
+
+from balancing import position_group
+from models import Player, PlayerProfile, SCORING_MODEL, ScoreSnapshot
+
+# age band by age in years at the end of the season year (birth year based, like youth football classes)
+AGE_BANDS = (("U15", 15), ("U17", 17), ("U19", 19), ("U21", 21), ("U23", 23))
+SENIOR_BAND = "Senior"
+REBUILD_SECONDS = 300
+
+# (event_pk or None for all events, position group, age band)
+Cohort = Tuple[Optional[int], Optional[str], str]
+
+
+def age_band(birthdate: date, year: int) -> str:
+    age = year - birthdate.year
+    for band, limit in AGE_BANDS:
+        if age < limit:
+            return band
+    return SENIOR_BAND
+
+
+def cohort_of(event_pk: Optional[int], position: Optional[str], birthdate: date, year: int) -> Cohort:
+    return event_pk, position_group(position), age_band(birthdate, year)
+
+
+@dataclass
+class Percentile:
+    cohort: Cohort
+    size: int
+    percentile: float
+
+
+class PercentileIndex:
+    def __init__(self, model: str = SCORING_MODEL):
+        self.model = model
+        self._reset()
+        self._lock = threading.Lock()
+
+    def _reset(self) -> None:
+        self._cohorts: Dict[Cohort, List[float]] = {}
+        # (event_pk or None, player_pk) -> (cohort, score, revision)
+        self._entries: Dict[Tuple[Optional[int], int], Tuple[Cohort, float, int]] = {}
+        # legacy snapshots were migrated with revision 0
+        self._snapshot_revision = -1
+        self._profile_revision = -1
+        self._year = date.today().year
+        self._built_at = time.monotonic()
+
+    def _put(self, key: Tuple[Optional[int], int], cohort: Cohort, score: float, revision: int) -> None:
+        old = self._entries.get(key)
+        if old is not None:
+            # refreshes query outside the lock: a slower one may bring an older row
+            if old[2] >= revision:
+                return
+            scores = self._cohorts[old[0]]
+            del scores[bisect_left(scores, old[1])]
+        self._entries[key] = (cohort, score, revision)
+        insort(self._cohorts.setdefault(cohort, []), score)
+
+    def refresh(self, session: Session) -> int:
+        """Load snapshots and profiles written since the last refresh; returns how many."""
+        with self._lock:
+            if self._year != date.today().year or time.monotonic() - self._built_at > REBUILD_SECONDS:
+                self._reset()
+            snapshot_revision, profile_revision = self._snapshot_revision, self._profile_revision
+        snapshots = session.exec(
+            select(
+                ScoreSnapshot.player_pk,
+                ScoreSnapshot.event_pk,
+                ScoreSnapshot.event_date,
+                ScoreSnapshot.score,
+                ScoreSnapshot.revision,
+                Player.birthdate,
+                Player.position,
+            )
+            .join(Player, Player.pk == ScoreSnapshot.player_pk)
+            .where(ScoreSnapshot.model == self.model, ScoreSnapshot.revision > snapshot_revision)
+            .order_by(ScoreSnapshot.revision)
+        ).all()
+        profiles = session.exec(
+            select(PlayerProfile.player_pk, PlayerProfile.score, PlayerProfile.revision, Player.birthdate, Player.position)
+            .join(Player, Player.pk == PlayerProfile.player_pk)
+            .where(PlayerProfile.model == self.model, PlayerProfile.revision > profile_revision)
+            .order_by(PlayerProfile.revision)
+        ).all()
+        with self._lock:
+            for row in snapshots:
+                year = row.event_date.year if row.event_date else self._year
+                self._put((row.event_pk, row.player_pk), cohort_of(row.event_pk, row.position, row.birthdate, year), row.score, row.revision)
+                self._snapshot_revision = max(self._snapshot_revision, row.revision)
+            for row in profiles:
+                self._put((None, row.player_pk), cohort_of(None, row.position, row.birthdate, self._year), row.score, row.revision)
+                self._profile_revision = max(self._profile_revision, row.revision)
+        return len(snapshots) + len(profiles)
+
+    def percentile(self, cohort: Cohort, score: float) -> Optional[Percentile]:
+        """
+        Share of the cohort scoring below `score`, ties counted half, in percent;
+        None for an empty cohort.
+        """
+        with self._lock:
+            scores = self._cohorts.get(cohort)
+            if not scores:
+                return None
+            below, up_to = bisect_left(scores, score), bisect_right(scores, score)
+            size = len(scores)
+        return Percentile(cohort=cohort, size=size, percentile=round(100 * (below + (up_to - below) / 2) / size, 1))
+
+    def player_percentile(
+        self, player: Player, score: float, event_pk: Optional[int] = None, event_date: Optional[date] = None
+    ) -> Optional[Percentile]:
+        """Percentile of `score` in the player's cohort at one event (event_pk) or over all events."""
+        year = event_date.year if event_pk is not None and event_date else date.today().year
+        return self.percentile(cohort_of(event_pk, player.position, player.birthdate, year), score)
+
+
+def percentile_to_dict(result: Optional[Percentile], event_id=None) -> Optional[dict]:
+    if result is None:
+        return None
+    _, group, band = result.cohort
+    return {
+        "eventId": str(event_id) if event_id else None,
+        "positionGroup": group,
+        "ageBand": band,
+        "cohortSize": result.size,
+        "percentile": result.percentile,
+    }
+
+
+_indexes: Dict[str, PercentileIndex] = {}
+
+
+def percentile_index(session: Session, model: str = SCORING_MODEL) -> PercentileIndex:
+    """The process-wide index for a scoring model, brought up to date."""
+    index = _indexes.get(model)
+    if index is None:
+        index = _indexes.setdefault(model, PercentileIndex(model))
+    index.refresh(session)
+    return index
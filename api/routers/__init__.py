@@ -0,0 +1,16 @@
+"""Per-domain API routers, included by main.py, and their shared dependencies."""
+from fastapi import Response
+from sqlmodel import Session
+
+
+def get_analytics_session(response: Response):
+    """
+    Session on the analytics snapshot or replica (snapshot.py) for read-only
+    scans; the data source and its age go into the response headers.
+    """
+    import snapshot
+
+    bind = snapshot.analytics_engine()
+    response.headers.update(snapshot.staleness_headers(snapshot.staleness(bind)))
+    with Session(bind) as session:
+        yield session
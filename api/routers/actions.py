@@ -0,0 +1,201 @@
+"""Timestamped game actions, their per-game breakdown and video clips (game_actions.py)."""
+from typing import Optional
+from uuid import UUID, uuid4
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import delete as sa_delete, func, insert as sa_insert
+from sqlmodel import Session, select
+
+import game_actions
+from db import get_session, key_of
+from models import Game, GameAction, GameVideo, Player, Tournament
+from schemas import DeleteResponse, GameActionBatch
+from serializers import game_action_to_dict
+
+router = APIRouter()
+
+MAX_ACTIONS_PER_REQUEST = 10000
+MAX_ACTIONS_LIMIT = 5000
+# default clip window around an action, in seconds
+CLIP_BEFORE = 5.0
+CLIP_AFTER = 5.0
+
+
+def get_game_or_404(session: Session, tournament_id: UUID, game_id: UUID) -> Game:
+    game = session.get(Game, game_id)
+    if not game or game.tournament_id != tournament_id:
+        raise HTTPException(status_code=404, detail="Game not found")
+    return game
+
+
+def check_action_filter(action: Optional[str]) -> None:
+    if action is not None and action not in game_actions.ACTION_OUTCOMES:
+        raise HTTPException(status_code=400, detail=f"action must be one of {', '.join(game_actions.ACTION_OUTCOMES)}")
+
+
+def with_clips(session: Session, rows, before: float, after: float):
+    """Actions with the clip of the covering video; the videos of all games are read with one query."""
+    videos = {}
+    for video in session.exec(select(GameVideo).where(GameVideo.game_pk.in_({a.game_pk for a in rows}))).all():
+        videos.setdefault(video.game_pk, []).append(video)
+    return [
+        {**game_action_to_dict(a), "clip": game_actions.clip(videos.get(a.game_pk, []), a.second, before, after)}
+        for a in rows
+    ]
+
+
+@router.post("/tournaments/{tournament_id}/games/{game_id}/actions", tags=["actions"])
+def add_game_actions(
+    tournament_id: UUID,
+    game_id: UUID,
+    payload: GameActionBatch,
+    replace: bool = False,
+    session: Session = Depends(get_session),
+):
+    """
+    Bulk ingestion of tagged actions for one game, written with one INSERT.
+    `replace=true` first removes the game's existing actions (re-tagging).
+    The ActionStat totals of the players involved are rolled up in the same
+    transaction (see game_actions.rollup()).
+    """
+    game = get_game_or_404(session, tournament_id, game_id)
+    if len(payload.actions) > MAX_ACTIONS_PER_REQUEST:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_ACTIONS_PER_REQUEST} actions per request")
+    errors = [
+        {"index": i, "error": error}
+        for i, item in enumerate(payload.actions)
+        if (error := game_actions.validation_error(item.action, item.outcome))
+    ]
+    if errors:
+        raise HTTPException(status_code=400, detail={"message": "Invalid actions", "errors": errors[:100]})
+    wanted = list({item.playerId for item in payload.actions})
+    pks = dict(session.exec(select(Player.id, Player.pk).where(Player.id.in_(wanted))).all()) if wanted else {}
+    missing = [str(pid) for pid in wanted if pid not in pks]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Unknown players: {', '.join(missing)}")
+    event_pk = session.exec(select(Tournament.pk).where(Tournament.id == tournament_id)).one()
+    pairs = {(pk, event_pk) for pk in pks.values()}
+    table = GameAction.__table__
+    replaced = 0
+    if replace:
+        previous = select(GameAction.player_pk, GameAction.event_pk).where(GameAction.game_pk == game.pk).distinct()
+        pairs |= set(session.exec(previous).all())
+        replaced = session.execute(sa_delete(table).where(table.c.game_pk == game.pk)).rowcount
+    if payload.actions:
+        session.execute(
+            sa_insert(table),
+            [
+                {
+                    "id": uuid4(),
+                    "game_id": game.id,
+                    "game_pk": game.pk,
+                    "event_id": tournament_id,
+                    "event_pk": event_pk,
+                    "player_id": item.playerId,
+                    "player_pk": pks[item.playerId],
+                    "second": item.second,
+                    "action": item.action,
+                    "outcome": item.outcome,
+                    "x": item.x,
+                    "y": item.y,
+                }
+                for item in payload.actions
+            ],
+        )
+    rolled_up = game_actions.rollup(session, pairs)
+    session.commit()
+    return {"gameId": str(game_id), "inserted": len(payload.actions), "replaced": replaced, "actionStats": rolled_up}
+
+
+@router.get("/tournaments/{tournament_id}/games/{game_id}/actions", tags=["actions"])
+def list_game_actions(
+    tournament_id: UUID,
+    game_id: UUID,
+    player_id: Optional[UUID] = None,
+    action: Optional[str] = None,
+    outcome: Optional[str] = None,
+    clips: bool = False,
+    before: float = CLIP_BEFORE,
+    after: float = CLIP_AFTER,
+    session: Session = Depends(get_session),
+):
+    """
+    The game's actions in game order, e.g. all shots of one player
+    (`player_id` and `action`, read over ix_gameaction_game_player_action_second).
+    `clips=true` adds the video and the window (`before`/`after` seconds) showing each action.
+    """
+    game = get_game_or_404(session, tournament_id, game_id)
+    check_action_filter(action)
+    query = select(GameAction).where(GameAction.game_pk == game.pk)
+    if player_id is not None:
+        query = query.where(GameAction.player_pk == key_of(Player, player_id))
+    if action is not None:
+        query = query.where(GameAction.action == action)
+    if outcome is not None:
+        query = query.where(GameAction.outcome == outcome)
+    rows = session.exec(query.order_by(GameAction.second)).all()
+    if clips:
+        return with_clips(session, rows, max(0.0, before), max(0.0, after))
+    return [game_action_to_dict(a) for a in rows]
+
+
+@router.get("/tournaments/{tournament_id}/games/{game_id}/actions/summary", tags=["actions"])
+def summarize_game_actions(tournament_id: UUID, game_id: UUID, session: Session = Depends(get_session)):
+    """Per player of the game: count of each action and outcome, as one GROUP BY."""
+    game = get_game_or_404(session, tournament_id, game_id)
+    rows = session.exec(
+        select(GameAction.player_id, GameAction.action, GameAction.outcome, func.count().label("n"))
+        .where(GameAction.game_pk == game.pk)
+        .group_by(GameAction.player_pk, GameAction.action, GameAction.outcome)
+    ).all()
+    players = {}
+    for row in rows:
+        counts = players.setdefault(str(row.player_id), {}).setdefault(row.action, {"total": 0})
+        counts["total"] += row.n
+        if row.outcome is not None:
+            counts[row.outcome] = row.n
+    return {"gameId": str(game_id), "players": players}
+
+
+@router.delete(
+    "/tournaments/{tournament_id}/games/{game_id}/actions/{action_id}", tags=["actions"], response_model=DeleteResponse
+)
+def delete_game_action(tournament_id: UUID, game_id: UUID, action_id: UUID, session: Session = Depends(get_session)):
+    game = get_game_or_404(session, tournament_id, game_id)
+    row = session.get(GameAction, action_id)
+    if not row or row.game_pk != game.pk:
+        raise HTTPException(status_code=404, detail="Action not found")
+    session.delete(row)
+    session.flush()
+    game_actions.rollup(session, {(row.player_pk, row.event_pk)})
+    session.commit()
+    return DeleteResponse(id=action_id)
+
+
+@router.get("/players/{player_id}/actions", tags=["actions"])
+def list_player_actions(
+    player_id: UUID,
+    action: Optional[str] = None,
+    game_id: Optional[UUID] = None,
+    event_id: Optional[UUID] = None,
+    clips: bool = False,
+    before: float = CLIP_BEFORE,
+    after: float = CLIP_AFTER,
+    limit: int = 1000,
+    session: Session = Depends(get_session),
+):
+    """A player's actions over all games (or one game/event), game by game in game order."""
+    check_action_filter(action)
+    if not 1 <= limit <= MAX_ACTIONS_LIMIT:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {MAX_ACTIONS_LIMIT}")
+    query = select(GameAction).where(GameAction.player_pk == key_of(Player, player_id))
+    if action is not None:
+        query = query.where(GameAction.action == action)
+    if game_id is not None:
+        query = query.where(GameAction.game_pk == key_of(Game, game_id))
+    if event_id is not None:
+        query = query.where(GameAction.event_pk == key_of(Tournament, event_id))
+    rows = session.exec(query.order_by(GameAction.game_pk, GameAction.second).limit(limit)).all()
+    if clips:
+        return with_clips(session, rows, max(0.0, before), max(0.0, after))
+    return [game_action_to_dict(a) for a in rows]
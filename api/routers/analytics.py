@@ -0,0 +1,58 @@
+"""League-wide distributions over evaluations and action stats (analytics.py)."""
+from typing import Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlmodel import Session, select
+
+import analytics
+from models import Tournament
+from routers import get_analytics_session
+
+router = APIRouter()
+
+MAX_BINS = 100
+
+
+def event_pk_or_404(session: Session, event_id: Optional[UUID]) -> Optional[int]:
+    if event_id is None:
+        return None
+    pk = session.exec(select(Tournament.pk).where(Tournament.id == event_id)).first()
+    if pk is None:
+        raise HTTPException(status_code=404, detail="Event not found")
+    return pk
+
+
+@router.get("/analytics/distributions", tags=["analytics"])
+def get_distributions(
+    metric: str = "goals_per90",
+    group_by: str = "none",
+    event_id: Optional[UUID] = None,
+    min_minutes: int = 90,
+    min_evaluations: int = 1,
+    bins: int = 10,
+    session: Session = Depends(get_analytics_session),
+):
+    """
+    Distribution of one value per player over the league: `<stat>_per90`
+    (goals, assists, shots, passes, duels; players with at least `min_minutes`),
+    `minutes`, or `rating_<field>` (mean raw rating, at least `min_evaluations`).
+    `group_by` splits it by position_group, age_band or position. Each group has
+    count, mean, sd, quantiles and a histogram with `bins` equal-width bins.
+    """
+    if metric not in analytics.METRICS:
+        raise HTTPException(status_code=400, detail=f"metric must be one of {', '.join(analytics.METRICS)}")
+    if group_by not in analytics.GROUPINGS:
+        raise HTTPException(status_code=400, detail=f"group_by must be one of {', '.join(analytics.GROUPINGS)}")
+    if not 1 <= bins <= MAX_BINS:
+        raise HTTPException(status_code=400, detail=f"bins must be between 1 and {MAX_BINS}")
+    minimum = min_evaluations if analytics.METRICS[metric].table == "evaluation" else min_minutes
+    return analytics.distributions(
+        session, metric, group_by, event_pk_or_404(session, event_id), max(0, minimum), bins
+    )
+
+
+@router.get("/analytics/scouts", tags=["analytics"])
+def get_scout_averages(event_id: Optional[UUID] = None, session: Session = Depends(get_analytics_session)):
+    """Evaluations per scout with mean and sd of each raw rating (see /scouts/calibration for the model)."""
+    return analytics.scout_averages(session, event_pk_or_404(session, event_id))
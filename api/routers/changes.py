@@ -0,0 +1,46 @@
+"""Change log of all writes (changelog.py), read with a cursor."""
+from typing import Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlmodel import Session, select
+
+from changelog import AUDITED_TABLES, change_to_dict
+from db import get_session
+from models import ChangeLog
+
+router = APIRouter()
+
+MAX_CHANGES_LIMIT = 1000
+
+
+@router.get("/changes", tags=["changes"])
+def list_changes(
+    after: int = 0,
+    limit: int = 500,
+    entity: Optional[str] = None,
+    entity_id: Optional[UUID] = None,
+    session: Session = Depends(get_session),
+):
+    """
+    Records with a cursor greater than `after`, oldest first. Pass the returned
+    `cursor` as the next `after`; `hasMore` says whether another page is ready.
+    `entity` (table name, e.g. player, evaluation) and `entity_id` narrow the log
+    to one table or one row.
+    """
+    if not 1 <= limit <= MAX_CHANGES_LIMIT:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {MAX_CHANGES_LIMIT}")
+    if entity is not None and entity not in AUDITED_TABLES:
+        raise HTTPException(status_code=400, detail=f"entity must be one of {', '.join(sorted(AUDITED_TABLES))}")
+    query = select(ChangeLog).where(ChangeLog.pk > after)
+    if entity is not None:
+        query = query.where(ChangeLog.entity == entity)
+    if entity_id is not None:
+        query = query.where(ChangeLog.entity_id == entity_id)
+    rows = session.exec(query.order_by(ChangeLog.pk).limit(limit + 1)).all()
+    page = rows[:limit]
+    return {
+        "changes": [change_to_dict(c) for c in page],
+        "cursor": page[-1].pk if page else after,
+        "hasMore": len(rows) > limit,
+    }
@@ -0,0 +1,279 @@
+"""Scout evaluations, action stats and the scores computed from them."""
+import heapq
+from typing import Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlmodel import Session, select
+
+from age_baselines import load_age_baselines
+from calibration import PRIOR_RATINGS, load_calibration
+from db import get_session, key_of
+from models import (
+    ActionStat,
+    Evaluation,
+    Player,
+    PlayerProfile,
+    SCORING_MODEL,
+    ScoreSnapshot,
+    Tournament,
+    WEIGHTED_SCORING_MODEL,
+)
+from routers import get_analytics_session
+from schemas import ActionStatCreate, EvaluationCreate
+from scoring import age_adjust, compute_score, event_dates, refresh_score_snapshot
+from serializers import PLAYER_REF_COLUMNS, action_stat_to_dict, evaluation_to_dict
+from weighting import load_weighting
+
+router = APIRouter()
+
+
+@router.post("/evaluations", tags=["evaluations"])
+def create_evaluation(payload: EvaluationCreate, session: Session = Depends(get_session)):
+    ev = Evaluation(
+        event_id=payload.eventId,
+        player_id=payload.playerId,
+        scout_name=payload.scoutName,
+        rating_technique=payload.ratingTechnique,
+        rating_physical=payload.ratingPhysical,
+        rating_intelligence=payload.ratingIntelligence,
+        rating_mentality=payload.ratingMentality,
+        rating_impact=payload.ratingImpact,
+        strengths=payload.strengths,
+        weaknesses=payload.weaknesses,
+        remarks=payload.remarks,
+    )
+    session.add(ev)
+    session.commit()
+    session.refresh(ev)
+    refresh_score_snapshot(session, ev.player_pk, ev.event_pk)
+    return {"id": str(ev.id)}
+
+
+@router.get("/players/{player_id}/evaluations", tags=["evaluations"])
+def list_evaluations(player_id: UUID, session: Session = Depends(get_session)):
+    rows = session.exec(
+        select(Evaluation)
+        .where(Evaluation.player_pk == key_of(Player, player_id))
+        .order_by(Evaluation.created_at.desc())
+    ).all()
+    return [evaluation_to_dict(r) for r in rows]
+
+
+@router.post("/action-stats", tags=["stats"])
+def create_action_stat(payload: ActionStatCreate, session: Session = Depends(get_session)):
+    st = ActionStat(
+        event_id=payload.eventId,
+        player_id=payload.playerId,
+        minutes=payload.minutes,
+        shots=payload.shots,
+        passes=payload.passes,
+        duels=payload.duels,
+        goals=payload.goals,
+        assists=payload.assists,
+    )
+    session.add(st)
+    session.commit()
+    session.refresh(st)
+    refresh_score_snapshot(session, st.player_pk, st.event_pk)
+    return {"id": str(st.id)}
+
+
+@router.get("/players/{player_id}/action-stats", tags=["stats"])
+def list_action_stats(player_id: UUID, session: Session = Depends(get_session)):
+    rows = session.exec(select(ActionStat).where(ActionStat.player_pk == key_of(Player, player_id))).all()
+    return [action_stat_to_dict(r) for r in rows]
+
+
+# aggregation query parameter -> scoring model of the stored scores
+AGGREGATIONS = {"mean": SCORING_MODEL, "weighted": WEIGHTED_SCORING_MODEL}
+
+
+def aggregation_model(aggregation: str) -> str:
+    if aggregation not in AGGREGATIONS:
+        raise HTTPException(status_code=400, detail=f"aggregation must be one of {', '.join(AGGREGATIONS)}")
+    return AGGREGATIONS[aggregation]
+
+
+@router.get("/players/{player_id}/score", tags=["scoring"])
+def get_player_score(
+    player_id: UUID,
+    event_id: Optional[UUID] = None,
+    calibrated: bool = True,
+    aggregation: str = "mean",
+    age_adjusted: bool = False,
+    birth_quarter: bool = False,
+    session: Session = Depends(get_session),
+):
+    """
+    compute_score over the player's evaluations and stats (optionally of one event),
+    with the percentile in the player's cohort. `aggregation=weighted` weights recent
+    data higher and shrinks per-90 rates from few minutes (weighting.py). `age_adjusted`
+    adds the score measured against the player's birth year, `birth_quarter` also
+    corrects the relative-age effect.
+    """
+    model = aggregation_model(aggregation)
+    player = session.get(Player, player_id)
+    if not player:
+        raise HTTPException(status_code=404, detail="Player not found")
+    ev_query = select(Evaluation).where(Evaluation.player_pk == player.pk)
+    st_query = select(ActionStat).where(ActionStat.player_pk == player.pk)
+    if event_id:
+        ev_query = ev_query.where(Evaluation.event_pk == key_of(Tournament, event_id))
+        st_query = st_query.where(ActionStat.event_pk == key_of(Tournament, event_id))
+    evals = session.exec(ev_query).all()
+    stats = session.exec(st_query).all()
+    weighting = None
+    if model == WEIGHTED_SCORING_MODEL:
+        weighting = load_weighting(session, event_dates(session, sorted({s.event_pk for s in stats} - {None})))
+    result = compute_score(evals, stats, load_calibration(session) if calibrated else None, weighting)
+    result["ageAdjusted"] = (
+        age_adjust(result, player.birthdate, load_age_baselines(session, model), birth_quarter) if age_adjusted else None
+    )
+    # cohorts hold stored (calibrated) scores, an uncalibrated score has no place in them
+    result["percentile"] = None
+    if calibrated:
+        import percentiles
+
+        event_pk = event_date = None
+        if event_id:
+            event_pk = session.exec(select(Tournament.pk).where(Tournament.id == event_id)).first()
+            event_date = event_dates(session, [event_pk]).get(event_pk) if event_pk else None
+        if not event_id or event_pk:
+            index = percentiles.percentile_index(session, model)
+            result["percentile"] = percentiles.percentile_to_dict(
+                index.player_percentile(player, result["score"], event_pk, event_date), event_id
+            )
+    return result
+
+
+@router.get("/scouts/calibration", tags=["scoring"])
+def get_scout_calibration(session: Session = Depends(get_analytics_session)):
+    """Bias and spread per scout and rating field, as compute_score applies them (scoring model v2)."""
+    calibration = load_calibration(session)
+    return {
+        "model": SCORING_MODEL,
+        "priorRatings": PRIOR_RATINGS,
+        "overall": {
+            f: {"mean": round(stats.mean, 3), "sd": round(stats.sd, 3)}
+            for f, stats in calibration.overall.items()
+            if stats is not None
+        },
+        "scouts": calibration.scout_parameters(),
+    }
+
+
+MAX_RANKING_LIMIT = 500
+
+
+@router.get("/rankings", tags=["scoring"])
+def get_rankings(
+    position: Optional[str] = None,
+    limit: int = 50,
+    offset: int = 0,
+    aggregation: str = "mean",
+    age_adjusted: bool = False,
+    birth_quarter: bool = False,
+    session: Session = Depends(get_analytics_session),
+):
+    """
+    Players by their stored overall score (PlayerProfile, calibrated). `position` is a
+    comma-separated list of positions. Reads the precomputed profiles, nothing is scored per request;
+    `percentile` is the rank within the player's position group and age band (percentiles.py).
+    `aggregation=weighted` ranks the stored recency/minutes-weighted profiles.
+    With `age_adjusted` the order is by the age-adjusted score (scoring.age_adjust), computed
+    from the stored profiles of all matching players.
+    """
+    import percentiles
+
+    model = aggregation_model(aggregation)
+    if not 1 <= limit <= MAX_RANKING_LIMIT or offset < 0:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {MAX_RANKING_LIMIT}")
+    query = (
+        select(PlayerProfile, *PLAYER_REF_COLUMNS)
+        .join(Player, Player.pk == PlayerProfile.player_pk)
+        .where(PlayerProfile.model == model)
+    )
+    if position:
+        query = query.where(Player.position.in_([p.strip().upper() for p in position.split(",") if p.strip()]))
+
+    def sub_indicators(profile: PlayerProfile) -> dict:
+        return {
+            "technique": profile.technique,
+            "physical": profile.physical,
+            "intelligence": profile.intelligence,
+            "mentality": profile.mentality,
+            "impact": profile.impact,
+        }
+
+    if age_adjusted:
+        baselines = load_age_baselines(session, model)
+        scored = [
+            (age_adjust({"subIndicators": sub_indicators(row.PlayerProfile)}, row.birthdate, baselines, birth_quarter), row)
+            for row in session.exec(query).all()
+        ]
+        ranked = heapq.nlargest(offset + limit, scored, key=lambda item: item[0]["score"])[offset:]
+    else:
+        rows = session.exec(query.order_by(PlayerProfile.score.desc()).offset(offset).limit(limit)).all()
+        ranked = [(None, row) for row in rows]
+    index = percentiles.percentile_index(session, model)
+    return [
+        {
+            "rank": offset + i + 1,
+            "id": str(row.id),
+            "firstName": row.first_name,
+            "lastName": row.last_name,
+            "birthdate": row.birthdate.isoformat(),
+            "position": row.position,
+            "club": row.club,
+            "score": row.PlayerProfile.score,
+            "subIndicators": sub_indicators(row.PlayerProfile),
+            "minutes": row.PlayerProfile.minutes,
+            "evaluations": row.PlayerProfile.evaluation_count,
+            "percentile": percentiles.percentile_to_dict(index.player_percentile(row, row.PlayerProfile.score)),
+            "ageAdjusted": adjusted,
+        }
+        for i, (adjusted, row) in enumerate(ranked)
+    ]
+
+
+@router.get("/players/{player_id}/score-history", tags=["scoring"])
+def get_score_history(player_id: UUID, model: str = SCORING_MODEL, session: Session = Depends(get_session)):
+    import percentiles
+
+    player = session.get(Player, player_id)
+    if not player:
+        raise HTTPException(status_code=404, detail="Player not found")
+    # percentile cohorts are kept for the current scoring model only
+    index = percentiles.percentile_index(session) if model == SCORING_MODEL else None
+    rows = session.exec(
+        select(ScoreSnapshot, Tournament.name)
+        .join(Tournament, Tournament.pk == ScoreSnapshot.event_pk)
+        .where(ScoreSnapshot.player_pk == player.pk, ScoreSnapshot.model == model)
+        .order_by(ScoreSnapshot.event_date)
+    ).all()
+    return [
+        {
+            "eventId": str(snap.event_id),
+            "eventName": event_name,
+            "eventDate": snap.event_date.isoformat() if snap.event_date else None,
+            "model": snap.model,
+            "score": snap.score,
+            "subIndicators": {
+                "technique": snap.technique,
+                "physical": snap.physical,
+                "intelligence": snap.intelligence,
+                "mentality": snap.mentality,
+                "impact": snap.impact,
+            },
+            "minutes": snap.minutes,
+            "evaluations": snap.evaluation_count,
+            "computedAt": snap.computed_at.isoformat(),
+            "percentile": percentiles.percentile_to_dict(
+                index.player_percentile(player, snap.score, snap.event_pk, snap.event_date), snap.event_id
+            )
+            if index
+            else None,
+        }
+        for snap, event_name in rows
+    ]
@@ -0,0 +1,64 @@
+"""Dataset exports; rows come from exporter.py."""
+import os
+import tempfile
+from datetime import date
+from typing import Optional
+from uuid import UUID
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import FileResponse, StreamingResponse
+from starlette.background import BackgroundTask as StarletteBackgroundTask
+
+from models import SCORING_MODEL
+
+router = APIRouter()
+
+
+@router.get("/exports/{dataset}", tags=["exports"])
+def export_dataset(
+    dataset: str,
+    format: str = "csv",
+    event_id: Optional[UUID] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    model: str = SCORING_MODEL,
+):
+    """
+    Export von players, evaluations, action_stats oder scores als CSV/NDJSON (gestreamt) oder Parquet/Excel.
+    Filter: Turnier (`event_id`) und/oder Event-Datum (`date_from`, `date_to`).
+    """
+    import exporter
+    import snapshot
+
+    if dataset not in exporter.EXPORT_DATASETS:
+        raise HTTPException(status_code=404, detail=f"dataset must be one of {', '.join(exporter.EXPORT_DATASETS)}")
+    if format not in exporter.EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(exporter.EXPORT_FORMATS)}")
+    try:
+        exporter.check_format(format)
+    except ImportError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    filters = {"event_id": event_id, "date_from": date_from, "date_to": date_to, "model": model}
+    # read from the analytics snapshot/replica when one is configured
+    bind = snapshot.analytics_engine()
+    headers = {
+        "Content-Disposition": f'attachment; filename="{dataset}.{format}"',
+        **snapshot.staleness_headers(snapshot.staleness(bind)),
+    }
+    if format in ("csv", "ndjson"):
+        return StreamingResponse(
+            exporter.stream_export(dataset, format, bind=bind, **filters),
+            media_type=exporter.MEDIA_TYPES[format],
+            headers=headers,
+        )
+    # Parquet/xlsx need a seekable file: written batch by batch to a temp file, removed after sending
+    fd, path = tempfile.mkstemp(prefix="export-", suffix=f".{format}")
+    os.close(fd)
+    try:
+        exporter.export_to_file(dataset, format, path, bind=bind, **filters)
+    except BaseException:  # the removal task only runs after a response was sent
+        os.remove(path)
+        raise
+    return FileResponse(
+        path, media_type=exporter.MEDIA_TYPES[format], headers=headers, background=StarletteBackgroundTask(os.remove, path)
+    )
@@ -0,0 +1,85 @@
+"""Bulk import uploads; parsing runs as a job in importer.py."""
+import os
+import tempfile
+from typing import Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from sqlmodel import Session
+
+from db import engine, get_session
+from models import ImportRun
+from serializers import import_run_to_dict
+
+router = APIRouter()
+
+
+@router.post("/imports", tags=["imports"], status_code=202)
+async def create_import(
+    request: Request,
+    kind: str,
+    format: str = "csv",
+    filename: Optional[str] = None,
+    event_id: Optional[UUID] = None,
+    mapping: Optional[str] = None,
+):
+    """
+    Importiert Spieler, Action-Stats oder Bewertungen aus CSV/Parquet (Datei als Request-Body).
+    Die Verarbeitung läuft als Hintergrund-Job; der Fortschritt kann über GET /imports/{id} abgefragt werden.
+    """
+    import importer
+
+    if kind not in importer.IMPORT_KINDS:
+        raise HTTPException(status_code=400, detail=f"kind must be one of {', '.join(importer.IMPORT_KINDS)}")
+    if format not in importer.IMPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(importer.IMPORT_FORMATS)}")
+    # file and database work in the threadpool: the event loop only awaits the request stream
+    fd, path = await run_in_threadpool(tempfile.mkstemp, prefix="import-", suffix=f".{format}")
+    size = 0
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            async for chunk in request.stream():
+                await run_in_threadpool(handle.write, chunk)
+                size += len(chunk)
+    except BaseException:  # client gone: no job will pick the file up
+        os.remove(path)
+        raise
+    if not size:
+        os.remove(path)
+        raise HTTPException(status_code=400, detail="Empty upload")
+    return await run_in_threadpool(start_import, path, kind, format, filename, event_id, mapping)
+
+
+def start_import(
+    path: str, kind: str, format: str, filename: Optional[str], event_id: Optional[UUID], mapping: Optional[str]
+) -> dict:
+    """Create the ImportRun for an uploaded file and queue its job."""
+    import importer
+    import jobs
+
+    with Session(engine) as session:
+        run = ImportRun(kind=kind, format=format, filename=filename)
+        session.add(run)
+        session.commit()
+        session.refresh(run)
+        # the job finds the file by run id (importer.upload_path), not by a path in its params
+        os.replace(path, importer.upload_path(run.id, format))
+        job = jobs.enqueue(
+            session,
+            "import",
+            {
+                "runId": str(run.id),
+                "mapping": importer.parse_mapping([mapping] if mapping else None),
+                "eventId": str(event_id) if event_id else None,
+            },
+        )
+        return {**import_run_to_dict(run), "jobId": str(job.id)}
+
+
+@router.get("/imports/{import_id}", tags=["imports"])
+def get_import(import_id: UUID, session: Session = Depends(get_session)):
+    run = session.get(ImportRun, import_id)
+    if not run:
+        raise HTTPException(status_code=404, detail="Import not found")
+    return import_run_to_dict(run)
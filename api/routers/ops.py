@@ -0,0 +1,98 @@
+"""Background jobs and the ops endpoints that enqueue them."""
+from typing import Any, Dict, Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlmodel import Session, select
+
+from db import get_session
+from models import Job
+from schemas import JobCreate, SeedRequest
+from serializers import job_to_dict
+
+router = APIRouter()
+
+
+@router.post("/ops/seed-players", tags=["ops"], status_code=202)
+def ops_seed_players(payload: SeedRequest, request: Request, session: Session = Depends(get_session)):
+    return enqueue_job(session, "seed_players", payload.model_dump())
+
+
+@router.post("/ops/backfill-score-history", tags=["ops"], status_code=202)
+def ops_backfill_score_history(request: Request, session: Session = Depends(get_session)):
+    return enqueue_job(session, "backfill_score_history", {})
+
+
+@router.post("/ops/dedupe-players", tags=["ops"], status_code=202)
+def ops_dedupe_players(request: Request, session: Session = Depends(get_session)):
+    """Startet dedupe_players als Hintergrund-Job; Ergebnis über GET /jobs/{id}."""
+    return enqueue_job(session, "dedupe_players", {})
+
+
+@router.get("/ops/snapshot", tags=["ops"])
+def ops_snapshot_status():
+    """Where analytics endpoints read from and how old that data is (snapshot.py)."""
+    import snapshot
+
+    result = snapshot.staleness()
+    return {
+        "source": result.source,
+        "takenAt": result.taken_at.isoformat() + "Z" if result.taken_at else None,
+        "ageSeconds": result.age_seconds,
+    }
+
+
+@router.post("/ops/snapshot", tags=["ops"])
+def ops_refresh_snapshot():
+    """Copy the database into the analytics snapshot now instead of waiting for the interval."""
+    import snapshot
+
+    if snapshot.snapshot_path() is None:
+        raise HTTPException(status_code=400, detail="Snapshots are off (SNAPSHOT_INTERVAL=0) or the database is not SQLite")
+    snapshot.refresh_snapshot()
+    return ops_snapshot_status()
+
+
+@router.post("/jobs", tags=["jobs"], status_code=202)
+def create_job(payload: JobCreate, session: Session = Depends(get_session)):
+    return enqueue_job(session, payload.kind, payload.params)
+
+
+@router.get("/jobs", tags=["jobs"])
+def list_jobs(
+    status: Optional[str] = None, kind: Optional[str] = None, limit: int = 50, session: Session = Depends(get_session)
+):
+    query = select(Job)
+    if status:
+        query = query.where(Job.status == status)
+    if kind:
+        query = query.where(Job.kind == kind)
+    rows = session.exec(query.order_by(Job.pk.desc()).limit(min(limit, 500))).all()
+    return [job_to_dict(j) for j in rows]
+
+
+@router.get("/jobs/{job_id}", tags=["jobs"])
+def get_job(job_id: UUID, session: Session = Depends(get_session)):
+    job = session.get(Job, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_to_dict(job)
+
+
+@router.post("/jobs/{job_id}/cancel", tags=["jobs"])
+def cancel_job(job_id: UUID, session: Session = Depends(get_session)):
+    """Queued jobs are cancelled right away; running jobs stop at their next progress report."""
+    import jobs
+
+    job = session.get(Job, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_to_dict(jobs.request_cancel(session, job))
+
+
+def enqueue_job(session: Session, kind: str, params: Dict[str, Any]) -> dict:
+    import jobs
+
+    if kind not in jobs.PUBLIC_JOB_KINDS:
+        raise HTTPException(status_code=400, detail=f"kind must be one of {', '.join(jobs.PUBLIC_JOB_KINDS)}")
+    return job_to_dict(jobs.enqueue(session, kind, params))
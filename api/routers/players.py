@@ -0,0 +1,315 @@
+"""Players: CRUD, batch lookup, shortlist flag, the profile page and similar players."""
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import delete as sa_delete
+from sqlmodel import Session, select
+
+from calibration import load_calibration
+from db import get_session
+from models import (
+    ActionStat,
+    Evaluation,
+    Game,
+    GameAction,
+    GameLineup,
+    Player,
+    RosterEntry,
+    ShortlistEntry,
+    Team,
+    Tournament,
+    TournamentParticipant,
+)
+from schemas import DeleteResponse, MAX_BATCH_IDS, PlayerBatchRequest, PlayerCreate, PlayerUpdate
+from scoring import compute_score, refresh_player_profiles, touch_score_snapshots
+from serializers import action_stat_to_dict, evaluation_to_dict, player_refs, player_to_dict
+
+router = APIRouter()
+
+
+@router.get("/players", tags=["players"])
+def list_players(ids: Optional[str] = None, session: Session = Depends(get_session)):
+    if ids is not None:
+        try:
+            wanted = [UUID(part.strip()) for part in ids.split(",") if part.strip()]
+        except ValueError:
+            raise HTTPException(status_code=400, detail="ids must be a comma-separated list of UUIDs")
+        if len(wanted) > MAX_BATCH_IDS:
+            raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_IDS} ids per request")
+        return player_refs(session, wanted)
+    players = session.exec(select(Player).order_by(Player.created_at.desc())).all()
+    return [player_to_dict(p) for p in players]
+
+
+@router.post("/players/batch", tags=["players"])
+def batch_players(payload: PlayerBatchRequest, session: Session = Depends(get_session)):
+    return player_refs(session, payload.ids)
+
+
+@router.get("/players/{player_id}", tags=["players"])
+def get_player(player_id: UUID, session: Session = Depends(get_session)):
+    player = session.get(Player, player_id)
+    if not player:
+        raise HTTPException(status_code=404, detail="Player not found")
+    return player_to_dict(player)
+
+
+@router.post("/players", tags=["players"])
+def create_player(payload: PlayerCreate, session: Session = Depends(get_session)):
+    player = Player(
+        first_name=payload.firstName,
+        last_name=payload.lastName,
+        birthdate=payload.birthdate,
+        nation=payload.nation,
+        plays_in=payload.playsIn,
+        position=payload.position,
+        club=payload.club,
+        level=payload.level,
+        height=payload.height,
+        foot=payload.foot,
+        note=payload.note,
+        photo_data=payload.photoData,
+        shortlisted=payload.shortlisted or False,
+    )
+    session.add(player)
+    session.commit()
+    session.refresh(player)
+    return player_to_dict(player)
+
+
+@router.put("/players/{player_id}", tags=["players"])
+def update_player(player_id: UUID, payload: PlayerUpdate, session: Session = Depends(get_session)):
+    player = session.get(Player, player_id)
+    if not player:
+        raise HTTPException(status_code=404, detail="Player not found")
+    if payload.firstName is not None:
+        player.first_name = payload.firstName
+    if payload.lastName is not None:
+        player.last_name = payload.lastName
+    if payload.birthdate is not None:
+        player.birthdate = payload.birthdate
+    if payload.nation is not None:
+        player.nation = payload.nation
+    if payload.playsIn is not None:
+        player.plays_in = payload.playsIn
+    if payload.position is not None:
+        player.position = payload.position
+    if payload.club is not None:
+        player.club = payload.club
+    if payload.level is not None:
+        player.level = payload.level
+    if payload.height is not None:
+        player.height = payload.height
+    if payload.foot is not None:
+        player.foot = payload.foot
+    if payload.note is not None:
+        player.note = payload.note
+    if payload.photoData is not None:
+        player.photo_data = payload.photoData
+    if payload.shortlisted is not None:
+        player.shortlisted = payload.shortlisted
+    session.add(player)
+    if payload.birthdate is not None or payload.position is not None:
+        # position group and age are filters of the similar-player index and define percentile cohorts
+        session.flush()
+        refresh_player_profiles(session, [player.pk])
+        touch_score_snapshots(session, [player.pk])
+    session.commit()
+    session.refresh(player)
+    return player_to_dict(player)
+
+
+@router.delete("/players/{player_id}", tags=["players"], response_model=DeleteResponse)
+def delete_player(player_id: UUID, session: Session = Depends(get_session)):
+    player = session.get(Player, player_id)
+    if not player:
+        raise HTTPException(status_code=404, detail="Player not found")
+    for table in (ShortlistEntry.__table__, GameAction.__table__):
+        session.execute(sa_delete(table).where(table.c.player_pk == player.pk))
+    session.delete(player)
+    session.commit()
+    return DeleteResponse(id=player_id)
+
+
+@router.post("/players/{player_id}/shortlist", tags=["players"])
+def toggle_shortlist(player_id: UUID, shortlisted: bool = True, session: Session = Depends(get_session)):
+    player = session.get(Player, player_id)
+    if not player:
+        raise HTTPException(status_code=404, detail="Player not found")
+    player.shortlisted = bool(shortlisted)
+    session.add(player)
+    session.commit()
+    session.refresh(player)
+    return player_to_dict(player)
+
+
+MAX_SIMILAR = 100
+
+
+@router.get("/players/{player_id}/similar", tags=["players"])
+def similar_players(
+    player_id: UUID,
+    k: int = 10,
+    position: Optional[str] = None,
+    min_age: Optional[float] = None,
+    max_age: Optional[float] = None,
+    session: Session = Depends(get_session),
+):
+    """
+    The k players whose score profile (sub-indicators and goals/assists/passes/duels
+    per 90) is closest to this player's. `position` is a comma-separated list of
+    positions (default: the player's position group, `all` for no filter);
+    `min_age`/`max_age` in years.
+    """
+    import similarity
+    from balancing import position_group
+
+    if not 1 <= k <= MAX_SIMILAR:
+        raise HTTPException(status_code=400, detail=f"k must be between 1 and {MAX_SIMILAR}")
+    player = session.get(Player, player_id)
+    if not player:
+        raise HTTPException(status_code=404, detail="Player not found")
+    index = similarity.profile_index(session)
+    entry = index.get(player.pk)
+    if entry is None:
+        # profile not written yet (e.g. migrated database before its backfill job ran): compute it now
+        from scoring import refresh_player_profiles
+
+        refresh_player_profiles(session, [player.pk])
+        session.commit()
+        index.refresh(session)
+        entry = index.get(player.pk)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="Player has no evaluations or stats yet")
+    positions = groups = None
+    if position is None:
+        groups = [entry.group] if entry.group else None
+    elif position.strip().lower() != "all":
+        positions = {part.strip().upper() for part in position.split(",") if part.strip()}
+        groups = {position_group(p) for p in positions}
+
+    results, refs = [], {}
+    for _ in range(3):
+        results = index.nearest(
+            entry.vector, k, groups=groups, positions=positions, min_age=min_age, max_age=max_age, exclude=[player.pk]
+        )
+        refs = {ref["id"]: ref for ref in player_refs(session, [e.player_id for _, e in results])}
+        stale = [e for _, e in results if str(e.player_id) not in refs]
+        if not stale:
+            break
+        # deleted players: their profile rows stay behind like score snapshots
+        for e in stale:
+            index.discard(e.player_pk)
+
+    def profile(e) -> dict:
+        return dict(zip(similarity.PROFILE_DIMENSIONS, e.vector))
+
+    return {
+        "playerId": str(player.id),
+        "profile": profile(entry),
+        "results": [
+            {**refs[str(e.player_id)], "distance": round(distance, 3), "profile": profile(e)}
+            for distance, e in results
+            if str(e.player_id) in refs
+        ],
+    }
+
+
+PROFILE_SECTIONS = ("evaluations", "actionStats", "scores", "tournaments", "teams", "lineups")
+
+
+@router.get("/players/{player_id}/profile", tags=["players"])
+def get_player_profile(player_id: UUID, include: Optional[str] = None, session: Session = Depends(get_session)):
+    """
+    Player detail page in one round-trip: the player plus evaluations, action
+    stats, overall and per-event scores, tournament participations, team
+    memberships and game lineups. `include` is a comma-separated subset of
+    PROFILE_SECTIONS (default: all). Uses at most one query per section plus
+    one for the event names, independent of how much data the player has.
+    """
+    sections = set(PROFILE_SECTIONS)
+    if include:
+        sections = {part.strip() for part in include.split(",") if part.strip()}
+        unknown = sections - set(PROFILE_SECTIONS)
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown profile sections: {', '.join(sorted(unknown))}")
+    player = session.get(Player, player_id)
+    if not player:
+        raise HTTPException(status_code=404, detail="Player not found")
+
+    evals: List[Evaluation] = []
+    stats: List[ActionStat] = []
+    if sections & {"evaluations", "scores"}:
+        evals = session.exec(
+            select(Evaluation).where(Evaluation.player_pk == player.pk).order_by(Evaluation.created_at.desc())
+        ).all()
+    if sections & {"actionStats", "scores"}:
+        stats = session.exec(select(ActionStat).where(ActionStat.player_pk == player.pk)).all()
+    participations: List[TournamentParticipant] = []
+    if "tournaments" in sections:
+        participations = session.exec(
+            select(TournamentParticipant).where(TournamentParticipant.player_pk == player.pk)
+        ).all()
+    memberships = []
+    if "teams" in sections:
+        memberships = session.exec(
+            select(RosterEntry, Team).join(Team, Team.pk == RosterEntry.team_pk).where(RosterEntry.player_pk == player.pk)
+        ).all()
+    lineups = []
+    if "lineups" in sections:
+        lineups = session.exec(
+            select(GameLineup, Game).join(Game, Game.pk == GameLineup.game_pk).where(GameLineup.player_pk == player.pk)
+        ).all()
+
+    event_ids = {e.event_id for e in evals} | {s.event_id for s in stats}
+    event_ids |= {p.tournament_id for p in participations}
+    event_ids |= {team.tournament_id for _, team in memberships}
+    event_ids |= {game.tournament_id for _, game in lineups}
+    events: Dict[UUID, Tournament] = {}
+    if event_ids:
+        events = {t.id: t for t in session.exec(select(Tournament).where(Tournament.id.in_(event_ids))).all()}
+
+    def event_ref(event_id: UUID) -> dict:
+        event = events.get(event_id)
+        return {"eventId": str(event_id), "eventName": event.name if event else None}
+
+    result: Dict[str, Any] = {"player": player_to_dict(player)}
+    if "evaluations" in sections:
+        result["evaluations"] = [evaluation_to_dict(e) for e in evals]
+    if "actionStats" in sections:
+        result["actionStats"] = [action_stat_to_dict(s) for s in stats]
+    if "scores" in sections:
+        evals_by_event: Dict[UUID, List[Evaluation]] = {}
+        stats_by_event: Dict[UUID, List[ActionStat]] = {}
+        for e in evals:
+            evals_by_event.setdefault(e.event_id, []).append(e)
+        for s in stats:
+            stats_by_event.setdefault(s.event_id, []).append(s)
+        calibration = load_calibration(session)
+        result["score"] = compute_score(evals, stats, calibration)
+        result["eventScores"] = [
+            {**event_ref(eid), **compute_score(evals_by_event.get(eid, []), stats_by_event.get(eid, []), calibration)}
+            for eid in set(evals_by_event) | set(stats_by_event)
+        ]
+    if "tournaments" in sections:
+        result["tournaments"] = [event_ref(p.tournament_id) for p in participations]
+    if "teams" in sections:
+        result["teams"] = [
+            {**event_ref(team.tournament_id), "teamId": str(team.id), "teamName": team.name, "number": entry.number}
+            for entry, team in memberships
+        ]
+    if "lineups" in sections:
+        result["lineups"] = [
+            {
+                **event_ref(game.tournament_id),
+                "gameId": str(game.id),
+                "kickoff": game.kickoff.isoformat() if game.kickoff else None,
+                "teamId": str(entry.team_id),
+                "number": entry.number,
+                "kit": entry.kit,
+                "position": entry.position,
+            }
+            for entry, game in lineups
+        ]
+    return result
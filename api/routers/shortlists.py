@@ -0,0 +1,264 @@
+"""Named shortlists of scouts and projects; the default list is the one behind Player.shortlisted."""
+import json
+from typing import Dict, List, Optional
+from uuid import UUID, uuid4
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import delete as sa_delete, func, insert as sa_insert
+from sqlmodel import Session, select
+
+from db import get_session, key_of
+from models import Player, PlayerProfile, SCORING_MODEL, Shortlist, ShortlistEntry
+from schemas import (
+    DeleteResponse,
+    ShortlistAddRequest,
+    ShortlistCreate,
+    ShortlistEntryUpdate,
+    ShortlistPlayersRequest,
+    ShortlistUpdate,
+)
+from serializers import PLAYER_REF_COLUMNS, shortlist_to_dict
+
+router = APIRouter()
+
+
+def get_shortlist_or_404(session: Session, shortlist_id: UUID) -> Shortlist:
+    shortlist = session.get(Shortlist, shortlist_id)
+    if not shortlist:
+        raise HTTPException(status_code=404, detail="Shortlist not found")
+    return shortlist
+
+
+def resolve_players(session: Session, ids: List[UUID]) -> Dict[UUID, int]:
+    """Player pk by id with one IN query; 404 if any id is unknown."""
+    wanted = list(dict.fromkeys(ids))
+    pks = dict(session.exec(select(Player.id, Player.pk).where(Player.id.in_(wanted))).all()) if wanted else {}
+    missing = [str(pid) for pid in wanted if pid not in pks]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Unknown players: {', '.join(missing)}")
+    return pks
+
+
+@router.get("/shortlists", tags=["shortlists"])
+def list_shortlists(owner: Optional[str] = None, session: Session = Depends(get_session)):
+    query = (
+        select(Shortlist, func.count(ShortlistEntry.pk).label("size"))
+        .outerjoin(ShortlistEntry, ShortlistEntry.shortlist_pk == Shortlist.pk)
+        .group_by(Shortlist.pk)
+        .order_by(Shortlist.is_default.desc(), Shortlist.owner, Shortlist.name)
+    )
+    if owner is not None:
+        query = query.where(Shortlist.owner == owner)
+    return [shortlist_to_dict(row.Shortlist, row.size) for row in session.exec(query).all()]
+
+
+@router.post("/shortlists", tags=["shortlists"])
+def create_shortlist(payload: ShortlistCreate, session: Session = Depends(get_session)):
+    shortlist = Shortlist(name=payload.name, owner=payload.owner, note=payload.note)
+    session.add(shortlist)
+    session.commit()
+    session.refresh(shortlist)
+    return shortlist_to_dict(shortlist, 0)
+
+
+@router.get("/shortlists/{shortlist_id}", tags=["shortlists"])
+def get_shortlist(shortlist_id: UUID, tag: Optional[str] = None, session: Session = Depends(get_session)):
+    """
+    The list with its players in list order and their current overall score
+    (stored PlayerProfile, null without evaluations), read in one query over
+    ix_shortlistentry_shortlist_order. `tag` keeps only entries carrying that tag.
+    """
+    shortlist = get_shortlist_or_404(session, shortlist_id)
+    rows = session.exec(
+        select(
+            ShortlistEntry.sort_order,
+            ShortlistEntry.note.label("entry_note"),
+            ShortlistEntry.tags,
+            ShortlistEntry.created_at.label("added_at"),
+            *PLAYER_REF_COLUMNS,
+            PlayerProfile.score,
+            PlayerProfile.technique,
+            PlayerProfile.physical,
+            PlayerProfile.intelligence,
+            PlayerProfile.mentality,
+            PlayerProfile.impact,
+        )
+        .join(Player, Player.pk == ShortlistEntry.player_pk)
+        .outerjoin(
+            PlayerProfile, (PlayerProfile.player_pk == Player.pk) & (PlayerProfile.model == SCORING_MODEL)
+        )
+        .where(ShortlistEntry.shortlist_pk == shortlist.pk)
+        .order_by(ShortlistEntry.sort_order)
+    ).all()
+    players = []
+    for row in rows:
+        tags = json.loads(row.tags) if row.tags else []
+        if tag is not None and tag not in tags:
+            continue
+        players.append({
+            "id": str(row.id),
+            "firstName": row.first_name,
+            "lastName": row.last_name,
+            "birthdate": row.birthdate.isoformat(),
+            "nation": row.nation,
+            "position": row.position,
+            "club": row.club,
+            "level": row.level,
+            "sortOrder": row.sort_order,
+            "note": row.entry_note,
+            "tags": tags,
+            "addedAt": row.added_at.isoformat() if row.added_at else None,
+            "score": row.score,
+            "subIndicators": None if row.score is None else {
+                "technique": row.technique,
+                "physical": row.physical,
+                "intelligence": row.intelligence,
+                "mentality": row.mentality,
+                "impact": row.impact,
+            },
+        })
+    return {**shortlist_to_dict(shortlist, len(rows)), "players": players}
+
+
+@router.put("/shortlists/{shortlist_id}", tags=["shortlists"])
+def update_shortlist(shortlist_id: UUID, payload: ShortlistUpdate, session: Session = Depends(get_session)):
+    shortlist = get_shortlist_or_404(session, shortlist_id)
+    if payload.name is not None:
+        shortlist.name = payload.name
+    if payload.owner is not None:
+        shortlist.owner = payload.owner
+    if payload.note is not None:
+        shortlist.note = payload.note
+    session.add(shortlist)
+    session.commit()
+    return get_shortlist(shortlist_id, session=session)
+
+
+@router.delete("/shortlists/{shortlist_id}", tags=["shortlists"], response_model=DeleteResponse)
+def delete_shortlist(shortlist_id: UUID, session: Session = Depends(get_session)):
+    shortlist = get_shortlist_or_404(session, shortlist_id)
+    if shortlist.is_default:
+        raise HTTPException(status_code=400, detail="The default shortlist cannot be deleted")
+    session.execute(sa_delete(ShortlistEntry.__table__).where(ShortlistEntry.__table__.c.shortlist_pk == shortlist.pk))
+    session.delete(shortlist)
+    session.commit()
+    return DeleteResponse(id=shortlist_id)
+
+
+@router.post("/shortlists/{shortlist_id}/players", tags=["shortlists"])
+def add_shortlist_players(shortlist_id: UUID, payload: ShortlistAddRequest, session: Session = Depends(get_session)):
+    """
+    Bulk add: new players are appended in request order; for players already
+    on the list only the given note/tags are updated, their position is kept.
+    """
+    shortlist = get_shortlist_or_404(session, shortlist_id)
+    pks = resolve_players(session, [item.playerId for item in payload.players])
+    existing = {
+        entry.player_pk: entry
+        for entry in session.exec(
+            select(ShortlistEntry).where(
+                ShortlistEntry.shortlist_pk == shortlist.pk, ShortlistEntry.player_pk.in_(list(pks.values()))
+            )
+        ).all()
+    }
+    last = session.exec(select(func.max(ShortlistEntry.sort_order)).where(ShortlistEntry.shortlist_pk == shortlist.pk)).one()
+    new_rows: Dict[UUID, dict] = {}
+    for item in payload.players:
+        tags = json.dumps(item.tags) if item.tags is not None else None
+        entry = existing.get(pks[item.playerId])
+        if entry is not None:
+            if item.note is not None:
+                entry.note = item.note
+            if tags is not None:
+                entry.tags = tags
+            session.add(entry)
+            continue
+        row = new_rows.get(item.playerId)
+        if row is None:
+            last = (last or 0) + 1
+            row = new_rows[item.playerId] = {
+                "id": uuid4(),
+                "shortlist_id": shortlist.id,
+                "player_id": item.playerId,
+                "sort_order": last,
+                "note": None,
+                "tags": None,
+            }
+        if item.note is not None:
+            row["note"] = item.note
+        if tags is not None:
+            row["tags"] = tags
+    if new_rows:
+        session.execute(sa_insert(ShortlistEntry.__table__), list(new_rows.values()))
+    session.commit()
+    return get_shortlist(shortlist_id, session=session)
+
+
+@router.post("/shortlists/{shortlist_id}/players/remove", tags=["shortlists"])
+def remove_shortlist_players(
+    shortlist_id: UUID, payload: ShortlistPlayersRequest, session: Session = Depends(get_session)
+):
+    """Bulk remove; ids not on the list are ignored."""
+    shortlist = get_shortlist_or_404(session, shortlist_id)
+    if payload.playerIds:
+        entries = ShortlistEntry.__table__
+        session.execute(
+            sa_delete(entries).where(
+                entries.c.shortlist_pk == shortlist.pk,
+                entries.c.player_pk.in_(select(Player.pk).where(Player.id.in_(payload.playerIds))),
+            )
+        )
+        session.commit()
+    return get_shortlist(shortlist_id, session=session)
+
+
+@router.put("/shortlists/{shortlist_id}/order", tags=["shortlists"])
+def reorder_shortlist(shortlist_id: UUID, payload: ShortlistPlayersRequest, session: Session = Depends(get_session)):
+    """Put the given players first, in the given order; the rest keep their relative order behind them."""
+    shortlist = get_shortlist_or_404(session, shortlist_id)
+    pks = resolve_players(session, payload.playerIds)
+    entries = session.exec(
+        select(ShortlistEntry).where(ShortlistEntry.shortlist_pk == shortlist.pk).order_by(ShortlistEntry.sort_order)
+    ).all()
+    by_player = {entry.player_pk: entry for entry in entries}
+    first = [by_player[pk] for pk in pks.values() if pk in by_player]
+    moved = {entry.pk for entry in first}
+    for position, entry in enumerate(first + [e for e in entries if e.pk not in moved], start=1):
+        if entry.sort_order != position:
+            entry.sort_order = position
+            session.add(entry)
+    session.commit()
+    return get_shortlist(shortlist_id, session=session)
+
+
+@router.put("/shortlists/{shortlist_id}/players/{player_id}", tags=["shortlists"])
+def update_shortlist_entry(
+    shortlist_id: UUID, player_id: UUID, payload: ShortlistEntryUpdate, session: Session = Depends(get_session)
+):
+    shortlist = get_shortlist_or_404(session, shortlist_id)
+    entry = session.exec(
+        select(ShortlistEntry).where(
+            ShortlistEntry.shortlist_pk == shortlist.pk, ShortlistEntry.player_pk == key_of(Player, player_id)
+        )
+    ).first()
+    if not entry:
+        raise HTTPException(status_code=404, detail="Player is not on this shortlist")
+    if payload.note is not None:
+        entry.note = payload.note
+    if payload.tags is not None:
+        entry.tags = json.dumps(payload.tags)
+    session.add(entry)
+    session.commit()
+    return get_shortlist(shortlist_id, session=session)
+
+
+@router.get("/players/{player_id}/shortlists", tags=["shortlists"])
+def list_player_shortlists(player_id: UUID, session: Session = Depends(get_session)):
+    """Lists the player is on, via the player_pk index of the entries."""
+    rows = session.exec(
+        select(Shortlist)
+        .join(ShortlistEntry, ShortlistEntry.shortlist_pk == Shortlist.pk)
+        .where(ShortlistEntry.player_pk == key_of(Player, player_id))
+        .order_by(Shortlist.is_default.desc(), Shortlist.owner, Shortlist.name)
+    ).all()
+    return [shortlist_to_dict(s) for s in rows]
@@ -0,0 +1,690 @@
+"""Tournaments with their participants, teams, games, lineups and videos."""
+from datetime import date, datetime, time, timedelta
+from typing import Optional
+from uuid import UUID, uuid4
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import delete as sa_delete, insert as sa_insert
+from sqlmodel import Session, select
+
+import game_actions
+from calibration import load_calibration
+from db import get_session, key_of, mark_changed
+from models import (
+    ActionStat,
+    Evaluation,
+    Game,
+    GameLineup,
+    GameVideo,
+    Player,
+    RosterEntry,
+    Team,
+    Tournament,
+    TournamentParticipant,
+    Venue,
+    VenuePitch,
+)
+from schemas import (
+    AutoBalanceRequest,
+    GameCreate,
+    LineupUpdate,
+    ParticipantUpdate,
+    ScheduleRequest,
+    TeamCreate,
+    TeamRosterUpdate,
+    TeamUpdate,
+    TournamentCreate,
+    TournamentUpdate,
+    VideoUpdate,
+)
+from scoring import EVALUATION_SCORE_COLUMNS, STAT_SCORE_COLUMNS, compute_score
+from serializers import tournament_to_dict, tournament_view
+
+router = APIRouter()
+
+
+@router.get("/tournaments", tags=["tournaments"])
+def list_tournaments(session: Session = Depends(get_session)):
+    import broadcast
+
+    def load():
+        tournaments = session.exec(select(Tournament).order_by(Tournament.created_at.desc())).all()
+        return [tournament_view(session, t) for t in tournaments]
+
+    return broadcast.cached("tournaments", load)
+
+
+@router.post("/tournaments", tags=["tournaments"])
+def create_tournament(payload: TournamentCreate, session: Session = Depends(get_session)):
+    tour = Tournament(
+        name=payload.name,
+        country=payload.country or "",
+        start=payload.start,
+        end=payload.end,
+        note=payload.note,
+        venue_id=payload.venueId,
+    )
+    session.add(tour)
+    session.commit()
+    session.refresh(tour)
+    # participants
+    for pid in payload.participants or []:
+        session.add(TournamentParticipant(tournament_id=tour.id, player_id=pid))
+    session.commit()
+    return tournament_to_dict(tour, [], [], [], session)
+
+
+@router.put("/tournaments/{tournament_id}", tags=["tournaments"])
+def update_tournament(tournament_id: UUID, payload: TournamentUpdate, session: Session = Depends(get_session)):
+    tour = session.get(Tournament, tournament_id)
+    if not tour:
+        raise HTTPException(status_code=404, detail="Tournament not found")
+    if payload.name is not None:
+        tour.name = payload.name
+    if payload.country is not None:
+        tour.country = payload.country
+    if payload.start is not None:
+        tour.start = payload.start
+    if payload.end is not None:
+        tour.end = payload.end
+    if payload.note is not None:
+        tour.note = payload.note
+    if payload.venueId is not None:
+        tour.venue_id = payload.venueId
+    session.add(tour)
+    session.commit()
+    session.refresh(tour)
+    return tournament_view(session, tour)
+
+
+@router.get("/tournaments/{tournament_id}", tags=["tournaments"])
+def get_tournament(tournament_id: UUID, session: Session = Depends(get_session)):
+    tour = session.get(Tournament, tournament_id)
+    if not tour:
+        raise HTTPException(status_code=404, detail="Tournament not found")
+    return tournament_view(session, tour)
+
+
+@router.post("/tournaments/{tournament_id}/teams", tags=["teams"])
+def add_team(tournament_id: UUID, payload: TeamCreate, session: Session = Depends(get_session)):
+    tournament = session.get(Tournament, tournament_id)
+    if not tournament:
+        raise HTTPException(status_code=404, detail="Tournament not found")
+    team = Team(
+        tournament_id=tournament_id,
+        name=payload.name,
+        kit_color=payload.kitColor,
+    )
+    session.add(team)
+    session.commit()
+    session.refresh(team)
+    # Add roster
+    for entry in payload.roster:
+        # basic duplicate check
+        exists_number = session.exec(
+            select(RosterEntry).where(RosterEntry.team_pk == team.pk, RosterEntry.number == entry.number)
+        ).first()
+        if exists_number:
+            continue
+        re = RosterEntry(team_id=team.id, player_id=entry.playerId, number=entry.number)
+        session.add(re)
+    session.commit()
+
+    # Return updated tournament view
+    return tournament_view(session, tournament)
+
+
+@router.put("/tournaments/{tournament_id}/teams/{team_id}", tags=["teams"])
+def update_team(tournament_id: UUID, team_id: UUID, payload: TeamUpdate, session: Session = Depends(get_session)):
+    team = session.get(Team, team_id)
+    if not team or team.tournament_id != tournament_id:
+        raise HTTPException(status_code=404, detail="Team not found")
+    if payload.name is not None:
+        team.name = payload.name
+    if payload.kitColor is not None:
+        team.kit_color = payload.kitColor
+    session.add(team)
+    session.commit()
+    tournament = session.get(Tournament, tournament_id)
+    return tournament_view(session, tournament)
+
+
+@router.put("/tournaments/{tournament_id}/teams/{team_id}/roster", tags=["teams"])
+def update_team_roster(tournament_id: UUID, team_id: UUID, payload: TeamRosterUpdate, session: Session = Depends(get_session)):
+    team = session.get(Team, team_id)
+    if not team or team.tournament_id != tournament_id:
+        raise HTTPException(status_code=404, detail="Team not found")
+    # clear existing roster
+    existing = session.exec(select(RosterEntry).where(RosterEntry.team_pk == team.pk)).all()
+    for row in existing:
+        session.delete(row)
+    session.commit()
+    # add new roster
+    for entry in payload.roster:
+        re = RosterEntry(team_id=team_id, player_id=entry.playerId, number=entry.number)
+        session.add(re)
+    session.commit()
+    tournament = session.get(Tournament, tournament_id)
+    return tournament_view(session, tournament)
+
+
+@router.post("/tournaments/{tournament_id}/teams/auto-balance", tags=["teams"])
+def auto_balance_teams(tournament_id: UUID, payload: AutoBalanceRequest, session: Session = Depends(get_session)):
+    """
+    Teilnehmer auf `teams` Teams verteilen: ausgeglichener Durchschnitts-Score (`compute_score`),
+    Alter und Positionen (TW/Abwehr/Mittelfeld/Angriff). Bestehende Teams des Turniers werden
+    (nach Anlagereihenfolge) wiederverwendet und ihre Kader ersetzt, fehlende angelegt; alles in
+    einer Transaktion. `dryRun` liefert nur die Aufteilung.
+    """
+    import balancing
+
+    tour = session.get(Tournament, tournament_id)
+    if not tour:
+        raise HTTPException(status_code=404, detail="Tournament not found")
+    players = session.exec(
+        select(Player.pk, Player.id, Player.birthdate, Player.position)
+        .join(TournamentParticipant, TournamentParticipant.player_pk == Player.pk)
+        .where(TournamentParticipant.tournament_pk == tour.pk)
+        .order_by(Player.pk)
+    ).all()
+    player_pks = [p.pk for p in players]
+    evals, stats = {}, {}
+    for row in session.exec(select(*EVALUATION_SCORE_COLUMNS).where(Evaluation.player_pk.in_(player_pks))):
+        evals.setdefault(row.player_pk, []).append(row)
+    for row in session.exec(select(*STAT_SCORE_COLUMNS).where(ActionStat.player_pk.in_(player_pks))):
+        stats.setdefault(row.player_pk, []).append(row)
+    on = tour.start or date.today()
+    calibration = load_calibration(session)
+    candidates = [
+        balancing.Candidate(
+            id=p.id,
+            score=compute_score(evals.get(p.pk, []), stats.get(p.pk, []), calibration)["score"],
+            age=(on - p.birthdate).days / 365.25,
+            position=p.position,
+        )
+        for p in {p.pk: p for p in players}.values()
+    ]
+    try:
+        balanced = balancing.balance_teams(candidates, payload.teams)
+    except balancing.BalanceError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    teams = session.exec(select(Team).where(Team.tournament_pk == tour.pk).order_by(Team.pk).limit(payload.teams)).all()
+    names = iter(payload.teamNames or [])
+    for i in range(len(teams), payload.teams):
+        teams.append(Team(tournament_id=tour.id, name=next(names, None) or f"Team {i + 1}"))
+    rows = [
+        {"id": uuid4(), "team_id": team.id, "player_id": c.id, "number": str(number)}
+        for team, result in zip(teams, balanced)
+        for number, c in enumerate(result.players, start=1)
+    ]
+    if not payload.dryRun:
+        for team in teams:
+            session.add(team)
+        session.flush()
+        roster = RosterEntry.__table__
+        tournament_teams = select(Team.pk).where(Team.tournament_pk == tour.pk)
+        session.execute(
+            sa_delete(roster).where(
+                roster.c.team_pk.in_([t.pk for t in teams])
+                | (roster.c.team_pk.in_(tournament_teams) & roster.c.player_pk.in_(player_pks))
+            )
+        )
+        session.execute(sa_insert(roster), rows)
+        mark_changed(session, "tournaments")
+        session.commit()
+
+    def spread(values):
+        return round(max(values) - min(values), 2)
+
+    return {
+        "dryRun": payload.dryRun,
+        "teams": [
+            {
+                "id": None if payload.dryRun and team.pk is None else str(team.id),
+                "name": team.name,
+                "avgScore": round(result.avg_score, 2),
+                "avgAge": round(result.avg_age, 2),
+                "positions": result.positions,
+                "players": [
+                    {"playerId": str(c.id), "number": str(number), "position": c.position, "score": c.score, "age": round(c.age, 1)}
+                    for number, c in enumerate(result.players, start=1)
+                ],
+            }
+            for team, result in zip(teams, balanced)
+        ],
+        "spread": {
+            "avgScore": spread([t.avg_score for t in balanced]),
+            "avgAge": spread([t.avg_age for t in balanced]),
+        },
+    }
+
+
+@router.put("/tournaments/{tournament_id}/participants", tags=["tournaments"])
+def update_participants(tournament_id: UUID, payload: ParticipantUpdate, session: Session = Depends(get_session)):
+    tour = session.get(Tournament, tournament_id)
+    if not tour:
+        raise HTTPException(status_code=404, detail="Tournament not found")
+    # clear
+    existing = session.exec(select(TournamentParticipant).where(TournamentParticipant.tournament_pk == tour.pk)).all()
+    for row in existing:
+        session.delete(row)
+    session.commit()
+    # add
+    for pid in payload.participants:
+        session.add(TournamentParticipant(tournament_id=tournament_id, player_id=pid))
+    session.commit()
+    return tournament_view(session, tour)
+
+
+@router.delete("/tournaments/{tournament_id}/teams/{team_id}", tags=["teams"])
+def delete_team(tournament_id: UUID, team_id: UUID, session: Session = Depends(get_session)):
+    team = session.get(Team, team_id)
+    if not team or team.tournament_id != tournament_id:
+        raise HTTPException(status_code=404, detail="Team not found")
+    # delete related roster
+    roster_rows = session.exec(select(RosterEntry).where(RosterEntry.team_pk == team.pk)).all()
+    for row in roster_rows:
+        session.delete(row)
+    # delete games involving this team
+    games = session.exec(select(Game).where((Game.team_a_pk == team.pk) | (Game.team_b_pk == team.pk))).all()
+    game_actions.delete_for_games(session, [g.pk for g in games])
+    for g in games:
+        # delete lineups and videos
+        lineup_rows = session.exec(select(GameLineup).where(GameLineup.game_pk == g.pk)).all()
+        for lr in lineup_rows:
+            session.delete(lr)
+        video_rows = session.exec(select(GameVideo).where(GameVideo.game_pk == g.pk)).all()
+        for vr in video_rows:
+            session.delete(vr)
+        session.delete(g)
+    session.delete(team)
+    session.commit()
+    tournament = session.get(Tournament, tournament_id)
+    return tournament_view(session, tournament)
+
+
+@router.put("/tournaments/{tournament_id}/participants", tags=["tournaments"])
+def update_participants(tournament_id: UUID, payload: ParticipantUpdate, session: Session = Depends(get_session)):
+    tournament = session.get(Tournament, tournament_id)
+    if not tournament:
+        raise HTTPException(status_code=404, detail="Tournament not found")
+    # clear existing
+    existing = session.exec(select(TournamentParticipant).where(TournamentParticipant.tournament_pk == tournament.pk)).all()
+    for row in existing:
+        session.delete(row)
+    session.commit()
+    for pid in payload.playerIds:
+        tp = TournamentParticipant(tournament_id=tournament_id, player_id=pid)
+        session.add(tp)
+    session.commit()
+    return tournament_view(session, tournament)
+
+
+@router.post("/tournaments/{tournament_id}/games", tags=["games"])
+def create_game(tournament_id: UUID, payload: GameCreate, force: bool = False, session: Session = Depends(get_session)):
+    tour = session.get(Tournament, tournament_id)
+    if not tour:
+        raise HTTPException(status_code=404, detail="Tournament not found")
+    # validate timeframe if tour has dates
+    if payload.kickoff and tour.start and tour.end:
+        if not (tour.start <= payload.kickoff.date() <= tour.end):
+            raise HTTPException(status_code=400, detail="Kickoff outside tournament range")
+    if payload.pitchId:
+        pitch = session.get(VenuePitch, payload.pitchId)
+        if not pitch or (tour.venue_id and pitch.venue_id != tour.venue_id):
+            raise HTTPException(status_code=400, detail="Pitch not valid for this tournament")
+    team_b_value = payload.teamBId or payload.teamAId  # fallback for non-null constraint in existing DB
+    if not force:
+        ensure_available(session, payload, [payload.teamAId, team_b_value])
+    game = Game(
+        tournament_id=tournament_id,
+        team_a_id=payload.teamAId,
+        team_b_id=team_b_value,
+        kickoff=payload.kickoff,
+        kit_a=payload.kitA,
+        kit_b=payload.kitB,
+        note=payload.note,
+        pitch_id=payload.pitchId,
+        duration_minutes=payload.durationMinutes,
+    )
+    session.add(game)
+    session.commit()
+    session.refresh(game)
+    return tournament_view(session, tour)
+
+
+@router.put("/tournaments/{tournament_id}/games/{game_id}/lineup", tags=["games"])
+def update_lineup(
+    tournament_id: UUID, game_id: UUID, payload: LineupUpdate, force: bool = False, session: Session = Depends(get_session)
+):
+    game = session.get(Game, game_id)
+    if not game or game.tournament_id != tournament_id:
+        raise HTTPException(status_code=404, detail="Game not found")
+    if not force and game.kickoff and payload.lineup:
+        import availability
+
+        player_pks = session.exec(select(Player.pk).where(Player.id.in_({e.playerId for e in payload.lineup}))).all()
+        conflicts = [
+            c
+            for c in availability.find_conflicts(
+                session,
+                game.kickoff,
+                game.duration_minutes,
+                team_pks=[game.team_a_pk, game.team_b_pk],
+                player_pks=player_pks,
+                exclude_game_pk=game.pk,
+            )
+            if c["kind"] == "player"
+        ]
+        if conflicts:
+            raise HTTPException(status_code=409, detail={"message": "Players already play at that time", "conflicts": conflicts})
+    existing = session.exec(select(GameLineup).where(GameLineup.game_pk == game.pk)).all()
+    for row in existing:
+        session.delete(row)
+    session.commit()
+    for entry in payload.lineup:
+        gl = GameLineup(
+            game_id=game_id,
+            player_id=entry.playerId,
+            team_id=entry.teamId,
+            number=entry.number,
+            kit=entry.kit,
+            position=entry.position,
+        )
+        session.add(gl)
+    session.commit()
+    return {"id": str(game_id), "lineupCount": len(payload.lineup)}
+
+
+@router.put("/tournaments/{tournament_id}/games/{game_id}/video", tags=["games"])
+def update_video(tournament_id: UUID, game_id: UUID, payload: VideoUpdate, session: Session = Depends(get_session)):
+    game = session.get(Game, game_id)
+    if not game or game.tournament_id != tournament_id:
+        raise HTTPException(status_code=404, detail="Game not found")
+    video = GameVideo(game_id=game_id, name=payload.name, status=payload.status)
+    session.add(video)
+    session.commit()
+    session.refresh(video)
+    return {"id": str(video.id), "gameId": str(game_id), "status": video.status, "name": video.name}
+
+
+@router.put("/tournaments/{tournament_id}/games/{game_id}", tags=["games"])
+def update_game(
+    tournament_id: UUID, game_id: UUID, payload: GameCreate, force: bool = False, session: Session = Depends(get_session)
+):
+    game = session.get(Game, game_id)
+    if not game or game.tournament_id != tournament_id:
+        raise HTTPException(status_code=404, detail="Game not found")
+    tour = session.get(Tournament, tournament_id)
+    if tour and payload.kickoff and tour.start and tour.end:
+        if not (tour.start <= payload.kickoff.date() <= tour.end):
+            raise HTTPException(status_code=400, detail="Kickoff outside tournament range")
+    if payload.pitchId:
+        pitch = session.get(VenuePitch, payload.pitchId)
+        if not pitch or (tour and tour.venue_id and pitch.venue_id != tour.venue_id):
+            raise HTTPException(status_code=400, detail="Pitch not valid for this tournament")
+    team_b_value = payload.teamBId or payload.teamAId
+    if not force:
+        ensure_available(session, payload, [payload.teamAId, team_b_value], game)
+    game.team_a_id = payload.teamAId
+    game.team_b_id = team_b_value
+    game.kickoff = payload.kickoff
+    game.kit_a = payload.kitA
+    game.kit_b = payload.kitB
+    game.note = payload.note
+    game.pitch_id = payload.pitchId
+    game.duration_minutes = payload.durationMinutes
+    session.add(game)
+    session.commit()
+    return {"id": str(game.id)}
+
+
+def ensure_available(session: Session, payload: GameCreate, team_ids, game: Optional[Game] = None):
+    """
+    409 if the game would overlap another game on its pitch, of one of its teams
+    or of one of its players (lineup of `game`, rosters of the teams).
+    """
+    if not payload.kickoff:
+        return
+    import availability
+
+    team_pks = session.exec(select(Team.pk).where(Team.id.in_(set(team_ids)))).all()
+    player_pks = set(session.exec(select(RosterEntry.player_pk).where(RosterEntry.team_pk.in_(team_pks))).all())
+    if game is not None:
+        player_pks.update(session.exec(select(GameLineup.player_pk).where(GameLineup.game_pk == game.pk)).all())
+    pitch_pk = session.exec(select(VenuePitch.pk).where(VenuePitch.id == payload.pitchId)).first() if payload.pitchId else None
+    conflicts = availability.find_conflicts(
+        session,
+        payload.kickoff,
+        payload.durationMinutes,
+        pitch_pk=pitch_pk,
+        team_pks=team_pks,
+        player_pks=player_pks,
+        exclude_game_pk=game.pk if game is not None else None,
+    )
+    if conflicts:
+        raise HTTPException(status_code=409, detail={"message": "Game overlaps other games", "conflicts": conflicts})
+
+
+@router.delete("/tournaments/{tournament_id}/games/{game_id}", tags=["games"])
+def delete_game(tournament_id: UUID, game_id: UUID, session: Session = Depends(get_session)):
+    game = session.get(Game, game_id)
+    if not game or game.tournament_id != tournament_id:
+        raise HTTPException(status_code=404, detail="Game not found")
+    game_actions.delete_for_games(session, [game.pk])
+    lineup_rows = session.exec(select(GameLineup).where(GameLineup.game_pk == game.pk)).all()
+    for lr in lineup_rows:
+        session.delete(lr)
+    video_rows = session.exec(select(GameVideo).where(GameVideo.game_pk == game.pk)).all()
+    for vr in video_rows:
+        session.delete(vr)
+    session.delete(game)
+    session.commit()
+    return {"id": str(game_id)}
+
+
+@router.get("/tournaments/{tournament_id}/games", tags=["games"])
+def list_games(tournament_id: UUID, session: Session = Depends(get_session)):
+    games = session.exec(select(Game).where(Game.tournament_pk == key_of(Tournament, tournament_id))).all()
+    return [
+        {
+            "id": str(g.id),
+            "teamAId": str(g.team_a_id),
+            "teamBId": str(g.team_b_id) if g.team_b_id else None,
+            "kickoff": g.kickoff.isoformat() if g.kickoff else None,
+            "kitA": g.kit_a,
+            "kitB": g.kit_b,
+            "note": g.note,
+            "pitchId": str(g.pitch_id) if g.pitch_id else None,
+            "durationMinutes": g.duration_minutes,
+        }
+        for g in games
+    ]
+
+
+@router.get("/tournaments/{tournament_id}/conflicts", tags=["games"])
+def list_conflicts(tournament_id: UUID, session: Session = Depends(get_session)):
+    """
+    Überschneidungen der Spiele des Turniers: gleicher Platz (auch mit Spielen anderer Turniere),
+    gleiches Team oder gleicher Spieler (Aufstellung oder Kader), jeweils als Paar von Spielen.
+    """
+    import availability
+
+    tour = session.get(Tournament, tournament_id)
+    if not tour:
+        raise HTTPException(status_code=404, detail="Tournament not found")
+    conflicts = availability.tournament_conflicts(session, tour.pk)
+    return {"tournamentId": str(tour.id), "count": len(conflicts), "conflicts": conflicts}
+
+
+@router.post("/tournaments/{tournament_id}/schedule", tags=["games"])
+def generate_schedule(tournament_id: UUID, payload: ScheduleRequest, session: Session = Depends(get_session)):
+    """
+    Spielplan erzeugen: Jeder gegen jeden (`round_robin`) oder Gruppen plus K.-o.-Runde
+    (`groups_knockout`), verteilt auf die Plätze des Turnierorts. Belegte Plätze (auch durch
+    andere Turniere), Ruhezeiten der Teams und Flutlicht werden berücksichtigt. Alle Spiele werden
+    in einer Transaktion angelegt; K.-o.-Spiele werden nur als reservierte Slots zurückgegeben,
+    da die Teams erst nach der Gruppenphase feststehen. `dryRun` liefert nur den Plan.
+    """
+    import scheduling
+
+    tour = session.get(Tournament, tournament_id)
+    if not tour:
+        raise HTTPException(status_code=404, detail="Tournament not found")
+    if not tour.start or not tour.end:
+        raise HTTPException(status_code=400, detail="Tournament needs start and end dates")
+    team_ids = session.exec(select(Team.id).where(Team.tournament_pk == tour.pk).order_by(Team.pk)).all()
+    pitch_query = select(VenuePitch).order_by(VenuePitch.label)
+    if payload.pitchIds:
+        pitch_query = pitch_query.where(VenuePitch.id.in_(payload.pitchIds))
+    elif tour.venue_id:
+        pitch_query = pitch_query.where(VenuePitch.venue_pk == key_of(Venue, tour.venue_id))
+    else:
+        raise HTTPException(status_code=400, detail="Tournament has no venue; pass pitchIds")
+    pitch_rows = session.exec(pitch_query).all()
+    if payload.pitchIds and (
+        len(pitch_rows) != len(set(payload.pitchIds))
+        or any(tour.venue_id and p.venue_id != tour.venue_id for p in pitch_rows)
+    ):
+        raise HTTPException(status_code=400, detail="Pitch not valid for this tournament")
+    options = scheduling.ScheduleOptions(
+        format=payload.format,
+        groups=payload.groups,
+        advance=payload.advance,
+        game_minutes=payload.gameMinutes,
+        changeover_minutes=payload.changeoverMinutes,
+        rest_minutes=payload.restMinutes,
+        day_start=payload.dayStart,
+        day_end=payload.dayEnd,
+        daylight_end=payload.daylightEnd,
+    )
+    days = [tour.start + timedelta(days=i) for i in range((tour.end - tour.start).days + 1)]
+    pitches = [scheduling.Pitch(id=p.id, label=p.label, lights=bool(p.lights)) for p in pitch_rows]
+    bookings = game_bookings(session, tour, [p.pk for p in pitch_rows], days, skip_own=payload.replace)
+    try:
+        plan = scheduling.plan_schedule(team_ids, pitches, days, options, bookings)
+    except scheduling.ScheduleError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    if plan.unscheduled:
+        total = len(plan.games) + len(plan.unscheduled)
+        raise HTTPException(
+            status_code=409,
+            detail=f"{len(plan.unscheduled)} of {total} games do not fit: add pitches or days, or shorten games and rest times",
+        )
+
+    games = [g for g in plan.games if g.fixture.stage != "knockout"]
+    rows = [
+        {
+            "id": uuid4(),
+            "tournament_id": tour.id,
+            "team_a_id": g.fixture.team_a,
+            "team_b_id": g.fixture.team_b,
+            "kickoff": g.kickoff,
+            "kit_a": None,
+            "kit_b": None,
+            "note": g.fixture.label,
+            "pitch_id": g.pitch.id,
+            "duration_minutes": g.minutes,
+        }
+        for g in games
+    ]
+    if not payload.dryRun:
+        games_table = Game.__table__
+        if payload.replace:
+            own_games = select(games_table.c.pk).where(games_table.c.tournament_pk == tour.pk)
+            game_actions.delete_for_games(session, session.exec(own_games).all())
+            for child in (GameLineup.__table__, GameVideo.__table__):
+                session.execute(sa_delete(child).where(child.c.game_pk.in_(own_games)))
+            session.execute(sa_delete(games_table).where(games_table.c.tournament_pk == tour.pk))
+        if rows:
+            session.execute(sa_insert(games_table), rows)
+        mark_changed(session, "tournaments")
+        session.commit()
+
+    def planned_to_dict(g, row=None) -> dict:
+        return {
+            "id": str(row["id"]) if row and not payload.dryRun else None,
+            "stage": g.fixture.stage,
+            "round": g.fixture.round,
+            "group": g.fixture.group,
+            "label": g.fixture.label,
+            "teamAId": str(g.fixture.team_a) if g.fixture.team_a else None,
+            "teamBId": str(g.fixture.team_b) if g.fixture.team_b else None,
+            "kickoff": g.kickoff.isoformat(),
+            "durationMinutes": g.minutes,
+            "pitchId": str(g.pitch.id),
+            "pitchLabel": g.pitch.label,
+        }
+
+    return {
+        "dryRun": payload.dryRun,
+        "created": 0 if payload.dryRun else len(rows),
+        "games": [planned_to_dict(g, row) for g, row in zip(games, rows)],
+        "knockout": [planned_to_dict(g) for g in plan.games if g.fixture.stage == "knockout"],
+    }
+
+
+def game_bookings(session: Session, tour: Tournament, pitch_pks, days, skip_own: bool = False):
+    """
+    Games the schedule has to work around: those of the tournament (unless they
+    are replaced) and those of other tournaments on the same pitches in the period.
+    """
+    import scheduling
+
+    window_start = datetime.combine(days[0], time.min) - timedelta(days=1)
+    window_end = datetime.combine(days[-1], time.max) + timedelta(days=1)
+    columns = (Game.pk, Game.kickoff, Game.duration_minutes, Game.pitch_id, Game.team_a_id, Game.team_b_id)
+    rows = {}
+    if pitch_pks:
+        query = select(*columns).where(
+            Game.pitch_pk.in_(pitch_pks), Game.kickoff >= window_start, Game.kickoff <= window_end
+        )
+        rows = {row.pk: row for row in session.exec(query)}
+    for row in session.exec(select(*columns).where(Game.tournament_pk == tour.pk)):
+        if skip_own:
+            rows.pop(row.pk, None)
+        else:
+            rows[row.pk] = row
+    return [
+        scheduling.Booking(
+            kickoff=row.kickoff,
+            minutes=row.duration_minutes or scheduling.DEFAULT_GAME_MINUTES,
+            pitch_id=row.pitch_id,
+            team_ids=[t for t in {row.team_a_id, row.team_b_id} if t],
+        )
+        for row in rows.values()
+        if row.kickoff is not None
+    ]
+
+
+@router.delete("/tournaments/{tournament_id}", tags=["tournaments"])
+def delete_tournament(tournament_id: UUID, session: Session = Depends(get_session)):
+    tour = session.get(Tournament, tournament_id)
+    if not tour:
+        raise HTTPException(status_code=404, detail="Tournament not found")
+    # delete participants
+    part_rows = session.exec(select(TournamentParticipant).where(TournamentParticipant.tournament_pk == tour.pk)).all()
+    for pr in part_rows:
+        session.delete(pr)
+    # delete games (with children)
+    games = session.exec(select(Game).where(Game.tournament_pk == tour.pk)).all()
+    game_actions.delete_for_games(session, [g.pk for g in games])
+    for g in games:
+        lineup_rows = session.exec(select(GameLineup).where(GameLineup.game_pk == g.pk)).all()
+        for lr in lineup_rows:
+            session.delete(lr)
+        video_rows = session.exec(select(GameVideo).where(GameVideo.game_pk == g.pk)).all()
+        for vr in video_rows:
+            session.delete(vr)
+        session.delete(g)
+    # delete teams and rosters
+    teams = session.exec(select(Team).where(Team.tournament_pk == tour.pk)).all()
+    for tm in teams:
+        roster_rows = session.exec(select(RosterEntry).where(RosterEntry.team_pk == tm.pk)).all()
+        for rr in roster_rows:
+            session.delete(rr)
+        session.delete(tm)
+    session.delete(tour)
+    session.commit()
+    return {"id": str(tournament_id)}
@@ -0,0 +1,126 @@
+"""Venues and their pitches."""
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlmodel import Session, select
+
+from db import get_session
+from models import Tournament, Venue, VenuePitch
+from schemas import VenueCreate, VenueUpdate
+
+router = APIRouter()
+
+
+@router.get("/venues", tags=["venues"])
+def list_venues(session: Session = Depends(get_session)):
+    venues = session.exec(select(Venue)).all()
+    results = []
+    for v in venues:
+        pitches = session.exec(select(VenuePitch).where(VenuePitch.venue_pk == v.pk)).all()
+        results.append({
+            "id": str(v.id),
+            "name": v.name,
+            "address": v.address,
+            "homeClub": v.home_club,
+            "contact": v.contact,
+            "price": v.price,
+            "note": v.note,
+            "photoData": v.photo_data,
+            "pitches": [
+                {"id": str(p.id), "label": p.label, "surface": p.surface, "lights": p.lights}
+                for p in pitches
+            ],
+        })
+    return results
+
+
+@router.get("/venues/{venue_id}", tags=["venues"])
+def get_venue(venue_id: UUID, session: Session = Depends(get_session)):
+    v = session.get(Venue, venue_id)
+    if not v:
+        raise HTTPException(status_code=404, detail="Venue not found")
+    pitches = session.exec(select(VenuePitch).where(VenuePitch.venue_pk == v.pk)).all()
+    return {
+        "id": str(v.id),
+        "name": v.name,
+        "address": v.address,
+        "homeClub": v.home_club,
+        "contact": v.contact,
+        "price": v.price,
+        "note": v.note,
+        "photoData": v.photo_data,
+        "pitches": [
+            {"id": str(p.id), "label": p.label, "surface": p.surface, "lights": p.lights}
+            for p in pitches
+        ],
+    }
+
+
+@router.post("/venues", tags=["venues"])
+def create_venue(payload: VenueCreate, session: Session = Depends(get_session)):
+    v = Venue(
+        name=payload.name,
+        address=payload.address,
+        home_club=payload.homeClub,
+        contact=payload.contact,
+        price=payload.price,
+        note=payload.note,
+        photo_data=payload.photoData,
+    )
+    session.add(v)
+    session.commit()
+    session.refresh(v)
+    for pitch in payload.pitches:
+        session.add(VenuePitch(venue_id=v.id, label=pitch.label, surface=pitch.surface, lights=pitch.lights))
+    session.commit()
+    return list_venues(session)
+
+
+@router.put("/venues/{venue_id}", tags=["venues"])
+def update_venue(venue_id: UUID, payload: VenueUpdate, session: Session = Depends(get_session)):
+    v = session.get(Venue, venue_id)
+    if not v:
+        raise HTTPException(status_code=404, detail="Venue not found")
+    if payload.name is not None:
+        v.name = payload.name
+    if payload.address is not None:
+        v.address = payload.address
+    if payload.homeClub is not None:
+        v.home_club = payload.homeClub
+    if payload.contact is not None:
+        v.contact = payload.contact
+    if payload.price is not None:
+        v.price = payload.price
+    if payload.note is not None:
+        v.note = payload.note
+    if payload.photoData is not None:
+        v.photo_data = payload.photoData
+    session.add(v)
+    session.commit()
+    if payload.pitches is not None:
+        existing = session.exec(select(VenuePitch).where(VenuePitch.venue_pk == v.pk)).all()
+        for row in existing:
+            session.delete(row)
+        session.commit()
+        for pitch in payload.pitches:
+            session.add(VenuePitch(venue_id=v.id, label=pitch.label, surface=pitch.surface, lights=pitch.lights))
+        session.commit()
+    return list_venues(session)
+
+
+@router.delete("/venues/{venue_id}", tags=["venues"])
+def delete_venue(venue_id: UUID, session: Session = Depends(get_session)):
+    v = session.get(Venue, venue_id)
+    if not v:
+        raise HTTPException(status_code=404, detail="Venue not found")
+    pitches = session.exec(select(VenuePitch).where(VenuePitch.venue_pk == v.pk)).all()
+    for p in pitches:
+        session.delete(p)
+    # unset venue on tournaments
+    tournaments = session.exec(select(Tournament).where(Tournament.venue_pk == v.pk)).all()
+    for t in tournaments:
+        t.venue_id = None
+        session.add(t)
+    session.delete(v)
+    session.commit()
+    return {"id": str(venue_id)}
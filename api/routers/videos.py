@@ -0,0 +1,122 @@
+"""Game video uploads, processing and playback (videos.py)."""
+import mimetypes
+import os
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import FileResponse
+from sqlmodel import Session, select
+
+import videos
+from db import get_session, settings
+from models import Game, GameVideo
+from schemas import DeleteResponse, VideoCreate
+from serializers import video_to_dict
+
+router = APIRouter()
+
+VARIANTS = {"original": videos.ORIGINAL, "preview": videos.PREVIEW}
+
+
+def get_video_or_404(session: Session, video_id: UUID) -> GameVideo:
+    video = session.get(GameVideo, video_id)
+    if not video:
+        raise HTTPException(status_code=404, detail="Video not found")
+    return video
+
+
+@router.post("/tournaments/{tournament_id}/games/{game_id}/videos", tags=["videos"], status_code=201)
+def create_video(tournament_id: UUID, game_id: UUID, payload: VideoCreate, session: Session = Depends(get_session)):
+    """Start an upload: the file is then sent in chunks to `uploadUrl` (PUT with Content-Range)."""
+    game = session.get(Game, game_id)
+    if not game or game.tournament_id != tournament_id:
+        raise HTTPException(status_code=404, detail="Game not found")
+    if payload.sizeBytes > settings.video_max_bytes:
+        raise HTTPException(status_code=413, detail=f"Videos are limited to {settings.video_max_bytes} bytes")
+    video = GameVideo(
+        game_id=game_id,
+        name=payload.name,
+        status="uploading",
+        filename=payload.filename,
+        content_type=payload.contentType or mimetypes.guess_type(payload.filename or "")[0],
+        size_bytes=payload.sizeBytes,
+        start_second=payload.startSecond,
+    )
+    session.add(video)
+    session.commit()
+    session.refresh(video)
+    return video_to_dict(video)
+
+
+@router.get("/tournaments/{tournament_id}/games/{game_id}/videos", tags=["videos"])
+def list_game_videos(tournament_id: UUID, game_id: UUID, session: Session = Depends(get_session)):
+    game = session.get(Game, game_id)
+    if not game or game.tournament_id != tournament_id:
+        raise HTTPException(status_code=404, detail="Game not found")
+    rows = session.exec(select(GameVideo).where(GameVideo.game_pk == game.pk).order_by(GameVideo.pk)).all()
+    return [video_to_dict(v) for v in rows]
+
+
+@router.get("/videos/{video_id}", tags=["videos"])
+def get_video(video_id: UUID, session: Session = Depends(get_session)):
+    """Status and metadata; `receivedBytes` is where an interrupted upload continues."""
+    return video_to_dict(get_video_or_404(session, video_id))
+
+
+@router.put("/videos/{video_id}/content", tags=["videos"])
+async def upload_video_chunk(video_id: UUID, request: Request):
+    """
+    Append one chunk. `Content-Range: bytes <first>-<last>/<total>` places it;
+    `first` must equal `receivedBytes` (409 with the expected offset otherwise).
+    Without the header the body is the whole file. The chunk is streamed to
+    disk; bytes that arrived before a disconnect are kept. After the last chunk
+    the status becomes `uploaded` and processing is queued (`jobId`).
+    """
+    try:
+        video, job_id = await videos.write_chunk(video_id, request.headers.get("content-range"), request.stream())
+    except videos.UploadError as exc:
+        detail = {"message": str(exc), "receivedBytes": exc.received} if exc.received is not None else str(exc)
+        raise HTTPException(status_code=exc.status, detail=detail)
+    return {**video_to_dict(video), "jobId": str(job_id) if job_id else None}
+
+
+@router.get("/videos/{video_id}/content", tags=["videos"])
+def stream_video(video_id: UUID, variant: str = "original", session: Session = Depends(get_session)):
+    """The upload or its preview; Range requests are answered with 206 for seeking."""
+    if variant not in VARIANTS:
+        raise HTTPException(status_code=400, detail=f"variant must be one of {', '.join(VARIANTS)}")
+    video = get_video_or_404(session, video_id)
+    if video.status == "uploading":
+        raise HTTPException(status_code=409, detail="Upload is not complete")
+    path = videos.video_file(video.id, VARIANTS[variant])
+    if not os.path.exists(path):
+        raise HTTPException(status_code=404, detail=f"No {variant} for this video")
+    media_type = "video/mp4" if variant == "preview" else video.content_type or "application/octet-stream"
+    return FileResponse(path, media_type=media_type, filename=video.filename if variant == "original" else None)
+
+
+@router.get("/videos/{video_id}/thumbnail", tags=["videos"])
+def get_video_thumbnail(video_id: UUID, session: Session = Depends(get_session)):
+    video = get_video_or_404(session, video_id)
+    path = videos.video_file(video.id, videos.THUMBNAIL)
+    if not video.has_thumbnail or not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="No thumbnail for this video")
+    return FileResponse(path, media_type="image/jpeg")
+
+
+@router.post("/videos/{video_id}/process", tags=["videos"], status_code=202)
+def reprocess_video(video_id: UUID, session: Session = Depends(get_session)):
+    """Queue processing again, e.g. after a failure or once ffmpeg is installed."""
+    video = get_video_or_404(session, video_id)
+    if video.status in ("uploading", "processing") or not video.size_bytes:
+        raise HTTPException(status_code=409, detail=f"Video is {video.status}")
+    return {**video_to_dict(video), "jobId": str(videos.enqueue_processing(session, video))}
+
+
+@router.delete("/videos/{video_id}", tags=["videos"], response_model=DeleteResponse)
+def delete_video(video_id: UUID, session: Session = Depends(get_session)):
+    video = get_video_or_404(session, video_id)
+    session.delete(video)
+    session.commit()
+    videos.remove_files(video_id)
+    return DeleteResponse(id=video_id)
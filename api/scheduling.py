@@ -0,0 +1,317 @@
+"""
+Fixture generation and pitch allocation for tournaments.
+
+Pure planning code (no database, no FastAPI): the tournaments router loads
+teams, pitches and already booked games, calls plan_schedule() and writes the
+resulting games in one transaction.
+
+- Fixtures: round robin (circle method) or groups followed by a knockout
+  bracket. Knockout pairings depend on group results, so they are planned as
+  reserved slots with placeholder labels ("A1", "Sieger Spiel 1") instead of
+  games.
+- Allocation: greedy, fixtures in round order, each into the earliest slot
+  where the pitch is free (plus changeover), both teams had their rest time
+  and the game ends before dark unless the pitch has lights.
+- Occupancy per pitch and per team is kept in IntervalIndex, so each check is
+  a binary search instead of a scan over all games.
+"""
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+# length of games without duration_minutes
+DEFAULT_GAME_MINUTES = 60
+SCHEDULE_FORMATS = ("round_robin", "groups_knockout")
+KNOCKOUT_ROUND_NAMES = {1: "Finale", 2: "Halbfinale", 4: "Viertelfinale", 8: "Achtelfinale"}
+
+
+class ScheduleError(ValueError):
+    """Input the planner cannot work with (too few teams, no pitches, bracket size)."""
+
+
+class IntervalIndex:
+    """
+    Half-open intervals [start, end) with a key, sorted by start.
+
+    overlapping() only looks at entries that start less than the longest
+    stored interval before the query, found by binary search, so a query costs
+    O(log n + k) for k candidates; games have similar lengths, which keeps k
+    small. Inserts are a binary search plus a list insert.
+    """
+
+    def __init__(self):
+        self._starts: List[datetime] = []
+        self._entries: List[Tuple[datetime, datetime, Any]] = []
+        self._longest = timedelta(0)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self):
+        return iter(self._entries)
+
+    def add(self, start: datetime, end: datetime, key: Any = None) -> None:
+        i = bisect_right(self._starts, start)
+        self._starts.insert(i, start)
+        self._entries.insert(i, (start, end, key))
+        self._longest = max(self._longest, end - start)
+
+    def overlapping(self, start: datetime, end: datetime) -> List[Tuple[datetime, datetime, Any]]:
+        lo = bisect_left(self._starts, start - self._longest)
+        hi = bisect_left(self._starts, end)
+        return [entry for entry in self._entries[lo:hi] if entry[1] > start]
+
+    def is_free(self, start: datetime, end: datetime) -> bool:
+        lo = bisect_left(self._starts, start - self._longest)
+        hi = bisect_left(self._starts, end)
+        return not any(entry[1] > start for entry in self._entries[lo:hi])
+
+
+@dataclass
+class Pitch:
+    id: UUID
+    label: str
+    lights: bool = False
+
+
+@dataclass
+class Booking:
+    """A game that already occupies a pitch and/or teams."""
+
+    kickoff: datetime
+    minutes: int
+    pitch_id: Optional[UUID] = None
+    team_ids: Sequence[UUID] = ()
+
+
+@dataclass
+class ScheduleOptions:
+    format: str = "round_robin"
+    groups: int = 2
+    advance: int = 2  # teams per group that reach the knockout stage
+    game_minutes: int = DEFAULT_GAME_MINUTES
+    changeover_minutes: int = 10  # pitch idle time between two games
+    rest_minutes: int = 60  # minimum break of a team between two games
+    day_start: time = time(9, 0)
+    day_end: time = time(21, 0)
+    daylight_end: time = time(18, 0)  # games on pitches without lights end by then
+
+
+@dataclass
+class Fixture:
+    stage: str  # "group" | "league" | "knockout"
+    round: int
+    label: str
+    team_a: Optional[UUID] = None
+    team_b: Optional[UUID] = None
+    group: Optional[str] = None
+
+
+@dataclass
+class PlannedGame:
+    fixture: Fixture
+    kickoff: datetime
+    minutes: int
+    pitch: Pitch
+
+
+@dataclass
+class SchedulePlan:
+    games: List[PlannedGame] = field(default_factory=list)
+    unscheduled: List[Fixture] = field(default_factory=list)
+
+
+def round_robin(teams: Sequence[Hashable]) -> List[List[Tuple[Hashable, Hashable]]]:
+    """Circle method: n-1 rounds (n rounds for odd n, one team rests) in which every team plays once."""
+    slots = list(teams)
+    if len(slots) < 2:
+        return []
+    if len(slots) % 2:
+        slots.append(None)
+    n = len(slots)
+    rounds = []
+    for r in range(n - 1):
+        pairs = []
+        for i in range(n // 2):
+            a, b = slots[i], slots[n - 1 - i]
+            if a is not None and b is not None:
+                # alternate home/away for the fixed team
+                pairs.append((b, a) if i == 0 and r % 2 else (a, b))
+        rounds.append(pairs)
+        slots = [slots[0], slots[-1]] + slots[1:-1]
+    return rounds
+
+
+def group_label(index: int) -> str:
+    return chr(ord("A") + index)
+
+
+def league_fixtures(teams: Sequence[UUID]) -> List[Fixture]:
+    return [
+        Fixture(stage="league", round=r + 1, label=f"Runde {r + 1}", team_a=a, team_b=b)
+        for r, pairs in enumerate(round_robin(teams))
+        for a, b in pairs
+    ]
+
+
+def group_fixtures(teams: Sequence[UUID], groups: int) -> List[Fixture]:
+    """Teams are dealt into groups in order; rounds of all groups are interleaved."""
+    if groups < 1 or len(teams) < 2 * groups:
+        raise ScheduleError(f"{len(teams)} teams are not enough for {groups} groups of at least 2")
+    per_group = [round_robin(teams[g::groups]) for g in range(groups)]
+    fixtures = []
+    for r in range(max(len(rounds) for rounds in per_group)):
+        for g, rounds in enumerate(per_group):
+            if r < len(rounds):
+                name = group_label(g)
+                fixtures.extend(
+                    Fixture(stage="group", round=r + 1, label=f"Gruppe {name}, Runde {r + 1}", team_a=a, team_b=b, group=name)
+                    for a, b in rounds[r]
+                )
+    return fixtures
+
+
+def knockout_fixtures(groups: int, advance: int, first_round: int) -> List[Fixture]:
+    """
+    Bracket for the best `advance` teams of each group. Seeds are ordered
+    A1, B1, ..., A2, B2, ... and seed i meets seed n-1-i, so group winners
+    meet runners-up of another group first.
+    """
+    entrants = groups * advance
+    if advance < 1 or entrants < 2 or entrants & (entrants - 1):
+        raise ScheduleError(f"groups x advance must be a power of two, got {entrants}")
+    seeds = [f"{group_label(g)}{place}" for place in range(1, advance + 1) for g in range(groups)]
+    fixtures = []
+    labels = [(seeds[i], seeds[entrants - 1 - i]) for i in range(entrants // 2)]
+    round_no, game_no = first_round, 0
+    while labels:
+        name = KNOCKOUT_ROUND_NAMES.get(len(labels), f"Runde der letzten {2 * len(labels)}")
+        winners = []
+        for a, b in labels:
+            game_no += 1
+            fixtures.append(Fixture(stage="knockout", round=round_no, label=f"{name}: {a} – {b}"))
+            winners.append(f"Sieger Spiel {game_no}")
+        labels = [(winners[i], winners[i + 1]) for i in range(0, len(winners) - 1, 2)]
+        round_no += 1
+    return fixtures
+
+
+def build_fixtures(teams: Sequence[UUID], options: ScheduleOptions) -> List[Fixture]:
+    if options.format not in SCHEDULE_FORMATS:
+        raise ScheduleError(f"format must be one of {', '.join(SCHEDULE_FORMATS)}")
+    if len(teams) < 2:
+        raise ScheduleError("At least 2 teams are needed")
+    if options.format == "round_robin":
+        return league_fixtures(teams)
+    fixtures = group_fixtures(teams, options.groups)
+    if options.advance > len(teams) // options.groups:
+        raise ScheduleError("advance is larger than the smallest group")
+    return fixtures + knockout_fixtures(options.groups, options.advance, fixtures[-1].round + 1)
+
+
+def slot_starts(days: Iterable[date], options: ScheduleOptions) -> List[datetime]:
+    """Kickoff grid: from day_start every game + changeover, as long as the game ends by day_end."""
+    step = timedelta(minutes=options.game_minutes + options.changeover_minutes)
+    length = timedelta(minutes=options.game_minutes)
+    starts = []
+    for day in days:
+        kickoff, close = datetime.combine(day, options.day_start), datetime.combine(day, options.day_end)
+        while kickoff + length <= close:
+            starts.append(kickoff)
+            kickoff += step
+    return starts
+
+
+class Allocator:
+    """Pitch and team occupancy; place() books the earliest feasible slot."""
+
+    def __init__(self, pitches: Sequence[Pitch], options: ScheduleOptions, bookings: Iterable[Booking] = ()):
+        self.pitches = list(pitches)
+        self.options = options
+        self.pitch_index: Dict[UUID, IntervalIndex] = {p.id: IntervalIndex() for p in self.pitches}
+        self.team_index: Dict[UUID, IntervalIndex] = {}
+        # slots before this index have no usable pitch left; bookings only grow, so it only moves forward
+        self._first_open = 0
+        for booking in bookings:
+            self.book(booking.kickoff, booking.minutes, booking.pitch_id, booking.team_ids)
+
+    def book(self, kickoff: datetime, minutes: int, pitch_id: Optional[UUID], team_ids: Iterable[Optional[UUID]], key=None) -> None:
+        end = kickoff + timedelta(minutes=minutes)
+        if pitch_id in self.pitch_index:
+            self.pitch_index[pitch_id].add(kickoff, end, key)
+        for team_id in team_ids:
+            if team_id is not None:
+                self.team_index.setdefault(team_id, IntervalIndex()).add(kickoff, end, key)
+
+    def pitch_fits(self, kickoff: datetime, pitch: Pitch) -> bool:
+        opts = self.options
+        end = kickoff + timedelta(minutes=opts.game_minutes)
+        if not pitch.lights and end > datetime.combine(kickoff.date(), opts.daylight_end):
+            return False
+        changeover = timedelta(minutes=opts.changeover_minutes)
+        return self.pitch_index[pitch.id].is_free(kickoff - changeover, end + changeover)
+
+    def fits(self, kickoff: datetime, pitch: Pitch, teams: Sequence[UUID]) -> bool:
+        if not self.pitch_fits(kickoff, pitch):
+            return False
+        end = kickoff + timedelta(minutes=self.options.game_minutes)
+        rest = timedelta(minutes=self.options.rest_minutes)
+        for team_id in teams:
+            index = self.team_index.get(team_id)
+            if index is not None and not index.is_free(kickoff - rest, end + rest):
+                return False
+        return True
+
+    def place(self, fixture: Fixture, starts: Sequence[datetime], not_before: Optional[datetime] = None) -> Optional[PlannedGame]:
+        teams = [t for t in (fixture.team_a, fixture.team_b) if t is not None]
+        while self._first_open < len(starts) and not any(
+            self.pitch_fits(starts[self._first_open], pitch) for pitch in self.pitches
+        ):
+            self._first_open += 1
+        first = max(self._first_open, bisect_left(starts, not_before) if not_before else 0)
+        for kickoff in starts[first:]:
+            for pitch in self.pitches:
+                if self.fits(kickoff, pitch, teams):
+                    self.book(kickoff, self.options.game_minutes, pitch.id, teams, key=fixture)
+                    return PlannedGame(fixture=fixture, kickoff=kickoff, minutes=self.options.game_minutes, pitch=pitch)
+        return None
+
+
+def plan_schedule(
+    teams: Sequence[UUID],
+    pitches: Sequence[Pitch],
+    days: Sequence[date],
+    options: ScheduleOptions,
+    bookings: Iterable[Booking] = (),
+) -> SchedulePlan:
+    """
+    Fixtures for `teams` placed on `pitches` over `days`, around the existing
+    `bookings`. Knockout rounds start after the previous stage has finished
+    plus rest time. Fixtures without a feasible slot end up in `unscheduled`.
+    """
+    if not pitches:
+        raise ScheduleError("No pitches available")
+    fixtures = build_fixtures(teams, options)
+    starts = slot_starts(days, options)
+    allocator = Allocator(pitches, options, bookings)
+    plan = SchedulePlan()
+    stage_end: Optional[datetime] = None
+    not_before: Optional[datetime] = None
+    current = None
+    rest = timedelta(minutes=options.rest_minutes)
+    for fixture in fixtures:
+        if fixture.stage == "knockout" and (fixture.stage, fixture.round) != current:
+            # a knockout round waits for everything planned before it
+            current = (fixture.stage, fixture.round)
+            not_before = stage_end + rest if stage_end else None
+        planned = allocator.place(fixture, starts, not_before)
+        if planned is None:
+            plan.unscheduled.append(fixture)
+            continue
+        plan.games.append(planned)
+        end = planned.kickoff + timedelta(minutes=planned.minutes)
+        stage_end = max(stage_end, end) if stage_end else end
+    plan.games.sort(key=lambda g: (g.kickoff, g.pitch.label))
+    return plan
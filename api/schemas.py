@@ -0,0 +1,269 @@
+"""Request and response bodies of the API."""
+from datetime import date, datetime, time
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class Health(BaseModel):
+    status: str
+    service: str
+
+
+class PlayerCreate(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+    firstName: str
+    lastName: str
+    birthdate: date
+    nation: str
+    playsIn: Optional[str] = None
+    position: Optional[str] = None
+    club: Optional[str] = None
+    level: Optional[str] = None
+    height: Optional[str] = None
+    foot: Optional[str] = None
+    note: Optional[str] = None
+    photoData: Optional[str] = None
+    shortlisted: Optional[bool] = None
+
+
+class PlayerUpdate(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+    firstName: Optional[str] = None
+    lastName: Optional[str] = None
+    birthdate: Optional[date] = None
+    nation: Optional[str] = None
+    playsIn: Optional[str] = None
+    position: Optional[str] = None
+    club: Optional[str] = None
+    level: Optional[str] = None
+    height: Optional[str] = None
+    foot: Optional[str] = None
+    note: Optional[str] = None
+    photoData: Optional[str] = None
+    shortlisted: Optional[bool] = None
+
+
+MAX_BATCH_IDS = 5000
+
+
+class PlayerBatchRequest(BaseModel):
+    ids: List[UUID] = Field(default_factory=list, max_length=MAX_BATCH_IDS)
+
+
+class DeleteResponse(BaseModel):
+    id: UUID
+
+
+class ShortlistCreate(BaseModel):
+    name: str
+    owner: Optional[str] = None
+    note: Optional[str] = None
+
+
+class ShortlistUpdate(BaseModel):
+    name: Optional[str] = None
+    owner: Optional[str] = None
+    note: Optional[str] = None
+
+
+class ShortlistEntryUpdate(BaseModel):
+    note: Optional[str] = None
+    tags: Optional[List[str]] = None
+
+
+class ShortlistEntryIn(ShortlistEntryUpdate):
+    playerId: UUID
+
+
+class ShortlistAddRequest(BaseModel):
+    players: List[ShortlistEntryIn] = Field(default_factory=list, max_length=MAX_BATCH_IDS)
+
+
+class ShortlistPlayersRequest(BaseModel):
+    playerIds: List[UUID] = Field(default_factory=list, max_length=MAX_BATCH_IDS)
+
+
+class RosterEntryCreate(BaseModel):
+    playerId: UUID
+    number: str
+
+
+class TeamCreate(BaseModel):
+    name: str
+    kitColor: Optional[str] = None
+    roster: List[RosterEntryCreate] = Field(default_factory=list)
+
+
+class TeamUpdate(BaseModel):
+    name: Optional[str] = None
+    kitColor: Optional[str] = None
+
+
+class TeamRosterUpdate(BaseModel):
+    roster: List[RosterEntryCreate] = Field(default_factory=list)
+
+
+class AutoBalanceRequest(BaseModel):
+    teams: int = Field(ge=2, le=64)
+    teamNames: Optional[List[str]] = None  # names of teams that have to be created; default "Team <n>"
+    dryRun: bool = False
+
+
+class VenuePitchCreate(BaseModel):
+    label: str
+    surface: Optional[str] = None
+    lights: Optional[bool] = None
+
+
+class VenueCreate(BaseModel):
+    name: str
+    address: Optional[str] = None
+    homeClub: Optional[str] = None
+    contact: Optional[str] = None
+    price: Optional[str] = None
+    note: Optional[str] = None
+    photoData: Optional[str] = None
+    pitches: List[VenuePitchCreate] = Field(default_factory=list)
+
+
+class VenueUpdate(BaseModel):
+    name: Optional[str] = None
+    address: Optional[str] = None
+    homeClub: Optional[str] = None
+    contact: Optional[str] = None
+    price: Optional[str] = None
+    note: Optional[str] = None
+    photoData: Optional[str] = None
+    pitches: Optional[List[VenuePitchCreate]] = None
+
+
+class TeamView(BaseModel):
+    id: UUID
+    name: str
+    kitColor: Optional[str]
+    roster: List[RosterEntryCreate]
+
+
+class ParticipantUpdate(BaseModel):
+    participants: List[UUID] = Field(default_factory=list)
+
+
+class EvaluationCreate(BaseModel):
+    eventId: UUID
+    playerId: UUID
+    scoutName: str = "Scout"
+    ratingTechnique: int = 3
+    ratingPhysical: int = 3
+    ratingIntelligence: int = 3
+    ratingMentality: int = 3
+    ratingImpact: int = 3
+    strengths: Optional[str] = None
+    weaknesses: Optional[str] = None
+    remarks: Optional[str] = None
+
+
+class ActionStatCreate(BaseModel):
+    eventId: UUID
+    playerId: UUID
+    minutes: int = 0
+    shots: int = 0
+    passes: int = 0
+    duels: int = 0
+    goals: int = 0
+    assists: int = 0
+
+
+class JobCreate(BaseModel):
+    kind: str
+    params: Dict[str, Any] = Field(default_factory=dict)
+
+
+class TournamentCreate(BaseModel):
+    name: str
+    country: Optional[str] = None
+    start: Optional[date] = None
+    end: Optional[date] = None
+    note: Optional[str] = None
+    venueId: Optional[UUID] = None
+    participants: Optional[List[UUID]] = None
+
+
+class TournamentUpdate(BaseModel):
+    name: Optional[str] = None
+    country: Optional[str] = None
+    start: Optional[date] = None
+    end: Optional[date] = None
+    note: Optional[str] = None
+    venueId: Optional[UUID] = None
+
+
+class GameCreate(BaseModel):
+    teamAId: UUID
+    teamBId: Optional[UUID] = None
+    kickoff: Optional[datetime] = None
+    kitA: Optional[str] = None
+    kitB: Optional[str] = None
+    note: Optional[str] = None
+    pitchId: Optional[UUID] = None
+    durationMinutes: Optional[int] = Field(default=None, ge=5, le=240)  # availability.MAX_GAME_MINUTES
+
+
+class ScheduleRequest(BaseModel):
+    format: str = "round_robin"  # round_robin | groups_knockout
+    groups: int = 2
+    advance: int = 2
+    gameMinutes: int = Field(default=60, ge=5, le=240)
+    changeoverMinutes: int = Field(default=10, ge=0)
+    restMinutes: int = Field(default=60, ge=0)
+    dayStart: time = time(9, 0)
+    dayEnd: time = time(21, 0)
+    daylightEnd: time = time(18, 0)
+    pitchIds: Optional[List[UUID]] = None  # default: all pitches of the tournament venue
+    replace: bool = False  # delete the tournament's games first
+    dryRun: bool = False
+
+
+class LineupEntry(BaseModel):
+    playerId: UUID
+    teamId: UUID
+    number: str
+    kit: Optional[str] = None
+    position: Optional[str] = None
+
+
+class LineupUpdate(BaseModel):
+    lineup: List[LineupEntry]
+
+
+class VideoUpdate(BaseModel):
+    name: str
+    status: str
+
+
+class VideoCreate(BaseModel):
+    name: str
+    sizeBytes: int = Field(gt=0)
+    filename: Optional[str] = None
+    contentType: Optional[str] = None
+    startSecond: float = Field(default=0, ge=0)  # game clock at the first frame
+
+
+class GameActionIn(BaseModel):
+    playerId: UUID
+    second: float = Field(ge=0)
+    action: str
+    outcome: Optional[str] = None
+    x: Optional[float] = Field(default=None, ge=0, le=100)
+    y: Optional[float] = Field(default=None, ge=0, le=100)
+
+
+class GameActionBatch(BaseModel):
+    actions: List[GameActionIn]
+
+
+class SeedRequest(BaseModel):
+    count: int = 50
+    min_age: int = 17
+    max_age: int = 28
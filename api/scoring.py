@@ -0,0 +1,523 @@
+"""
+Scoring engine: compute_score and its age-adjusted variant, the per-event score
+history (ScoreSnapshot) and the overall profile per player (PlayerProfile, input
+of the similar-player index and the age baselines).
+Used by the API, the importer/exporter and the backfill job.
+"""
+from datetime import date, datetime
+from itertools import groupby
+from typing import Any, Dict, List, Optional
+from uuid import uuid4
+
+from sqlalchemy import func, literal
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlmodel import Session, select
+
+from age_baselines import AgeBaselines, birth_quarter
+from calibration import Calibration, load_calibration
+from models import (
+    ActionStat,
+    Evaluation,
+    Player,
+    PlayerProfile,
+    RevisionCounter,
+    SCORING_MODEL,
+    ScoreSnapshot,
+    Tournament,
+    WEIGHTED_SCORING_MODEL,
+)
+from weighting import Weighting, load_weighting
+
+
+EVALUATION_SCORE_COLUMNS = (
+    Evaluation.player_pk,
+    Evaluation.event_pk,
+    Evaluation.scout_name,
+    Evaluation.created_at,
+    Evaluation.rating_technique,
+    Evaluation.rating_physical,
+    Evaluation.rating_intelligence,
+    Evaluation.rating_mentality,
+    Evaluation.rating_impact,
+)
+
+
+STAT_SCORE_COLUMNS = (
+    ActionStat.player_pk,
+    ActionStat.event_pk,
+    ActionStat.minutes,
+    ActionStat.shots,
+    ActionStat.passes,
+    ActionStat.duels,
+    ActionStat.goals,
+    ActionStat.assists,
+)
+
+
+def event_dates(session: Session, event_pks: Optional[List[int]] = None) -> Dict[int, date]:
+    """Date used to order score snapshots: tournament start, else the day it was created."""
+    query = select(Tournament.pk, Tournament.start, Tournament.created_at)
+    if event_pks is not None:
+        query = query.where(Tournament.pk.in_(event_pks))
+    return {pk: start or created.date() for pk, start, created in session.exec(query).all()}
+
+
+def snapshot_row(
+    player_pk: int,
+    event_pk: int,
+    evals,
+    stats,
+    ids: Dict[str, Any],
+    event_date: Optional[date],
+    calibration: Optional[Calibration] = None,
+) -> dict:
+    result = compute_score(evals, stats, calibration)
+    sub = result["subIndicators"]
+    return {
+        "id": uuid4(),
+        "player_id": ids["player_id"],
+        "player_pk": player_pk,
+        "event_id": ids["event_id"],
+        "event_pk": event_pk,
+        "model": SCORING_MODEL,
+        "event_date": event_date,
+        "score": result["score"],
+        "technique": sub["technique"],
+        "physical": sub["physical"],
+        "intelligence": sub["intelligence"],
+        "mentality": sub["mentality"],
+        "impact": sub["impact"],
+        "minutes": result["explain"]["per90"]["minutes"],
+        "evaluation_count": len(evals),
+        "computed_at": datetime.utcnow(),
+    }
+
+
+def next_revision(session: Session, table, model: str = SCORING_MODEL) -> int:
+    """
+    Next revision of a table's rows of one scoring model, from its
+    RevisionCounter (seeded with max(revision) + 1 on first use). The counter
+    row stays write-locked until the caller commits, so revisions grow in commit order.
+    """
+    counters = RevisionCounter.__table__
+    seed = select(literal(f"{table.name}:{model}"), func.coalesce(func.max(table.c.revision), 0) + 1).where(
+        table.c.model == model
+    )
+    stmt = (
+        sqlite_insert(counters)
+        .from_select(["name", "value"], seed)
+        .on_conflict_do_update(index_elements=["name"], set_={"value": counters.c.value + 1})
+        .returning(counters.c.value)
+    )
+    return session.execute(stmt).scalar_one()
+
+
+def upsert_score_snapshots(session: Session, rows: List[dict]) -> None:
+    if not rows:
+        return
+    table = ScoreSnapshot.__table__
+    revision = next_revision(session, table)
+    stmt = sqlite_insert(table).values(revision=revision)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["player_pk", "event_pk", "model"],
+        set_={
+            **{
+                col: stmt.excluded[col]
+                for col in (
+                    "event_date", "score", "technique", "physical", "intelligence", "mentality", "impact",
+                    "minutes", "evaluation_count", "computed_at",
+                )
+            },
+            "revision": revision,
+        },
+    )
+    session.execute(stmt, rows)
+
+
+def touch_score_snapshots(session: Session, player_pks) -> None:
+    """
+    New revision for the stored snapshots of some players without rescoring, so
+    the percentile index moves them to their new cohort after a position or
+    birthdate change; the caller commits.
+    """
+    table = ScoreSnapshot.__table__
+    session.execute(
+        table.update()
+        .where(table.c.player_pk.in_(list(player_pks)), table.c.model == SCORING_MODEL)
+        .values(revision=next_revision(session, table))
+    )
+
+
+def refresh_score_snapshot(session: Session, player_pk: Optional[int], event_pk: Optional[int]) -> None:
+    """Recompute the snapshot of one player at one event after an evaluation or stat was written."""
+    if player_pk is None or event_pk is None:
+        return
+    refresh_score_snapshots(session, {(player_pk, event_pk)})
+    session.commit()
+
+
+def refresh_score_snapshots(session: Session, pairs) -> None:
+    """
+    Recompute the snapshots for a set of (player_pk, event_pk) pairs, e.g. all
+    pairs touched by one import chunk. Loads the inputs with one IN query per
+    table; the caller commits.
+    """
+    pairs = {(p, e) for p, e in pairs if p is not None and e is not None}
+    if not pairs:
+        return
+    player_pks = sorted({p for p, _ in pairs})
+    event_pks = sorted({e for _, e in pairs})
+    evals: Dict[tuple, list] = {}
+    stats: Dict[tuple, list] = {}
+    for row in session.exec(
+        select(*EVALUATION_SCORE_COLUMNS).where(Evaluation.player_pk.in_(player_pks), Evaluation.event_pk.in_(event_pks))
+    ):
+        evals.setdefault((row.player_pk, row.event_pk), []).append(row)
+    for row in session.exec(
+        select(*STAT_SCORE_COLUMNS).where(ActionStat.player_pk.in_(player_pks), ActionStat.event_pk.in_(event_pks))
+    ):
+        stats.setdefault((row.player_pk, row.event_pk), []).append(row)
+    player_ids = dict(session.exec(select(Player.pk, Player.id).where(Player.pk.in_(player_pks))).all())
+    event_ids = dict(session.exec(select(Tournament.pk, Tournament.id).where(Tournament.pk.in_(event_pks))).all())
+    dates = event_dates(session, event_pks)
+    calibration = load_calibration(session)
+    rows = [
+        snapshot_row(
+            player_pk,
+            event_pk,
+            evals.get((player_pk, event_pk), []),
+            stats.get((player_pk, event_pk), []),
+            {"player_id": player_ids[player_pk], "event_id": event_ids[event_pk]},
+            dates.get(event_pk),
+            calibration,
+        )
+        for player_pk, event_pk in sorted(pairs)
+        if player_pk in player_ids and event_pk in event_ids
+    ]
+    upsert_score_snapshots(session, rows)
+    refresh_player_profiles(session, player_pks, calibration)
+
+
+def profile_row(
+    player_pk: int,
+    player_id,
+    birthdate: Optional[date],
+    evals,
+    stats,
+    calibration: Optional[Calibration] = None,
+    weighting: Optional[Weighting] = None,
+) -> dict:
+    """PlayerProfile values of SCORING_MODEL, or of WEIGHTED_SCORING_MODEL with a weighting."""
+    result = compute_score(evals, stats, calibration, weighting)
+    sub = result["subIndicators"]
+    per90 = result["explain"]["per90"]
+    return {
+        "id": uuid4(),
+        "player_id": player_id,
+        "player_pk": player_pk,
+        "model": SCORING_MODEL if weighting is None else WEIGHTED_SCORING_MODEL,
+        "birthdate": birthdate,
+        "score": result["score"],
+        **sub,
+        "goals_p90": per90["goals"],
+        "assists_p90": per90["assists"],
+        "passes_p90": per90["passes"],
+        "duels_p90": per90["duels"],
+        "minutes": per90["minutes"],
+        "evaluation_count": len(evals),
+        "computed_at": datetime.utcnow(),
+    }
+
+
+def upsert_player_profiles(session: Session, rows: List[dict]) -> None:
+    table = PlayerProfile.__table__
+    # one statement per model: revisions count per model
+    for model, model_rows in groupby(sorted(rows, key=lambda r: r["model"]), key=lambda r: r["model"]):
+        revision = next_revision(session, table, model)
+        stmt = sqlite_insert(table).values(revision=revision)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["player_pk", "model"],
+            set_={
+                **{
+                    col: stmt.excluded[col]
+                    for col in (
+                        "birthdate", "score", "technique", "physical", "intelligence", "mentality", "impact",
+                        "goals_p90", "assists_p90", "passes_p90", "duels_p90", "minutes", "evaluation_count",
+                        "computed_at",
+                    )
+                },
+                "revision": revision,
+            },
+        )
+        session.execute(stmt, list(model_rows))
+
+
+def refresh_player_profiles(session: Session, player_pks, calibration: Optional[Calibration] = None) -> None:
+    """
+    Recompute the profiles (plain and weighted) of some players over all their
+    evaluations and stats; the caller commits.
+    """
+    player_pks = sorted({p for p in player_pks if p is not None})
+    if not player_pks:
+        return
+    if calibration is None:
+        calibration = load_calibration(session)
+    evals: Dict[int, list] = {}
+    stats: Dict[int, list] = {}
+    for row in session.exec(select(*EVALUATION_SCORE_COLUMNS).where(Evaluation.player_pk.in_(player_pks))):
+        evals.setdefault(row.player_pk, []).append(row)
+    for row in session.exec(select(*STAT_SCORE_COLUMNS).where(ActionStat.player_pk.in_(player_pks))):
+        stats.setdefault(row.player_pk, []).append(row)
+    players = {
+        row.pk: row for row in session.exec(select(Player.pk, Player.id, Player.birthdate).where(Player.pk.in_(player_pks)))
+    }
+    weighting = load_weighting(
+        session, event_dates(session, sorted({row.event_pk for rows in stats.values() for row in rows} - {None}))
+    )
+    rows = [
+        profile_row(pk, players[pk].id, players[pk].birthdate, evals.get(pk, []), stats.get(pk, []), calibration, w)
+        for pk in player_pks
+        if pk in players and (pk in evals or pk in stats)
+        for w in (None, weighting)
+    ]
+    upsert_player_profiles(session, rows)
+
+
+def backfill_player_profiles(session: Session, batch_size: int = 1000) -> int:
+    """Rebuild all player profiles; streams like backfill_score_history, grouped by player only."""
+    def stream(columns, model):
+        query = (
+            select(*columns)
+            .where(model.player_pk.is_not(None))
+            .order_by(model.player_pk)
+            .execution_options(yield_per=batch_size)
+        )
+        for player_pk, group in groupby(session.exec(query), key=lambda r: r.player_pk):
+            yield player_pk, list(group)
+
+    players = {row.pk: row for row in session.exec(select(Player.pk, Player.id, Player.birthdate))}
+    calibration = load_calibration(session)
+    weighting = load_weighting(session, event_dates(session))
+    ev_groups = stream(EVALUATION_SCORE_COLUMNS, Evaluation)
+    st_groups = stream(STAT_SCORE_COLUMNS, ActionStat)
+    ev, st = next(ev_groups, None), next(st_groups, None)
+    batch: List[dict] = []
+    written = 0
+    while ev is not None or st is not None:
+        if st is None or (ev is not None and ev[0] < st[0]):
+            player_pk, evals, stats = ev[0], ev[1], []
+            ev = next(ev_groups, None)
+        elif ev is None or st[0] < ev[0]:
+            player_pk, evals, stats = st[0], [], st[1]
+            st = next(st_groups, None)
+        else:
+            player_pk, evals, stats = ev[0], ev[1], st[1]
+            ev, st = next(ev_groups, None), next(st_groups, None)
+        if player_pk not in players:
+            continue
+        player = players[player_pk]
+        for w in (None, weighting):
+            batch.append(profile_row(player_pk, player.id, player.birthdate, evals, stats, calibration, w))
+        if len(batch) >= batch_size:
+            upsert_player_profiles(session, batch)
+            written += len(batch)
+            batch = []
+    upsert_player_profiles(session, batch)
+    written += len(batch)
+    session.commit()
+    return written
+
+
+def _grouped_by_player_event(rows):
+    for key, group in groupby(rows, key=lambda r: (r.player_pk, r.event_pk)):
+        yield key, list(group)
+
+
+def backfill_score_history(session: Session, batch_size: int = 1000, progress=None) -> int:
+    """
+    Rebuild all score snapshots from Evaluation and ActionStat, then the
+    player profiles (backfill_player_profiles).
+    Both tables are streamed ordered by (player_pk, event_pk) over their
+    composite indexes and merged group by group, so memory stays bounded by
+    one player/event group plus one write batch.
+    """
+    def stream(columns, model):
+        query = (
+            select(*columns)
+            .where(model.player_pk.is_not(None), model.event_pk.is_not(None))
+            .order_by(model.player_pk, model.event_pk)
+            .execution_options(yield_per=batch_size)
+        )
+        return _grouped_by_player_event(session.exec(query))
+
+    dates = event_dates(session)
+    player_ids = dict(session.exec(select(Player.pk, Player.id)).all())
+    event_ids = dict(session.exec(select(Tournament.pk, Tournament.id)).all())
+    calibration = load_calibration(session)
+    ev_groups = stream(EVALUATION_SCORE_COLUMNS, Evaluation)
+    st_groups = stream(STAT_SCORE_COLUMNS, ActionStat)
+    ev, st = next(ev_groups, None), next(st_groups, None)
+    batch: List[dict] = []
+    written = 0
+    while ev is not None or st is not None:
+        if st is None or (ev is not None and ev[0] < st[0]):
+            key, evals, stats = ev[0], ev[1], []
+            ev = next(ev_groups, None)
+        elif ev is None or st[0] < ev[0]:
+            key, evals, stats = st[0], [], st[1]
+            st = next(st_groups, None)
+        else:
+            key, evals, stats = ev[0], ev[1], st[1]
+            ev, st = next(ev_groups, None), next(st_groups, None)
+        player_pk, event_pk = key
+        # rows of deleted players or events stay behind, like their snapshots
+        if player_pk not in player_ids or event_pk not in event_ids:
+            continue
+        ids = {"player_id": player_ids[player_pk], "event_id": event_ids[event_pk]}
+        batch.append(snapshot_row(player_pk, event_pk, evals, stats, ids, dates.get(event_pk), calibration))
+        if len(batch) >= batch_size:
+            upsert_score_snapshots(session, batch)
+            written += len(batch)
+            batch = []
+            if progress:
+                session.commit()
+                progress(written, None)
+    upsert_score_snapshots(session, batch)
+    written += len(batch)
+    session.commit()
+    backfill_player_profiles(session, batch_size)
+    return written
+
+
+def per90(value: int, minutes: int) -> float:
+    if minutes <= 0:
+        return 0.0
+    return (value / minutes) * 90.0
+
+
+SCORE_WEIGHTS = {"technique": 0.25, "physical": 0.2, "intelligence": 0.2, "mentality": 0.15, "impact": 0.2}
+
+
+def overall_score(sub: Dict[str, float]) -> float:
+    return round(sum(weight * sub[f] for f, weight in SCORE_WEIGHTS.items()), 2)
+
+
+def compute_score(
+    evals: List[Evaluation],
+    stats: List[ActionStat],
+    calibration: Optional[Calibration] = None,
+    weighting: Optional[Weighting] = None,
+) -> Dict[str, Any]:
+    # Aggregate ratings; with a calibration each rating is first normalized for its scout,
+    # with a weighting (weighting.py) recent evaluations count more
+    rating = (
+        (lambda e, attr: calibration.normalize(e.scout_name, attr[len("rating_"):], getattr(e, attr)))
+        if calibration is not None
+        else getattr
+    )
+    if evals and weighting is not None:
+        ev_weights = [weighting.evaluation_weight(e.created_at) for e in evals]
+        avg = lambda attr: sum(w * rating(e, attr) for w, e in zip(ev_weights, evals)) / sum(ev_weights)
+    elif evals:
+        avg = lambda attr: sum(rating(e, attr) for e in evals) / len(evals)
+    else:
+        avg = lambda attr: 3.0
+    rt = avg("rating_technique")
+    rp = avg("rating_physical")
+    ri = avg("rating_intelligence")
+    rm = avg("rating_mentality")
+    rimp = avg("rating_impact")
+
+    total_minutes = sum(s.minutes for s in stats) or 0
+    if weighting is not None:
+        # newest event counts in full, older ones decayed; few minutes shrink towards the average rates
+        st_weights = [weighting.stat_weight(s.event_pk) for s in stats]
+        top = max(st_weights, default=1.0)
+        st_weights = [w / top for w in st_weights]
+        weighted_minutes = sum(w * s.minutes for w, s in zip(st_weights, stats))
+        rate = lambda attr: weighting.per90(
+            attr, sum(w * getattr(s, attr) for w, s in zip(st_weights, stats)), weighted_minutes
+        )
+    else:
+        rate = lambda attr: per90(sum(getattr(s, attr) for s in stats), total_minutes)
+    goals_p90 = rate("goals")
+    assists_p90 = rate("assists")
+    shots_p90 = rate("shots")
+    passes_p90 = rate("passes")
+    duels_p90 = rate("duels")
+
+    # Sub-indicators 0-100
+    technique = min(100, (rt / 5) * 60 + min(40, passes_p90 * 4))
+    physical = min(100, (rp / 5) * 60 + min(40, duels_p90 * 4))
+    intelligence = min(100, (ri / 5) * 80 + 20)  # mainly rating
+    mentality = min(100, (rm / 5) * 80 + 20)
+    impact = min(100, (rimp / 5) * 50 + min(30, goals_p90 * 10) + min(20, assists_p90 * 10))
+
+    # Overall weighted
+    overall = overall_score(
+        {"technique": technique, "physical": physical, "intelligence": intelligence, "mentality": mentality, "impact": impact}
+    )
+
+    return {
+        "score": overall,
+        "subIndicators": {
+            "technique": round(technique, 1),
+            "physical": round(physical, 1),
+            "intelligence": round(intelligence, 1),
+            "mentality": round(mentality, 1),
+            "impact": round(impact, 1),
+        },
+        "explain": {
+            "calibrated": calibration is not None,
+            "weighting": {
+                "halfLifeDays": weighting.half_life_days,
+                "minMinutes": weighting.min_minutes,
+                "weightedMinutes": round(weighted_minutes, 1),
+            }
+            if weighting is not None
+            else None,
+            "ratings": {
+                "technique": rt,
+                "physical": rp,
+                "intelligence": ri,
+                "mentality": rm,
+                "impact": rimp,
+            },
+            "per90": {
+                "goals": round(goals_p90, 2),
+                "assists": round(assists_p90, 2),
+                "shots": round(shots_p90, 2),
+                "passes": round(passes_p90, 2),
+                "duels": round(duels_p90, 2),
+                "minutes": total_minutes,
+            },
+            "weights": {
+                "technique": "60% scout technique + passes/90 capped 40",
+                "physical": "60% scout physical + duels/90 capped 40",
+                "intelligence": "80% scout intelligence, base 20",
+                "mentality": "80% scout mentality, base 20",
+                "impact": "50% scout impact + goals/90 (10 each, cap 30) + assists/90 (10 each, cap 20)",
+                "overall": "25% technique, 20% physical, 20% intelligence, 15% mentality, 20% impact",
+            },
+        },
+    }
+
+
+def age_adjust(
+    result: Dict[str, Any], birthdate: date, baselines: AgeBaselines, correct_quarter: bool = False
+) -> Dict[str, Any]:
+    """
+    Age-adjusted variant of a compute_score result: every sub-indicator measured
+    against the player's birth year (age_baselines.py), optionally corrected for
+    the birth quarter, and the overall score recomputed with the same weights.
+    """
+    sub = {
+        f: baselines.adjust(f, value, birthdate, correct_quarter) for f, value in result["subIndicators"].items()
+    }
+    return {
+        "score": overall_score(sub),
+        "subIndicators": {f: round(value, 1) for f, value in sub.items()},
+        "birthYear": birthdate.year,
+        "birthYearPlayers": baselines.counts.get(birthdate.year, 0),
+        "birthQuarter": birth_quarter(birthdate) if correct_quarter else None,
+    }
@@ -4,15 +4,14 @@ from uuid import uuid4
 
 from sqlmodel import Session, select
 
-from main import (
+from db import engine, migrate
+from models import (
     Player,
     Tournament,
     Team,
     RosterEntry,
     Evaluation,
     ActionStat,
-    create_db_and_tables,
-    engine,
 )
 
 
@@ -24,7 +23,7 @@ def random_birthdate(min_age=17, max_age=26):
 
 
 def seed():
-    create_db_and_tables()
+    migrate()
     with Session(engine) as session:
         # Event
         event = Tournament(
@@ -3,7 +3,8 @@ from datetime import date, timedelta
 
 from sqlmodel import Session, select
 
-from main import Player, create_db_and_tables, engine
+from db import engine, migrate
+from models import Player
 
 
 def random_birthdate(min_age=17, max_age=28):
@@ -15,7 +16,7 @@ def random_birthdate(min_age=17, max_age=28):
 
 
 def main():
-    create_db_and_tables()
+    migrate()
 
     first_names = [
         "Noah", "Liam", "Jaden", "Mika", "Finn", "Leo", "Jonas", "Luca", "Elias", "Ben",
@@ -0,0 +1,111 @@
+"""
+Random demo players for POST /ops/seed-players (job "seed_players").
+Kept out of the routers so the name lists are only loaded when seeding runs.
+"""
+import random
+from datetime import date, timedelta
+
+from sqlmodel import Session, select
+
+from models import Player
+
+
+def random_birthdate(min_age: int, max_age: int) -> date:
+    today = date.today()
+    years = random.randint(min_age, max_age)
+    days = random.randint(0, 364)
+    target_year = today.year - years
+    # handle leap years by clamping
+    try:
+        return today.replace(year=target_year) - timedelta(days=days % 365)
+    except ValueError:
+        return today.replace(year=target_year, day=28, month=2) - timedelta(days=days % 365)
+
+
+def seed_players(session: Session, count: int = 50, min_age: int = 17, max_age: int = 28, progress=None) -> int:
+    first_names = [
+        "Noah", "Liam", "Jaden", "Mika", "Finn", "Leo", "Jonas", "Luca", "Elias", "Ben",
+        "Julian", "Tim", "Marlon", "Samuel", "Nico", "Daniel", "Tobias", "Luis", "Fabian", "Max",
+        "Aaron", "Bastian", "Cedric", "Dominik", "Erik", "Florian", "Gideon", "Henrik", "Ilja", "Jan",
+        "Kilian", "Laurin", "Mathis", "Nathan", "Ole", "Philipp", "Quentin", "Rafael", "Sven", "Timo",
+        "Valentin", "Yannic", "Zeno", "Arda", "Can", "Emre", "Mehmet", "Serkan", "Ilias", "Hakim",
+    ]
+    last_names = [
+        "Kwan", "Faber", "Mensah", "Schmidt", "Keller", "Hofmann", "Schneider", "Becker", "Krause", "Berger",
+        "Müller", "Wagner", "Wolf", "Koch", "Richter", "Seidel", "Peters", "König", "Voigt", "Brandt",
+        "Aydin", "Demir", "Yildiz", "Öztürk", "Schulz", "Zimmermann", "Weber", "Fuchs", "Lang", "Vogel",
+        "Lehmann", "Kaiser", "Graf", "Arnold", "Barth", "Franke", "Haas", "Maier", "Winter", "Lorenz",
+    ]
+    nations = ["Deutschland", "Österreich", "Schweiz", "Frankreich", "Ghana", "Niederlande", "Belgien", "Spanien", "Italien", "Polen"]
+    plays_in = ["Deutschland", "Österreich", "Schweiz", "Frankreich"]
+    clubs = [
+        "SV Waldhof Mannheim", "Fortuna Köln", "SV Babelsberg 03", "Hallescher FC", "FSV Frankfurt",
+        "Rot-Weiss Essen", "Viktoria Köln", "1860 München", "Chemnitzer FC", "Kickers Offenbach",
+    ]
+    feet = ["Links", "Rechts", "Beidfüßig"]
+    notes = [
+        "Pressingresistenz, progressive Pässe",
+        "Tempo im Umschalten, inverse Läufe",
+        "Stark im 1v1, guter erster Kontakt",
+        "Diagonalbälle, ruhiger Aufbau",
+        "Hohe Laufleistung, aggressives Gegenpressing",
+        "Strafraumpräsenz, Abschluss beidfüßig",
+        "Ballnahes Pressing, gutes Timing",
+        "Enge Ballführung, zieht nach innen",
+        "Robust im Zweikampf, Kopfballstark",
+        "Strategisches Positionsspiel, scanning gut",
+    ]
+
+    created = 0
+    attempts = 0
+    target_attempts = count * 3
+    added = set()
+
+    while created < count and attempts < target_attempts:
+        attempts += 1
+        fn = random.choice(first_names)
+        ln = random.choice(last_names)
+        nat = random.choice(nations)
+        play_country = random.choice(plays_in)
+        club = random.choice(clubs)
+        level = str(random.randint(1, 6))
+        height = f"1,{random.randint(70, 92)} m"
+        foot = random.choice(feet)
+        bd = random_birthdate(min_age=min_age, max_age=max_age)
+        note = random.choice(notes)
+
+        if (fn, ln, bd) in added:
+            continue
+        # no autoflush: pending players would keep SQLite's write lock held between commits
+        with session.no_autoflush:
+            dup = session.exec(
+                select(Player).where(
+                    Player.first_name == fn,
+                    Player.last_name == ln,
+                    Player.birthdate == bd,
+                )
+            ).first()
+        if dup:
+            continue
+        added.add((fn, ln, bd))
+
+        player = Player(
+            first_name=fn,
+            last_name=ln,
+            birthdate=bd,
+            nation=nat,
+            plays_in=play_country,
+            club=club,
+            level=level,
+            height=height,
+            foot=foot,
+            note=note,
+        )
+        session.add(player)
+        created += 1
+        if progress and created % 100 == 0:
+            # commit before reporting: SQLite has one writer and the report is a write
+            session.commit()
+            progress(created, count)
+    session.commit()
+    return created
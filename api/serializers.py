@@ -0,0 +1,290 @@
+"""Model to JSON conversion shared by the routers (camelCase keys)."""
+import json
+from typing import List, Optional
+from uuid import UUID
+
+from sqlmodel import Session, select
+
+from models import (
+    ActionStat,
+    Evaluation,
+    Game,
+    GameAction,
+    GameLineup,
+    GameVideo,
+    ImportRun,
+    Job,
+    Player,
+    RosterEntry,
+    Shortlist,
+    Team,
+    Tournament,
+    TournamentParticipant,
+    Venue,
+    VenuePitch,
+)
+from schemas import RosterEntryCreate, TeamView
+
+
+def player_to_dict(p: Player) -> dict:
+    return {
+        "id": str(p.id),
+        "uniqueId": p.unique_id,
+        "firstName": p.first_name,
+        "lastName": p.last_name,
+        "birthdate": p.birthdate.isoformat(),
+        "nation": p.nation,
+        "playsIn": p.plays_in,
+        "position": p.position,
+        "club": p.club,
+        "level": p.level,
+        "height": p.height,
+        "foot": p.foot,
+        "note": p.note,
+        "photoData": p.photo_data,
+        "shortlisted": p.shortlisted,
+        "createdAt": p.created_at.isoformat(),
+    }
+
+
+# compact projection for roster/lineup rendering (no photo_data, no notes)
+PLAYER_REF_COLUMNS = (
+    Player.id,
+    Player.first_name,
+    Player.last_name,
+    Player.birthdate,
+    Player.nation,
+    Player.position,
+    Player.club,
+    Player.level,
+    Player.shortlisted,
+)
+
+
+def player_refs(session: Session, ids: List[UUID]) -> List[dict]:
+    """Resolve player ids with a single IN query on the id index; unknown ids are skipped, order follows `ids`."""
+    wanted = list(dict.fromkeys(ids))
+    if not wanted:
+        return []
+    rows = session.exec(select(*PLAYER_REF_COLUMNS).where(Player.id.in_(wanted))).all()
+    by_id = {row.id: row for row in rows}
+    return [
+        {
+            "id": str(row.id),
+            "firstName": row.first_name,
+            "lastName": row.last_name,
+            "birthdate": row.birthdate.isoformat(),
+            "nation": row.nation,
+            "position": row.position,
+            "club": row.club,
+            "level": row.level,
+            "shortlisted": row.shortlisted,
+        }
+        for row in (by_id.get(pid) for pid in wanted)
+        if row is not None
+    ]
+
+
+def shortlist_to_dict(s: Shortlist, size: Optional[int] = None) -> dict:
+    return {
+        "id": str(s.id),
+        "name": s.name,
+        "owner": s.owner,
+        "note": s.note,
+        "isDefault": s.is_default,
+        "size": size,
+        "createdAt": s.created_at.isoformat() if s.created_at else None,
+    }
+
+
+def job_to_dict(j: Job) -> dict:
+    return {
+        "id": str(j.id),
+        "kind": j.kind,
+        "status": j.status,
+        "params": json.loads(j.params) if j.params else {},
+        "result": json.loads(j.result) if j.result else None,
+        "error": j.error,
+        "progress": j.progress,
+        "message": j.message,
+        "cancelRequested": j.cancel_requested,
+        "createdAt": j.created_at.isoformat() if j.created_at else None,
+        "startedAt": j.started_at.isoformat() if j.started_at else None,
+        "finishedAt": j.finished_at.isoformat() if j.finished_at else None,
+    }
+
+
+def import_run_to_dict(r: ImportRun) -> dict:
+    return {
+        "id": str(r.id),
+        "kind": r.kind,
+        "format": r.format,
+        "filename": r.filename,
+        "status": r.status,
+        "rowsRead": r.rows_read,
+        "rowsImported": r.rows_imported,
+        "rowsFailed": r.rows_failed,
+        "errors": json.loads(r.errors) if r.errors else [],
+        "message": r.message,
+        "createdAt": r.created_at.isoformat() if r.created_at else None,
+        "finishedAt": r.finished_at.isoformat() if r.finished_at else None,
+    }
+
+
+def video_to_dict(v: GameVideo) -> dict:
+    base = f"/videos/{v.id}"
+    return {
+        "id": str(v.id),
+        "gameId": str(v.game_id),
+        "name": v.name,
+        "status": v.status,
+        "startSecond": v.start_second,
+        "filename": v.filename,
+        "contentType": v.content_type,
+        "sizeBytes": v.size_bytes,
+        "receivedBytes": v.received_bytes,
+        "durationSeconds": v.duration_seconds,
+        "width": v.width,
+        "height": v.height,
+        "codec": v.codec,
+        "error": v.error,
+        "uploadUrl": f"{base}/content" if v.status == "uploading" else None,
+        "streamUrl": f"{base}/content" if v.size_bytes and v.status in ("uploaded", "processing", "ready") else None,
+        "previewUrl": f"{base}/content?variant=preview" if v.has_preview else None,
+        "thumbnailUrl": f"{base}/thumbnail" if v.has_thumbnail else None,
+        "createdAt": v.created_at.isoformat() if v.created_at else None,
+        "updatedAt": v.updated_at.isoformat() if v.updated_at else None,
+    }
+
+
+def evaluation_to_dict(r: Evaluation) -> dict:
+    return {
+        "id": str(r.id),
+        "eventId": str(r.event_id),
+        "playerId": str(r.player_id),
+        "scoutName": r.scout_name,
+        "ratingTechnique": r.rating_technique,
+        "ratingPhysical": r.rating_physical,
+        "ratingIntelligence": r.rating_intelligence,
+        "ratingMentality": r.rating_mentality,
+        "ratingImpact": r.rating_impact,
+        "strengths": r.strengths,
+        "weaknesses": r.weaknesses,
+        "remarks": r.remarks,
+        "createdAt": r.created_at.isoformat(),
+    }
+
+
+def action_stat_to_dict(r: ActionStat) -> dict:
+    return {
+        "id": str(r.id),
+        "eventId": str(r.event_id),
+        "playerId": str(r.player_id),
+        "minutes": r.minutes,
+        "shots": r.shots,
+        "passes": r.passes,
+        "duels": r.duels,
+        "goals": r.goals,
+        "assists": r.assists,
+        "source": r.source,
+    }
+
+
+def game_action_to_dict(a: GameAction) -> dict:
+    return {
+        "id": str(a.id),
+        "gameId": str(a.game_id),
+        "eventId": str(a.event_id),
+        "playerId": str(a.player_id),
+        "second": a.second,
+        "action": a.action,
+        "outcome": a.outcome,
+        "x": a.x,
+        "y": a.y,
+    }
+
+
+def tournament_view(session: Session, t: Tournament) -> dict:
+    teams = session.exec(select(Team).where(Team.tournament_pk == t.pk)).all()
+    team_views: List[TeamView] = []
+    for tm in teams:
+        roster_rows = session.exec(select(RosterEntry).where(RosterEntry.team_pk == tm.pk)).all()
+        roster_view = [RosterEntryCreate(playerId=row.player_id, number=row.number) for row in roster_rows]
+        team_views.append(TeamView(id=tm.id, name=tm.name, kitColor=tm.kit_color, roster=roster_view))
+    participants = session.exec(select(TournamentParticipant).where(TournamentParticipant.tournament_pk == t.pk)).all()
+    games = session.exec(select(Game).where(Game.tournament_pk == t.pk)).all()
+    return tournament_to_dict(t, team_views, participants, games, session)
+
+
+def tournament_to_dict(
+    t: Tournament,
+    teams: List[TeamView],
+    participants: Optional[List[TournamentParticipant]] = None,
+    games: Optional[List[Game]] = None,
+    session: Optional[Session] = None,
+) -> dict:
+    venue_dict = None
+    if session and t.venue_id:
+        venue = session.get(Venue, t.venue_id)
+        if venue:
+          pitches = session.exec(select(VenuePitch).where(VenuePitch.venue_pk == venue.pk)).all()
+          venue_dict = {
+              "id": str(venue.id),
+              "name": venue.name,
+              "address": venue.address,
+              "homeClub": venue.home_club,
+              "contact": venue.contact,
+              "price": venue.price,
+              "note": venue.note,
+              "photoData": venue.photo_data,
+              "pitches": [
+                  {"id": str(p.id), "label": p.label, "surface": p.surface, "lights": p.lights}
+                  for p in pitches
+              ],
+          }
+
+    def game_to_dict(g: Game) -> dict:
+        lineup_rows: List[GameLineup] = []
+        video_rows: List[GameVideo] = []
+        if session:
+            lineup_rows = session.exec(select(GameLineup).where(GameLineup.game_pk == g.pk)).all()
+            video_rows = session.exec(select(GameVideo).where(GameVideo.game_pk == g.pk)).all()
+        return {
+            "id": str(g.id),
+            "teamAId": str(g.team_a_id),
+            "teamBId": str(g.team_b_id) if g.team_b_id else None,
+            "kickoff": g.kickoff.isoformat() if g.kickoff else None,
+            "kitA": g.kit_a,
+            "kitB": g.kit_b,
+            "note": g.note,
+            "pitchId": str(g.pitch_id) if g.pitch_id else None,
+            "durationMinutes": g.duration_minutes,
+            "lineup": [
+                {
+                    "playerId": str(l.player_id),
+                    "teamId": str(l.team_id),
+                    "number": l.number,
+                    "kit": l.kit,
+                    "position": l.position,
+                }
+                for l in lineup_rows
+            ],
+            "videos": [video_to_dict(v) for v in video_rows],
+        }
+
+    return {
+        "id": str(t.id),
+        "uniqueId": t.unique_id,
+        "name": t.name,
+        "country": t.country,
+        "start": t.start.isoformat() if t.start else None,
+        "end": t.end.isoformat() if t.end else None,
+        "note": t.note,
+        "teams": [
+          {"id": str(team.id), "uniqueId": getattr(team, "unique_id", None), "name": team.name, "kitColor": team.kitColor, "roster": [{"playerId": str(r.playerId), "number": r.number} for r in team.roster]}
+          for team in teams
+        ],
+        "participants": [str(p.player_id) for p in participants or []],
+        "games": [game_to_dict(g) for g in games or []],
+        "venue": venue_dict,
+    }
@@ -0,0 +1,29 @@
+"""
+Production entrypoint: migrates once, then starts uvicorn with
+settings.web_concurrency worker processes (env WEB_CONCURRENCY, PORT).
+
+    WEB_CONCURRENCY=4 python serve.py
+
+Workers still call migrate() on startup, but find the schema version set and
+skip; see db.migrate().
+"""
+import os
+
+import uvicorn
+
+from db import migrate, settings
+
+
+def main():
+    migrate()
+    uvicorn.run(
+        "main:app",
+        host=settings.host,
+        port=settings.port,
+        workers=settings.web_concurrency,
+        app_dir=os.path.dirname(os.path.abspath(__file__)),
+    )
+
+
+if __name__ == "__main__":
+    main()
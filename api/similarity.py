@@ -0,0 +1,190 @@
+"""
+Similar players: nearest neighbours over the PlayerProfile vectors.
+
+Every worker keeps the profiles in memory (ProfileIndex), bucketed by position
+group (balancing.POSITION_GROUPS). Before each query the index pulls the
+profiles written since its last refresh (revision > last seen, one range seek
+on ix_playerprofile_model_revision), so score changes from any worker arrive
+incrementally instead of through a rebuild.
+
+Distance: Euclidean over the sub-indicators and per-90 values, each dimension
+divided by its standard deviation over all indexed players (running sums, so
+scaling needs no extra pass). A query scans the buckets it is filtered to and
+keeps the k best in a heap: a few thousand players per bucket take a few
+milliseconds.
+"""
+import heapq
+import math
+import threading
+from dataclasses import dataclass
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlmodel import Session, select
+
+from balancing import position_group
+from models import Player, PlayerProfile, SCORING_MODEL
+
+PROFILE_DIMENSIONS = (
+    "technique",
+    "physical",
+    "intelligence",
+    "mentality",
+    "impact",
+    "goals_p90",
+    "assists_p90",
+    "passes_p90",
+    "duels_p90",
+)
+
+
+@dataclass
+class ProfileEntry:
+    player_pk: int
+    player_id: object
+    birthdate: date
+    position: Optional[str]
+    vector: Tuple[float, ...]
+    revision: int = 0
+
+    @property
+    def group(self) -> Optional[str]:
+        return position_group(self.position)
+
+
+def age_on(birthdate: date, on: date) -> float:
+    return (on - birthdate).days / 365.25
+
+
+class ProfileIndex:
+    def __init__(self, model: str = SCORING_MODEL):
+        self.model = model
+        self._entries: Dict[int, ProfileEntry] = {}
+        self._buckets: Dict[Optional[str], Set[int]] = {}
+        self._sums = [0.0] * len(PROFILE_DIMENSIONS)
+        self._squares = [0.0] * len(PROFILE_DIMENSIONS)
+        self._revision = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, player_pk: int) -> Optional[ProfileEntry]:
+        return self._entries.get(player_pk)
+
+    def _add(self, entry: ProfileEntry) -> None:
+        # refreshes query outside the lock: a slower one may bring an older row
+        current = self._entries.get(entry.player_pk)
+        if current is not None and current.revision >= entry.revision:
+            return
+        self._discard(entry.player_pk)
+        self._entries[entry.player_pk] = entry
+        self._buckets.setdefault(entry.group, set()).add(entry.player_pk)
+        for i, value in enumerate(entry.vector):
+            self._sums[i] += value
+            self._squares[i] += value * value
+
+    def _discard(self, player_pk: int) -> None:
+        entry = self._entries.pop(player_pk, None)
+        if entry is None:
+            return
+        self._buckets[entry.group].discard(player_pk)
+        for i, value in enumerate(entry.vector):
+            self._sums[i] -= value
+            self._squares[i] -= value * value
+
+    def discard(self, player_pk: int) -> None:
+        with self._lock:
+            self._discard(player_pk)
+
+    def refresh(self, session: Session) -> int:
+        """Load profiles written since the last refresh; returns how many."""
+        with self._lock:
+            revision = self._revision
+        rows = session.exec(
+            select(
+                PlayerProfile.player_pk,
+                PlayerProfile.revision,
+                Player.id,
+                Player.birthdate,
+                Player.position,
+                *(getattr(PlayerProfile, d) for d in PROFILE_DIMENSIONS),
+            )
+            .join(Player, Player.pk == PlayerProfile.player_pk)
+            .where(PlayerProfile.model == self.model, PlayerProfile.revision > revision)
+            .order_by(PlayerProfile.revision)
+        ).all()
+        with self._lock:
+            for row in rows:
+                self._add(
+                    ProfileEntry(
+                        player_pk=row.player_pk,
+                        player_id=row.id,
+                        birthdate=row.birthdate,
+                        position=row.position,
+                        vector=tuple(float(getattr(row, d) or 0) for d in PROFILE_DIMENSIONS),
+                        revision=row.revision,
+                    )
+                )
+                self._revision = max(self._revision, row.revision)
+        return len(rows)
+
+    def weights(self) -> List[float]:
+        """1 / variance per dimension; constant dimensions get weight 0."""
+        n = len(self._entries)
+        if n < 2:
+            return [1.0] * len(PROFILE_DIMENSIONS)
+        result = []
+        for total, squares in zip(self._sums, self._squares):
+            variance = max(squares / n - (total / n) ** 2, 0.0)
+            result.append(1 / variance if variance > 1e-9 else 0.0)
+        return result
+
+    def nearest(
+        self,
+        vector: Tuple[float, ...],
+        k: int,
+        groups: Optional[Iterable[Optional[str]]] = None,
+        positions: Optional[Set[str]] = None,
+        min_age: Optional[float] = None,
+        max_age: Optional[float] = None,
+        exclude: Iterable[int] = (),
+        on: Optional[date] = None,
+    ) -> List[Tuple[float, ProfileEntry]]:
+        """(distance, entry) of the k nearest profiles, optionally only in some position groups, positions and ages."""
+        on = on or date.today()
+        excluded = set(exclude)
+        with self._lock:
+            w = self.weights()
+            bucket_keys = list(self._buckets) if groups is None else list(groups)
+            candidates = [
+                self._entries[pk]
+                for key in bucket_keys
+                for pk in self._buckets.get(key, ())
+                if pk not in excluded
+            ]
+
+        def distance(entry: ProfileEntry) -> float:
+            return math.sqrt(sum(wi * (a - b) ** 2 for wi, a, b in zip(w, vector, entry.vector)))
+
+        if positions is not None:
+            candidates = [e for e in candidates if (e.position or "").strip().upper() in positions]
+        if min_age is not None or max_age is not None:
+            candidates = [
+                e for e in candidates
+                if (min_age is None or age_on(e.birthdate, on) >= min_age)
+                and (max_age is None or age_on(e.birthdate, on) <= max_age)
+            ]
+        return heapq.nsmallest(k, ((distance(e), e) for e in candidates), key=lambda item: item[0])
+
+
+_indexes: Dict[str, ProfileIndex] = {}
+
+
+def profile_index(session: Session, model: str = SCORING_MODEL) -> ProfileIndex:
+    """The process-wide index for a scoring model, brought up to date."""
+    index = _indexes.get(model)
+    if index is None:
+        index = _indexes.setdefault(model, ProfileIndex(model))
+    index.refresh(session)
+    return index
@@ -0,0 +1,209 @@
+"""
+Read-only copy of the database for analytics (rankings, scout calibration,
+exports), so long scans do not compete with match-day writes.
+
+- SQLite, settings.snapshot_interval > 0: a refresher thread in every worker
+  checks the age of the snapshot file (settings.snapshot_path, default
+  <database>.snapshot); when it is due, one process (file lock) copies the
+  database with the online backup API into a temporary file and renames it over
+  the snapshot. The copy runs in one read transaction, which in WAL mode does
+  not block writers. The snapshot engine opens the file per session (NullPool,
+  immutable), so a session reads one consistent copy and the next session the
+  newest one; the file's mtime is the time the copy was started.
+- settings.replica_database_url (e.g. a Postgres streaming replica): analytics
+  sessions read the replica; its age is the replay lag.
+- Neither, or no snapshot written yet: analytics read the primary database.
+
+Endpoints opt in per route with the get_analytics_session dependency
+(routers/__init__.py), which reports the source and its age in the response
+headers (staleness_headers()).
+"""
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Optional
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import NullPool
+
+from db import engine, schema_fingerprint, settings
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process dev server, no lock needed
+    fcntl = None
+
+logger = logging.getLogger("talentlab.snapshot")
+
+# seconds between two age checks of the refresher thread
+CHECK_INTERVAL = 5.0
+
+
+@dataclass
+class Staleness:
+    source: str  # primary | snapshot | replica
+    taken_at: Optional[datetime] = None
+    age_seconds: Optional[float] = None
+
+
+def snapshot_path() -> Optional[str]:
+    database = engine.url.database
+    if settings.snapshot_interval <= 0 or engine.url.get_backend_name() != "sqlite":
+        return None
+    if not database or database == ":memory:":
+        return None
+    return settings.snapshot_path or f"{database}.snapshot"
+
+
+def snapshot_taken_at() -> Optional[float]:
+    path = snapshot_path()
+    try:
+        return os.path.getmtime(path) if path else None
+    except OSError:
+        return None
+
+
+def refresh_snapshot() -> float:
+    """Copy the database into the snapshot file now; returns the copy's timestamp."""
+    path = snapshot_path()
+    if path is None:
+        raise RuntimeError("snapshots are off (SNAPSHOT_INTERVAL) or the database is not a SQLite file")
+    started = time.time()
+    tmp = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+    source = sqlite3.connect(engine.url.database, timeout=30)
+    target = sqlite3.connect(tmp)
+    try:
+        source.backup(target)
+        # readers open the file immutable: no -wal/-shm next to it
+        target.execute("PRAGMA journal_mode=DELETE")
+    finally:
+        target.close()
+        source.close()
+    os.utime(tmp, (started, started))
+    os.replace(tmp, path)
+    return started
+
+
+def snapshot_is_current() -> bool:
+    """Whether the snapshot has the schema of the primary (see db.migrate())."""
+    path = snapshot_path()
+    if snapshot_taken_at() is None:
+        return False
+    conn = sqlite3.connect(f"file:{path}?immutable=1", uri=True)
+    try:
+        return conn.execute("PRAGMA user_version").fetchone()[0] == schema_fingerprint()
+    finally:
+        conn.close()
+
+
+def is_due() -> bool:
+    taken_at = snapshot_taken_at()
+    return taken_at is None or time.time() - taken_at >= settings.snapshot_interval
+
+
+def refresh_if_due() -> bool:
+    """Refresh when the snapshot is older than settings.snapshot_interval; one process at a time."""
+    path = snapshot_path()
+    if path is None or not is_due():
+        return False
+    with open(f"{path}.lock", "w") as handle:
+        if fcntl is not None:
+            try:
+                fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return False  # another worker is copying
+        # another worker may have finished a copy meanwhile
+        if not is_due():
+            return False
+        refresh_snapshot()
+        return True
+
+
+_engines: Dict[str, object] = {}
+
+
+def analytics_engine():
+    """Engine for analytics reads: replica, snapshot, or the primary as fallback."""
+    if settings.replica_database_url:
+        key, url, options = "replica", settings.replica_database_url, {}
+    elif snapshot_taken_at() is not None:
+        key = "snapshot"
+        url = f"sqlite:///file:{snapshot_path()}?immutable=1&uri=true"
+        options = {"poolclass": NullPool, "connect_args": {"check_same_thread": False}}
+    else:
+        return engine
+    if key not in _engines:
+        _engines.setdefault(key, create_engine(url, **options))
+    return _engines[key]
+
+
+def staleness(bind=None) -> Staleness:
+    bind = bind or analytics_engine()
+    if bind is engine:
+        return Staleness(source="primary", age_seconds=0.0)
+    if settings.replica_database_url:
+        lag = None
+        if bind.url.get_backend_name() == "postgresql":
+            with bind.connect() as conn:
+                lag = conn.execute(
+                    text("SELECT extract(epoch FROM now() - pg_last_xact_replay_timestamp())")
+                ).scalar()
+        return Staleness(source="replica", age_seconds=float(lag) if lag is not None else None)
+    taken_at = snapshot_taken_at()
+    if taken_at is None:  # removed after a migration, being copied again
+        return Staleness(source="snapshot")
+    return Staleness(
+        source="snapshot",
+        taken_at=datetime.utcfromtimestamp(taken_at),
+        age_seconds=round(max(0.0, time.time() - taken_at), 1),
+    )
+
+
+def staleness_headers(result: Staleness) -> Dict[str, str]:
+    headers = {"X-Data-Source": result.source}
+    if result.age_seconds is not None:
+        headers["X-Data-Age"] = str(result.age_seconds)
+    if result.taken_at is not None:
+        headers["X-Snapshot-Taken-At"] = result.taken_at.isoformat() + "Z"
+    return headers
+
+
+class Refresher:
+    def __init__(self):
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def start(self) -> None:
+        if self._thread is not None or snapshot_path() is None:
+            return
+        if snapshot_taken_at() is not None and not snapshot_is_current():
+            # copy from before a migration: read the primary until the next copy
+            try:
+                os.remove(snapshot_path())
+            except FileNotFoundError:
+                pass
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="snapshot-refresher", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 2.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._thread = None
+
+    def _loop(self) -> None:
+        while True:
+            try:
+                refresh_if_due()
+            except Exception:
+                logger.exception("snapshot refresh failed")
+            if self._stop.wait(min(CHECK_INTERVAL, settings.snapshot_interval)):
+                return
+
+
+refresher = Refresher()
@@ -0,0 +1,7 @@
+import os
+import sys
+import tempfile
+
+# the modules read DATABASE_URL when imported: point them at a throwaway database first
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test.sqlite')}"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
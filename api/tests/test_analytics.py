@@ -0,0 +1,42 @@
+from datetime import date
+
+import pytest
+
+pytest.importorskip("duckdb")
+
+from sqlmodel import Session  # noqa: E402
+
+from analytics import ColumnarStore  # noqa: E402
+from db import engine, migrate  # noqa: E402
+from models import ActionStat, Evaluation, Player, Tournament  # noqa: E402
+
+
+def add(*rows):
+    with Session(engine) as session:
+        for row in rows:
+            session.add(row)
+        session.commit()
+        for row in rows:
+            session.refresh(row)
+
+
+def minutes(store: ColumnarStore, player: Player) -> int:
+    with Session(engine) as session:
+        store.refresh(session)
+    return store.query("SELECT sum(minutes) FROM actionstat WHERE player_pk = ?", [player.pk])[0][0]
+
+
+def test_refresh_applies_changes_of_every_table_since_the_cursor():
+    migrate()
+    event = Tournament(name="Cup", country="DE")
+    player = Player(first_name="Ada", last_name="Test", birthdate=date(2006, 1, 1), nation="DE")
+    add(event, player)
+    add(ActionStat(event_id=event.id, player_id=player.id, minutes=90))
+    store = ColumnarStore()
+    assert minutes(store, player) == 90
+
+    # a stat logged before an evaluation: both are applied by the same refresh
+    add(ActionStat(event_id=event.id, player_id=player.id, minutes=30))
+    add(Evaluation(event_id=event.id, player_id=player.id))
+    assert minutes(store, player) == 120
+    assert store.query("SELECT count(*) FROM evaluation WHERE player_pk = ?", [player.pk])[0][0] == 1
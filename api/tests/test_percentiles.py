@@ -0,0 +1,9 @@
+from percentiles import PercentileIndex
+
+
+def test_percentile_index_keeps_the_newer_score_of_a_late_refresh():
+    index = PercentileIndex()
+    cohort = (None, "Angriff", "U19")
+    index._put((None, 1), cohort, 80.0, 5)
+    index._put((None, 1), cohort, 40.0, 3)
+    assert index._cohorts[cohort] == [80.0]
@@ -0,0 +1,32 @@
+from datetime import date
+
+from sqlmodel import Session, select
+
+from db import engine, migrate
+from models import ActionStat, Evaluation, Player, PlayerProfile, ScoreSnapshot, Tournament
+from scoring import backfill_score_history
+
+
+def test_backfill_skips_rows_of_deleted_players():
+    migrate()
+    with Session(engine) as session:
+        event = Tournament(name="Backfill Cup", country="DE")
+        kept = Player(first_name="Kept", last_name="Test", birthdate=date(2006, 1, 1), nation="DE")
+        gone = Player(first_name="Gone", last_name="Test", birthdate=date(2006, 1, 1), nation="DE")
+        session.add_all([event, kept, gone])
+        session.commit()
+        for player in (kept, gone):
+            session.add(Evaluation(event_id=event.id, player_id=player.id))
+            session.add(ActionStat(event_id=event.id, player_id=player.id, minutes=90))
+        session.commit()
+        kept_pk, gone_pk = kept.pk, gone.pk
+        # DELETE /players/{id} leaves the player's evaluations and stats behind
+        session.delete(gone)
+        session.commit()
+
+        backfill_score_history(session)
+
+        snapshots = session.exec(select(ScoreSnapshot.player_pk).where(ScoreSnapshot.event_pk == event.pk)).all()
+        assert kept_pk in snapshots and gone_pk not in snapshots
+        profiles = session.exec(select(PlayerProfile.player_pk).where(PlayerProfile.player_pk.in_([kept_pk, gone_pk]))).all()
+        assert set(profiles) == {kept_pk}
@@ -0,0 +1,22 @@
+from datetime import date
+
+from similarity import PROFILE_DIMENSIONS, ProfileEntry, ProfileIndex
+
+
+def entry(vector_value: float, revision: int) -> ProfileEntry:
+    return ProfileEntry(
+        player_pk=1,
+        player_id=None,
+        birthdate=date(2006, 1, 1),
+        position="ST",
+        vector=(vector_value,) * len(PROFILE_DIMENSIONS),
+        revision=revision,
+    )
+
+
+def test_profile_index_keeps_the_newer_row_of_a_late_refresh():
+    index = ProfileIndex()
+    index._add(entry(2.0, revision=5))
+    # an older refresh applied after the newer one
+    index._add(entry(1.0, revision=3))
+    assert index.get(1).vector[0] == 2.0
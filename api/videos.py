@@ -0,0 +1,366 @@
+"""
+Game video uploads and their processing.
+
+Files live in settings.video_dir, one directory per GameVideo (its id): the
+upload as `original`, plus `thumbnail.jpg` and `preview.mp4` once processed.
+
+Status of a GameVideo:
+
+    uploading -> uploaded -> processing -> ready
+                                        -> failed   (POST /videos/{id}/process retries)
+
+- uploading: created by POST /tournaments/{id}/games/{id}/videos with the
+  announced size; the client sends chunks with PUT /videos/{id}/content and a
+  Content-Range header. Each chunk is streamed to disk at its offset, and
+  received_bytes (the resume offset) is saved after it, also when the client
+  disconnects midway. A client that lost its connection reads receivedBytes
+  from GET /videos/{id} and continues there. One chunk per video is written
+  at a time (file lock), and the offset only advances from the value the
+  chunk started at (conditional UPDATE); other requests get 409.
+- uploaded: the last byte arrived; a `process_video` job (jobs.py) is queued.
+- processing/ready: the job reads duration, resolution and codec with ffprobe
+  and writes a thumbnail and a low-bitrate preview with ffmpeg. Without ffmpeg
+  on the PATH the video becomes ready without them (playback of the original
+  still works). At most settings.video_workers ffmpeg runs per process, so
+  transcoding does not occupy every job thread.
+
+Playback goes through Starlette's FileResponse, which answers Range requests
+(206) for seeking. Uploads not finished within settings.video_upload_expiry_hours
+and directories of deleted videos are removed by the job maintenance
+(purge_files()).
+"""
+import json
+import os
+import re
+import shutil
+import subprocess
+import threading
+from datetime import datetime, timedelta
+from typing import BinaryIO, Callable, Dict, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import update
+from sqlmodel import Session, select
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import ClientDisconnect
+
+from db import engine, settings
+from models import GameVideo
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process dev server, chunks are not locked
+    fcntl = None
+
+ORIGINAL = "original"
+THUMBNAIL = "thumbnail.jpg"
+PREVIEW = "preview.mp4"
+# preview: 360p H.264 at about 600 kbit/s, playable in every browser
+PREVIEW_HEIGHT = 360
+PREVIEW_VIDEO_BITRATE = "500k"
+PREVIEW_AUDIO_BITRATE = "64k"
+THUMBNAIL_WIDTH = 480
+# bytes per write while an upload chunk is streamed to disk
+WRITE_BUFFER = 1024 * 1024
+
+CONTENT_RANGE = re.compile(r"^bytes (\d+)-(\d+)/(\d+|\*)$")
+
+_ffmpeg_slots = threading.BoundedSemaphore(max(1, settings.video_workers))
+
+
+class UploadError(Exception):
+    """Rejected chunk; `status` is the HTTP status for the router."""
+
+    def __init__(self, status: int, message: str, received: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+        self.received = received
+
+
+def video_dir(video_id: UUID) -> str:
+    return os.path.join(settings.video_dir, video_id.hex)
+
+
+def video_file(video_id: UUID, name: str = ORIGINAL) -> str:
+    return os.path.join(video_dir(video_id), name)
+
+
+def remove_files(video_id: UUID) -> None:
+    shutil.rmtree(video_dir(video_id), ignore_errors=True)
+
+
+def ffmpeg_available() -> bool:
+    return shutil.which("ffmpeg") is not None and shutil.which("ffprobe") is not None
+
+
+def parse_content_range(header: Optional[str], size: int) -> Tuple[int, Optional[int]]:
+    """(first byte, last byte or None) of a chunk; without the header the body starts at 0."""
+    if not header:
+        return 0, None
+    match = CONTENT_RANGE.match(header.strip())
+    if not match:
+        raise UploadError(400, "Content-Range must look like 'bytes <first>-<last>/<total>'")
+    first, last, total = int(match.group(1)), int(match.group(2)), match.group(3)
+    if last < first or (total != "*" and int(total) != size) or last >= size:
+        raise UploadError(416, f"Range does not fit the announced size of {size} bytes")
+    return first, last
+
+
+def check_chunk(video: Optional[GameVideo], first: int) -> None:
+    if video is None:
+        raise UploadError(404, "Video not found")
+    if video.status != "uploading":
+        raise UploadError(409, f"Video is {video.status}, not uploading")
+    if first != video.received_bytes:
+        raise UploadError(409, f"Upload continues at byte {video.received_bytes}", video.received_bytes)
+
+
+def begin_chunk(video_id: UUID, content_range: Optional[str]) -> Tuple[GameVideo, BinaryIO, int, int]:
+    """
+    Open the original for a chunk under an exclusive lock (one chunk per video
+    at a time, across worker processes) and check its offset against the
+    current received_bytes; returns the video, the handle positioned at the
+    first byte, the first byte and the chunk's maximum length.
+    """
+    with Session(engine) as session:
+        video = session.get(GameVideo, video_id)
+        if video is not None and video.status == "uploading":
+            first, last = parse_content_range(content_range, video.size_bytes)
+        else:
+            first, last = 0, None
+        check_chunk(video, first)
+    os.makedirs(video_dir(video_id), exist_ok=True)
+    # O_CREAT without O_TRUNC: a concurrent request must not empty the file
+    handle = os.fdopen(os.open(video_file(video_id), os.O_RDWR | os.O_CREAT, 0o644), "r+b", buffering=0)
+    try:
+        if fcntl is not None:
+            try:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                raise UploadError(409, "Another chunk of this video is being uploaded")
+        # the offset may have moved while the lock was held by another request
+        with Session(engine) as session:
+            video = session.get(GameVideo, video_id)
+            check_chunk(video, first)
+        # drop the tail of a chunk that was cut off and is being sent again
+        handle.truncate(first)
+        handle.seek(first)
+    except BaseException:
+        handle.close()
+        raise
+    return video, handle, first, (last + 1 if last is not None else video.size_bytes) - first
+
+
+async def write_chunk(video_id: UUID, content_range: Optional[str], chunks) -> Tuple[GameVideo, Optional[UUID]]:
+    """
+    Stream `chunks` (request.stream()) into the original at the offset of
+    `content_range` and save the new offset; returns the video and the
+    processing job id once the upload is complete. Bytes that arrived before a
+    client disconnect are kept. A chunk running past its Content-Range or the
+    announced size is discarded. Disk and database work runs in the threadpool,
+    so a slow upload does not block the event loop.
+    """
+    video, handle, first, limit = await run_in_threadpool(begin_chunk, video_id, content_range)
+    try:
+        written, pending = 0, bytearray()
+        try:
+            async for data in chunks:
+                if written + len(data) > limit:
+                    await run_in_threadpool(handle.truncate, first)
+                    raise UploadError(413, "Chunk is larger than its Content-Range or the announced size")
+                pending += data
+                written += len(data)
+                if len(pending) >= WRITE_BUFFER:
+                    await run_in_threadpool(handle.write, pending)
+                    pending.clear()
+        except ClientDisconnect:
+            pass  # keep what arrived; the client resumes at the new offset
+        if pending:
+            await run_in_threadpool(handle.write, pending)
+        # still under the lock: the next chunk sees the new offset
+        return await run_in_threadpool(finish_chunk, video, first, written)
+    finally:
+        await run_in_threadpool(handle.close)
+
+
+def finish_chunk(video: GameVideo, first: int, written: int) -> Tuple[GameVideo, Optional[UUID]]:
+    """
+    Advance received_bytes from `first` by `written` with a conditional UPDATE
+    (409 if another request moved it); queues processing once the upload is complete.
+    """
+    received = first + written
+    status = "uploaded" if received >= video.size_bytes else "uploading"
+    table = GameVideo.__table__
+    with Session(engine) as session:
+        result = session.execute(
+            update(table)
+            .where(table.c.id == video.id, table.c.status == "uploading", table.c.received_bytes == first)
+            .values(received_bytes=received, status=status, updated_at=datetime.utcnow())
+        )
+        if result.rowcount != 1:
+            session.rollback()
+            current = session.get(GameVideo, video.id)
+            raise UploadError(409, "Upload offset changed during the chunk", current.received_bytes if current else None)
+        session.commit()
+        video = session.get(GameVideo, video.id)
+        job_id = None
+        if status == "uploaded":
+            job_id = enqueue_processing(session, video)
+            session.refresh(video)
+        return video, job_id
+
+
+def enqueue_processing(session: Session, video: GameVideo) -> UUID:
+    import jobs
+
+    return jobs.enqueue(session, "process_video", {"videoId": str(video.id)}).id
+
+
+def probe(path: str) -> Dict[str, object]:
+    """Duration, resolution and codec of the first video stream (ffprobe)."""
+    out = subprocess.run(
+        ["ffprobe", "-v", "error", "-print_format", "json", "-show_format", "-show_streams", path],
+        capture_output=True,
+        check=True,
+        timeout=120,
+    ).stdout
+    info = json.loads(out or b"{}")
+    stream = next((s for s in info.get("streams", []) if s.get("codec_type") == "video"), {})
+    duration = info.get("format", {}).get("duration") or stream.get("duration")
+    return {
+        "duration_seconds": round(float(duration), 3) if duration else None,
+        "width": stream.get("width"),
+        "height": stream.get("height"),
+        "codec": stream.get("codec_name"),
+    }
+
+
+def run_ffmpeg(args, target: str, duration: Optional[float], progress: Callable[[int, Optional[int]], None]) -> None:
+    """
+    Run ffmpeg writing to a temporary file renamed to `target` on success.
+    Progress (seconds encoded) is reported from `-progress pipe:1`; an exception
+    from `progress` (job cancelled) kills ffmpeg.
+    """
+    tmp = f"{target}.tmp{os.path.splitext(target)[1]}"
+    command = ["ffmpeg", "-y", "-v", "error", "-nostdin", "-progress", "pipe:1", *args, tmp]
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    try:
+        total = int(duration) if duration else None
+        for line in process.stdout:
+            key, _, value = line.strip().partition("=")
+            if key == "out_time_us" and value.isdigit():
+                progress(int(value) // 1_000_000, total)
+        stderr = process.stderr.read()
+        if process.wait() != 0:
+            raise RuntimeError(f"ffmpeg failed: {stderr.strip()[-500:]}")
+        os.replace(tmp, target)
+    finally:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def make_thumbnail(video_id: UUID, duration: Optional[float]) -> None:
+    # a frame a few seconds in rather than the (often black) first one
+    at = min(5.0, duration / 10) if duration else 0.0
+    run_ffmpeg(
+        ["-ss", f"{at:.2f}", "-i", video_file(video_id), "-frames:v", "1", "-vf", f"scale={THUMBNAIL_WIDTH}:-2"],
+        video_file(video_id, THUMBNAIL),
+        None,
+        lambda done, total: None,
+    )
+
+
+def make_preview(video_id: UUID, duration: Optional[float], progress) -> None:
+    run_ffmpeg(
+        [
+            "-i", video_file(video_id),
+            "-vf", f"scale=-2:{PREVIEW_HEIGHT}",
+            "-c:v", "libx264", "-preset", "veryfast", "-b:v", PREVIEW_VIDEO_BITRATE,
+            "-maxrate", PREVIEW_VIDEO_BITRATE, "-bufsize", "1M",
+            "-c:a", "aac", "-b:a", PREVIEW_AUDIO_BITRATE,
+            # index at the front: the preview can start playing before it is loaded
+            "-movflags", "+faststart",
+        ],
+        video_file(video_id, PREVIEW),
+        duration,
+        progress,
+    )
+
+
+def set_status(session: Session, video: GameVideo, status: str, **values) -> None:
+    video.status = status
+    for key, value in values.items():
+        setattr(video, key, value)
+    video.updated_at = datetime.utcnow()
+    session.add(video)
+    session.commit()
+
+
+def process_video(video_id: UUID, progress: Callable[..., None] = lambda done, total=None, message=None: None) -> dict:
+    """Handler body of the `process_video` job: metadata, thumbnail, preview, then ready (or failed)."""
+    with Session(engine, info={"actor": "job:process_video"}) as session:
+        video = session.get(GameVideo, video_id)
+        if video is None:
+            return {"videoId": str(video_id), "status": "deleted"}
+        if not os.path.exists(video_file(video_id)):
+            set_status(session, video, "failed", error="Upload file is missing")
+            return {"videoId": str(video_id), "status": video.status}
+        set_status(session, video, "processing", error=None)
+        try:
+            if not ffmpeg_available():
+                set_status(session, video, "ready", has_thumbnail=False, has_preview=False)
+                return {"videoId": str(video_id), "status": video.status, "ffmpeg": False}
+            # the job's keepalive() heartbeat covers the wait and the steps without progress output
+            progress(0, None, "waiting for ffmpeg")
+            with _ffmpeg_slots:
+                progress(0, None, "probing")
+                meta = probe(video_file(video_id))
+                for key, value in meta.items():
+                    setattr(video, key, value)
+                session.add(video)
+                session.commit()
+                has_thumbnail = has_preview = False
+                if video.width:
+                    make_thumbnail(video_id, video.duration_seconds)
+                    has_thumbnail = True
+                    make_preview(
+                        video_id, video.duration_seconds, lambda done, total: progress(done, total, "preview")
+                    )
+                    has_preview = True
+            set_status(session, video, "ready", has_thumbnail=has_thumbnail, has_preview=has_preview)
+        except Exception as exc:
+            session.rollback()
+            set_status(session, video, "failed", error=str(exc) or exc.__class__.__name__)
+            raise
+        return {"videoId": str(video_id), "status": video.status, "ffmpeg": True, **meta}
+
+
+def purge_files(now: Optional[datetime] = None) -> Dict[str, int]:
+    """Delete uploads abandoned for settings.video_upload_expiry_hours and directories without a GameVideo."""
+    now = now or datetime.utcnow()
+    cutoff = now - timedelta(hours=settings.video_upload_expiry_hours)
+    with Session(engine, info={"actor": "job:maintenance"}) as session:
+        stale = session.exec(
+            select(GameVideo).where(
+                GameVideo.status == "uploading",
+                (GameVideo.updated_at < cutoff) | (GameVideo.updated_at.is_(None) & (GameVideo.created_at < cutoff)),
+            )
+        ).all()
+        for video in stale:
+            session.delete(video)
+        session.commit()
+        known = {vid.hex for vid in session.exec(select(GameVideo.id)).all()}
+    orphans = 0
+    if os.path.isdir(settings.video_dir):
+        for name in os.listdir(settings.video_dir):
+            path = os.path.join(settings.video_dir, name)
+            if name in known or not re.fullmatch(r"[0-9a-f]{32}", name):
+                continue
+            # a directory of a video created after the query above is recent
+            if datetime.utcfromtimestamp(os.path.getmtime(path)) < cutoff:
+                shutil.rmtree(path, ignore_errors=True)
+                orphans += 1
+    return {"abandoned": len(stale), "orphans": orphans}
@@ -0,0 +1,67 @@
+"""
+Weighted aggregation for compute_score (WEIGHTED_SCORING_MODEL): recent data
+counts more, and per-90 rates from few minutes are pulled towards the average.
+
+- Ratings are weighted by 2^((created_at - EPOCH) / HALF_LIFE_DAYS), action
+  stats by the same factor on their event date (tournament start, else the day
+  it was created). Only ratios of weights enter the result, so a weighted mean
+  does not change as time passes: stored weighted scores (PlayerProfile under
+  WEIGHTED_SCORING_MODEL) stay exact until the player gets new data, and
+  nothing is re-decayed per request.
+- Weights are divided by the largest weight of the player, so the newest event
+  counts with its full minutes. Per-90 rates then get MIN_MINUTES phantom minutes
+  at the average rate of all action stats:
+
+      rate = (sum w*x + average * MIN_MINUTES / 90) / (sum w*minutes + MIN_MINUTES) * 90
+
+  The average comes from ActionStatTotal, kept current by triggers on
+  actionstat (db.sync_action_stat_totals()), so it is one row read.
+"""
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Dict, Optional
+
+from sqlmodel import Session, select
+
+from models import ActionStatTotal
+
+EPOCH = date(2020, 1, 1)
+HALF_LIFE_DAYS = 365
+MIN_MINUTES = 270  # three full games
+# per-90 stats of compute_score, columns of ActionStat/ActionStatTotal
+STAT_FIELDS = ("goals", "assists", "shots", "passes", "duels")
+
+
+def decay_weight(day: date, half_life_days: float = HALF_LIFE_DAYS) -> float:
+    return 2.0 ** ((day - EPOCH).days / half_life_days)
+
+
+@dataclass
+class Weighting:
+    event_dates: Dict[int, date] = field(default_factory=dict)
+    average_per90: Dict[str, float] = field(default_factory=dict)
+    half_life_days: float = HALF_LIFE_DAYS
+    min_minutes: float = MIN_MINUTES
+
+    def evaluation_weight(self, created_at) -> float:
+        return decay_weight(created_at.date() if created_at else EPOCH, self.half_life_days)
+
+    def stat_weight(self, event_pk: Optional[int]) -> float:
+        return decay_weight(self.event_dates.get(event_pk, EPOCH), self.half_life_days)
+
+    def per90(self, name: str, weighted_total: float, weighted_minutes: float) -> float:
+        prior_minutes = self.min_minutes
+        prior = self.average_per90.get(name, 0.0) * prior_minutes / 90.0
+        return (weighted_total + prior) / (weighted_minutes + prior_minutes) * 90.0
+
+
+def average_per90(session: Session) -> Dict[str, float]:
+    totals = session.exec(select(ActionStatTotal)).first()
+    if totals is None or not totals.minutes:
+        return {name: 0.0 for name in STAT_FIELDS}
+    return {name: getattr(totals, name) / totals.minutes * 90.0 for name in STAT_FIELDS}
+
+
+def load_weighting(session: Session, event_dates: Dict[int, date]) -> Weighting:
+    """Weighting with the given event dates (scoring.event_dates) and the current stat averages."""
+    return Weighting(event_dates=event_dates, average_per90=average_per90(session))
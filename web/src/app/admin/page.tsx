@@ -2,7 +2,7 @@
 
 import Link from "next/link";
 import { useState } from "react";
-import { API_BASE } from "../../lib/api";
+import { API_BASE, startJob, waitForJob } from "../../lib/api";
 
 type SeedEntity = "players" | "venues";
 
@@ -86,12 +86,12 @@ export default function AdminPage() {
               setLoading(true);
               setMessage("");
               try {
-                const res = await fetch(`${API_BASE}/ops/dedupe-players`, { method: "POST" });
-                if (res.ok) {
-                  const data = await res.json();
-                  setMessage(`Bereinigt: ${data.removed} entfernt, ${data.kept} behalten.`);
+                const started = await startJob("/ops/dedupe-players");
+                const job = await waitForJob(started.id, (j) => setMessage(`Bereinigen läuft… ${j.message ?? ""}`));
+                if (job.status === "done") {
+                  setMessage(`Bereinigt: ${job.result.removed} entfernt, ${job.result.kept} behalten.`);
                 } else {
-                  setMessage(`Bereinigen fehlgeschlagen (Status ${res.status}).`);
+                  setMessage(`Bereinigen fehlgeschlagen (${job.error ?? job.status}).`);
                 }
               } catch (err) {
                 setMessage("Bereinigen fehlgeschlagen.");
@@ -4,7 +4,7 @@
 import Link from "next/link";
 import { useRouter, useParams, usePathname } from "next/navigation";
 import { useEffect, useState } from "react";
-import { API_BASE } from "../../../lib/api";
+import { API_BASE, fetchPlayersByIds } from "../../../lib/api";
 import { Tournament, Player, Evaluation, Game } from "../../../types";
 
 type TabKey = "overview" | "teams" | "evaluation" | "games";
@@ -94,13 +94,26 @@ export function TournamentView({ initialTab = "overview" }: { initialTab?: TabKe
     setTab(map[sub] || "overview");
   }, [pathname]);
 
+  // Nur die Spieler dieses Turniers laden (Teilnehmer, Kader, Aufstellungen) statt der Gesamtliste.
+  const playerIdsKey = tournament
+    ? Array.from(
+        new Set([
+          ...(tournament.participants || []),
+          ...(tournament.teams || []).flatMap((t) => t.roster.map((r) => r.playerId)),
+          ...(tournament.games || []).flatMap((g) => (g.lineup || []).map((l) => l.playerId)),
+        ]),
+      )
+        .sort()
+        .join(",")
+    : "";
+
   useEffect(() => {
+    if (!playerIdsKey) return;
     (async () => {
-      const res = await fetch(`${API_BASE}/players`);
-      const list: Player[] = await res.json();
+      const list = (await fetchPlayersByIds(playerIdsKey.split(","))) as Player[];
       setPlayers(list);
     })().catch(() => {});
-  }, []);
+  }, [playerIdsKey]);
 
   const participantPlayers = tournament?.participants ? players.filter((p) => tournament.participants?.includes(p.id)) : [];
   const availablePlayers = participantPlayers;
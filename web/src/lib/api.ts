@@ -13,6 +13,15 @@ export async function fetchPlayers() {
   return fetchJson(`${API_BASE}/players`);
 }
 
+export async function fetchPlayersByIds(ids: string[]) {
+  if (!ids.length) return [];
+  return fetchJson(`${API_BASE}/players/batch`, {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify({ ids }),
+  });
+}
+
 export async function fetchTournaments() {
   return fetchJson(`${API_BASE}/tournaments`);
 }
@@ -21,4 +30,32 @@ export async function fetchVenues() {
   return fetchJson(`${API_BASE}/venues`);
 }
 
+export type Job = {
+  id: string;
+  kind: string;
+  status: "queued" | "running" | "done" | "failed" | "cancelled";
+  result: any;
+  error?: string | null;
+  progress?: number | null;
+  message?: string | null;
+};
+
+export async function startJob(path: string, body?: unknown): Promise<Job> {
+  return fetchJson<Job>(`${API_BASE}${path}`, {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: body === undefined ? undefined : JSON.stringify(body),
+  });
+}
+
+// polls GET /jobs/{id} until the job has finished
+export async function waitForJob(id: string, onProgress?: (job: Job) => void, intervalMs = 1000): Promise<Job> {
+  for (;;) {
+    const job = await fetchJson<Job>(`${API_BASE}/jobs/${id}`);
+    if (job.status !== "queued" && job.status !== "running") return job;
+    onProgress?.(job);
+    await new Promise((resolve) => setTimeout(resolve, intervalMs));
+  }
+}
+
 export { API_BASE };